@@ -0,0 +1,119 @@
+// Search box for pages written by pydoc_fork.
+// search/index.json lists the shards, each shard holds the names whose words
+// start with the same two letters, and only the shards a query needs are fetched.
+(function () {
+    "use strict";
+
+    var box = document.getElementById("search-box");
+    var list = document.getElementById("search-results");
+    if (!box || !list || !window.fetch) {
+        return;
+    }
+    var manifest = null;
+    var shards = Object.create(null);
+    var latest = 0;
+
+    function load(url) {
+        return fetch(url).then(function (response) {
+            if (!response.ok) {
+                throw new Error(url + ": " + response.status);
+            }
+            return response.json();
+        });
+    }
+
+    function shard(prefix) {
+        if (!shards[prefix]) {
+            shards[prefix] = load("search/" + encodeURIComponent(prefix) + ".json");
+        }
+        return shards[prefix];
+    }
+
+    function search(query) {
+        var words = query.toLowerCase().split(/\s+/).filter(Boolean);
+        if (!words.length) {
+            return Promise.resolve([]);
+        }
+        // the longest word narrows it down the most
+        var word = words.reduce(function (longest, next) {
+            return next.length > longest.length ? next : longest;
+        });
+        if (!manifest) {
+            manifest = load("search/index.json");
+        }
+        return manifest.then(function (index) {
+            var prefixes = index.shards.filter(function (prefix) {
+                return word.length > 1 ? prefix === word.slice(0, 2) : prefix.charAt(0) === word;
+            });
+            return Promise.all(prefixes.map(shard));
+        }).then(function (loaded) {
+            var seen = Object.create(null);
+            var results = [];
+            loaded.forEach(function (data) {
+                data.terms.forEach(function (pair) {
+                    if (pair[0].lastIndexOf(word, 0) !== 0) {
+                        return;
+                    }
+                    pair[1].forEach(function (position) {
+                        var entry = data.entries[position];
+                        var key = entry[0] + "\n" + entry[2];
+                        var text = (entry[0] + " " + entry[3]).toLowerCase();
+                        if (seen[key] || !words.every(function (each) { return text.indexOf(each) !== -1; })) {
+                            return;
+                        }
+                        seen[key] = true;
+                        results.push({entry: entry, exact: pair[0] === word ? 1 : 0});
+                    });
+                });
+            });
+            results.sort(function (a, b) {
+                return b.exact - a.exact || a.entry[0].length - b.entry[0].length || (a.entry[0] < b.entry[0] ? -1 : 1);
+            });
+            return results.slice(0, 50);
+        });
+    }
+
+    function show(results) {
+        list.textContent = "";
+        results.forEach(function (result) {
+            var entry = result.entry;
+            var item = document.createElement("li");
+            var link = document.createElement("a");
+            link.href = entry[2];
+            link.textContent = entry[0];
+            item.appendChild(link);
+            item.appendChild(document.createTextNode(" " + entry[1]));
+            if (entry[3]) {
+                var summary = document.createElement("small");
+                summary.textContent = entry[3];
+                item.appendChild(summary);
+            }
+            list.appendChild(item);
+        });
+    }
+
+    box.addEventListener("input", function () {
+        var asked = ++latest;
+        search(box.value).then(function (results) {
+            // answers can come back out of order
+            if (asked === latest) {
+                show(results);
+            }
+        }).catch(function (error) {
+            list.textContent = "";
+            if (window.console) {
+                console.warn("search failed", error);
+            }
+        });
+    });
+
+    box.addEventListener("keydown", function (event) {
+        var first = list.querySelector("a");
+        if (event.key === "Enter" && first) {
+            window.location.href = first.href;
+        } else if (event.key === "Escape") {
+            box.value = "";
+            list.textContent = "";
+        }
+    });
+}());
@@ -3,6 +3,7 @@
 A fork of pydoc that is optimized for generating html documentation in a CI context
 
 Usage:
+  pydoc_fork --serve [options]
   pydoc_fork <package>... [options]
   pydoc_fork (-h | --help)
   pydoc_fork --version
@@ -13,12 +14,37 @@ Options:
   --quiet                      No printing or logging.
   --verbose                    Crank up the logging.
   --config <config>            pyproject.toml or other toml config.
-  --theme <theme>              Theme selection (classic, light, dark).
+  --theme <theme>              Theme selection (classic, light, dark), comma separated for several.
   --project_name <name>        Project name for headings.
   --no_index                   Do not generate an index.html file.
   --document_internals         respect underscore or __all__ private
   --prefer_docs_python_org     link to python.org or generate own stdlib docs
   -o --output <folder>         where to write files
+  -j --jobs <jobs>             worker processes for page generation
+  --incremental                only re-render modules whose source changed
+  --static                     parse source with ast instead of importing it
+  --cache-dir <folder>         where to keep inspected modules between runs
+  --no-cache                   inspect everything, don't read or write the cache
+  --isolate                    import each module in a worker process that can be killed
+  --import-timeout <seconds>   with --isolate, skip modules that take longer to import
+  --recycle-after <modules>    with --isolate, replace the worker after this many modules
+  --crawl-modules <modules>    document at most this many mentioned modules, 100 by default
+  --crawl-bytes <bytes>        stop documenting mentioned modules after writing this much
+  --crawl-seconds <seconds>    stop documenting mentioned modules after this long
+  --crawl-priority <order>     mentioned modules go by links, depth or owned first
+  --stdlib-bundle <folder>     where to keep standard library pages shared between projects
+  --no-stdlib-bundle           render standard library pages every time
+  --no-search                  don't write a search index or put a search box on pages
+  --no-inventory               don't write objects.inv
+  --inventory <urls>           link to names in these projects' objects.inv, comma separated
+  --profile <report>           time and measure each module, write a json report here
+  --profile-top <modules>      with --profile, print this many of the slowest modules, 10 by default
+  --precompress                also write gzip, and brotli if installed, copies of pages for static hosts
+  --output-archive <file>      write a .zip, .tar or .tar.gz instead of files in the output folder
+  --serve                      serve docs of anything importable over http, rendered as pages are opened
+  --host <host>                with --serve, address to listen on, localhost by default
+  --port <port>                with --serve, port to listen on, 8080 by default
+  --serve-cache <pages>        with --serve, keep this many rendered pages, 256 by default
 """
 
 # TODO: implement this
@@ -26,11 +52,12 @@ Options:
 #   pydoc_fork source_path <path>... [--output=<folder>] [--document_internals]
 
 import logging
+import os
 import sys
 
 import docopt
 
-from pydoc_fork import commands, settings
+from pydoc_fork import commands, crawl, output_files, settings
 from pydoc_fork.__about__ import __version__
 from pydoc_fork.settings import load_config
 
@@ -56,11 +83,49 @@ def main() -> int:
     if arguments.get("--prefer_docs_python_org"):
         settings.PREFER_DOCS_PYTHON_ORG = arguments["--prefer_docs_python_org"]
     if arguments.get("--theme"):
-        settings.THEME = arguments["--theme"]
+        settings.THEMES = [theme.strip() for theme in arguments["--theme"].split(",") if theme.strip()]
+        settings.THEME = settings.THEMES[0]
     if arguments.get("--project_name"):
         settings.PROJECT_NAME = arguments["--project_name"]
     if arguments.get("--no_index"):
         settings.GENERATE_INDEX = False
+    if arguments.get("--jobs"):
+        settings.JOBS = int(arguments["--jobs"])
+    if arguments.get("--incremental"):
+        settings.INCREMENTAL = True
+    if arguments.get("--static"):
+        settings.STATIC = True
+    if arguments.get("--cache-dir"):
+        settings.CACHE_DIR = arguments["--cache-dir"]
+    if arguments.get("--no-cache"):
+        settings.CACHE = False
+    if arguments.get("--isolate"):
+        settings.ISOLATE = True
+    if arguments.get("--import-timeout"):
+        settings.IMPORT_TIMEOUT = float(arguments["--import-timeout"])
+    if arguments.get("--recycle-after"):
+        settings.RECYCLE_AFTER = int(arguments["--recycle-after"])
+    if arguments.get("--crawl-modules"):
+        settings.CRAWL_MAX_MODULES = int(arguments["--crawl-modules"])
+    if arguments.get("--crawl-bytes"):
+        settings.CRAWL_MAX_BYTES = int(arguments["--crawl-bytes"])
+    if arguments.get("--crawl-seconds"):
+        settings.CRAWL_MAX_SECONDS = float(arguments["--crawl-seconds"])
+    if arguments.get("--crawl-priority"):
+        if arguments["--crawl-priority"] not in crawl.PRIORITIES:
+            # before anything is written, not once the crawl gets to it
+            raise docopt.DocoptExit(f"--crawl-priority must be one of {', '.join(crawl.PRIORITIES)}")
+        settings.CRAWL_PRIORITY = arguments["--crawl-priority"]
+    if arguments.get("--stdlib-bundle"):
+        settings.STDLIB_BUNDLE_DIR = arguments["--stdlib-bundle"]
+    if arguments.get("--no-stdlib-bundle"):
+        settings.STDLIB_BUNDLE = False
+    if arguments.get("--no-search"):
+        settings.SEARCH = False
+    if arguments.get("--no-inventory"):
+        settings.INVENTORY = False
+    if arguments.get("--inventory"):
+        settings.INVENTORIES = [source.strip() for source in arguments["--inventory"].split(",") if source.strip()]
 
     if arguments.get("--verbose"):
         # root logger, all modules
@@ -75,10 +140,33 @@ def main() -> int:
             logger.addHandler(handler)
             LOGGERS.append(logger)
 
+    if arguments.get("--profile"):
+        settings.PROFILE = arguments["--profile"]
+    if arguments.get("--profile-top"):
+        settings.PROFILE_TOP = int(arguments["--profile-top"])
+    if arguments.get("--precompress"):
+        settings.PRECOMPRESS = True
+    if arguments.get("--output-archive"):
+        settings.OUTPUT_ARCHIVE = arguments["--output-archive"]
+    if arguments.get("--serve-cache"):
+        settings.SERVE_CACHE_PAGES = int(arguments["--serve-cache"])
+    if arguments.get("--serve"):
+        # only needed to serve
+        from pydoc_fork import server
+
+        server.serve(arguments.get("--host") or "localhost", int(arguments.get("--port") or 8080))
+        return 0
+
+    if not output_folder and settings.OUTPUT_ARCHIVE:
+        # entries are named relative to it, nothing gets written there
+        output_folder = os.curdir
     commands.process_path_or_dot_name(
         package,
         output_folder=output_folder,
     )
+    if output_files.LAST is not None and not arguments.get("--quiet"):
+        # what a publish step would upload
+        print(output_files.LAST.summary())
     # # TODO
     #     print("Don't recognize that command.")
     #     return -1
@@ -0,0 +1,89 @@
+"""
+Stylesheet and scripts, named by their content.
+
+The themed stylesheet and search.js are written as style.<hash>.css and
+search.<hash>.js and pages link to those names, so browsers and CDNs can
+cache them forever. A file by that name is already the right file, so
+rebuilds leave it alone, and a new theme makes a new name instead of
+changing a file that pages elsewhere are cached with.
+"""
+
+import functools
+import hashlib
+import os
+import re
+
+from pydoc_fork import output_files, precompress, settings
+from pydoc_fork.inspector.path_utils import locate_file
+
+HASH_LENGTH = 12
+"""Hex digits of the content hash in a file name"""
+
+CONTENT_TYPES = {".css": "text/css; charset=utf-8", ".js": "text/javascript; charset=utf-8"}
+"""For serving assets"""
+
+
+def themed_style(theme: str | None = None) -> str:
+    """style.css with the theme's colors."""
+    # circular ref
+    from pydoc_fork.reporter.themes import get_theme_css
+
+    base_style_path = locate_file("templates/style.css", __file__)
+    with open(base_style_path, encoding="utf-8") as f:
+        base_style = f.read()
+
+    # Replace :root block with theme-specific variables
+    theme_vars = get_theme_css(theme or settings.THEME)
+    return re.sub(r":root\s*{[^}]*}", theme_vars, base_style, flags=re.MULTILINE)
+
+
+def hashed_name(name: str, data: bytes) -> str:
+    """style.css becomes style.<hash>.css."""
+    stem, extension = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:HASH_LENGTH]}{extension}"
+
+
+@functools.cache
+def _assets(theme: str) -> dict[str, tuple[str, bytes]]:
+    """Hashed file name and content of every asset, by plain name."""
+    with open(locate_file("templates/search.js", __file__), "rb") as file:
+        search_script = file.read()
+    contents = {
+        "style.css": themed_style(theme).encode("utf-8"),
+        "search.js": search_script,
+    }
+    return {name: (hashed_name(name, data), data) for name, data in contents.items()}
+
+
+def wanted(theme: str | None = None) -> dict[str, tuple[str, bytes]]:
+    """Assets the pages of this run link to."""
+    assets = _assets(theme or settings.THEME)
+    return {name: asset for name, asset in assets.items() if settings.SEARCH or name != "search.js"}
+
+
+def url(name: str, theme: str | None = None) -> str:
+    """What pages link to for an asset, e.g. url("style.css")."""
+    return _assets(theme or settings.THEME)[name][0]
+
+
+def names() -> dict[str, str]:
+    """Hashed names of the assets, pages change when these do."""
+    return {name: hashed for name, (hashed, _) in wanted().items()}
+
+
+def files() -> dict[str, bytes]:
+    """Content of the assets, by hashed name."""
+    return dict(wanted().values())
+
+
+def write(output_folder: str, theme: str | None = None) -> list[str]:
+    """Write the assets that aren't there yet."""
+    written = []
+    for hashed, data in wanted(theme).values():
+        path = os.path.join(output_folder, hashed)
+        # a file by this name has this content, unless it is missing its compressed copies
+        if output_files.exists(path) and precompress.COMPRESSOR is None:
+            continue
+        output_files.write_bytes(path, [data])
+        written.append(path)
+    return written
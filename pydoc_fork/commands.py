@@ -8,17 +8,39 @@ import logging
 import os
 import os.path
 import pkgutil
-from typing import Union
-
-from pydoc_fork import settings
+import time
+from typing import Union, cast
+
+from pydoc_fork import (
+    crawl,
+    incremental,
+    inventory,
+    model_cache,
+    output_files,
+    precompress,
+    profiling,
+    search_index,
+    settings,
+    stdlib_bundle,
+    theme_variants,
+)
+from pydoc_fork.inspector import lookups
+from pydoc_fork.inspector.builder import build
 from pydoc_fork.inspector.custom_types import TypeLike
+from pydoc_fork.inspector.model import Doc, ModuleDoc
 from pydoc_fork.inspector.module_utils import ImportTimeError
-from pydoc_fork.inspector.path_utils import _adjust_cli_sys_path, locate_file
+from pydoc_fork.inspector.path_utils import _adjust_cli_sys_path
+from pydoc_fork.inspector.static_module import installed, walk_packages_statically
 from pydoc_fork.inspector.utils import describe, resolve
-from pydoc_fork.reporter.format_page import render
+from pydoc_fork.isolation import inspect_isolated, shutdown_worker
+from pydoc_fork.reporter.format_page import stream_render
+from pydoc_fork.reporter.jinja_code import refresh_loader
 
 LOGGER = logging.getLogger(__name__)
 
+Inspected = tuple[str, str, Doc, list[tuple[str, str]], list[str]]
+"""Name, page title, model, mentioned modules and linked modules of an inspected thing"""
+
 
 def document_one(
     thing: Union[TypeLike, str],
@@ -26,30 +48,132 @@ def document_one(
     force_load: bool = False,
 ) -> str | None:
     """Write HTML documentation to a file in the current directory."""
-    try:
-        the_object, name = resolve(thing, force_load)
-    except (ImportError, ImportTimeError):
-        LOGGER.warning("document_one failed for %s with folder %s", thing, output_folder)
-        return None
+    maybe_name = thing if isinstance(thing, str) else getattr(thing, "__name__", None)
+    manifest = incremental.MANIFEST
+    if manifest is not None:
+        maybe_path = calculate_file_name(maybe_name, output_folder) if isinstance(maybe_name, str) else None
+        if maybe_name and maybe_path and manifest.is_fresh(maybe_name, maybe_path):
+            LOGGER.info("unchanged, skipped %s.html", maybe_name)
+            output_files.keep(maybe_path)
+            settings.MENTIONED_MODULES.update(manifest.mentioned(maybe_name))
+            if crawl.FRONTIER is not None:
+                crawl.FRONTIER.record(maybe_name, manifest.mentioned(maybe_name))
+            return maybe_path
 
     # MR
     # should go in constructor, but what? no constructor
     settings.OUTPUT_FOLDER = output_folder
-    page_out = render(describe(the_object), the_object, name)
+    profile = profiling.PROFILE
+    record = profile.begin(str(maybe_name)) if profile is not None else None
+    started = time.perf_counter() if record is not None else 0.0
+    cache = model_cache.CACHE
+    bundle = stdlib_bundle.BUNDLE if isinstance(maybe_name, str) and stdlib_bundle.covers(maybe_name) else None
+    bundled = bundle.load(cast(str, maybe_name)) if bundle is not None else None
+    cached = cache.load(maybe_name) if cache is not None and isinstance(maybe_name, str) and not bundled else None
+    if bundled is not None:
+        LOGGER.debug("rendered %s for an earlier project", maybe_name)
+        name, mentioned, linked = cast(str, maybe_name), bundled.mentioned, bundled.linked
+        settings.MENTIONED_MODULES.update(mentioned)
+        if record is not None:
+            record.source = "bundled"
+    elif cached is not None:
+        LOGGER.debug("inspected %s on an earlier run", maybe_name)
+        name, title, doc = cast(str, maybe_name), cached.title, cached.doc
+        mentioned, linked = cached.mentioned, cached.linked
+        settings.MENTIONED_MODULES.update(mentioned)
+        if record is not None:
+            record.source = "cached"
+    else:
+        want_links = manifest is not None or cache is not None
+        if settings.ISOLATE and isinstance(maybe_name, str):
+            inspected = inspect_isolated(maybe_name, force_load, want_links)
+            if record is not None:
+                record.source = "isolated"
+            if inspected is not None:
+                settings.MENTIONED_MODULES.update(inspected[3])
+        else:
+            inspected = inspect_one(thing, force_load, want_links)
+        if inspected is None:
+            LOGGER.warning("document_one failed for %s with folder %s", thing, output_folder)
+            if profile is not None and record is not None:
+                record.seconds["inspect"] = time.perf_counter() - started - record.seconds["import"]
+                profile.end(record, None)
+            return None
+        name, title, doc, mentioned, linked = inspected
+        if cache is not None and isinstance(doc, ModuleDoc):
+            cache.store(name, title, doc, mentioned, linked)
+    if bundle is not None and bundled is None and isinstance(doc, ModuleDoc):
+        bundled = bundle.store(name, title, doc, mentioned, linked)
+    if crawl.FRONTIER is not None:
+        crawl.FRONTIER.record(name, mentioned)
+    if record is not None:
+        record.name = name
+        # bundling renders the page, that counts as inspecting it
+        record.seconds["inspect"] = time.perf_counter() - started - record.seconds["import"]
+        started = time.perf_counter()
+
     full_path = calculate_file_name(name, output_folder)
 
     if full_path is None:
         return None
 
-    with open(full_path, "w", encoding="utf-8") as file:
-        file.write(page_out)
-    LOGGER.info("wrote %s.html", name)
+    if bundle is not None and bundled is not None:
+        changed = bundle.copy(bundled, full_path, output_folder)
+    else:
+        pieces = stream_render(title, doc, name)
+        changed = output_files.write_text(full_path, pieces if record is None else profiling.timed(pieces, record))
+    if profile is not None and record is not None:
+        record.seconds["write"] = time.perf_counter() - started - record.seconds["render"]
+        profile.end(record, full_path)
+    LOGGER.info("wrote %s.html" if changed else "unchanged %s.html", name)
+    index = search_index.INDEX
+    if index is not None and (bundled is not None or isinstance(doc, ModuleDoc)):
+        url = os.path.basename(full_path)
+        index.add(url, bundled.entries if bundled is not None else search_index.entries(url, cast(ModuleDoc, doc)))
+    if manifest is not None:
+        manifest.record(name, full_path, mentioned, linked)
     return full_path
     # except (ImportError, ErrorDuringImport) as value:
     #     print(value)
     # return ""
 
 
+def inspect_one(
+    thing: Union[TypeLike, str],
+    force_load: bool = False,
+    want_links: bool = False,
+) -> Inspected | None:
+    """Import and inspect a thing, None if it can't be imported.
+
+    Returns its name, page title, model, the modules it mentions and, if
+    wanted, the modules whose changes would show up on its page.
+    """
+    record = profiling.PROFILE.current if profiling.PROFILE is not None else None
+    started = time.perf_counter() if record is not None else 0.0
+    try:
+        the_object, name = resolve(thing, force_load)
+    except (ImportError, ImportTimeError):
+        return None
+    finally:
+        if record is not None:
+            record.seconds["import"] = time.perf_counter() - started
+
+    # collect this page's mentions on their own, they are its dependencies
+    outer_mentions = settings.MENTIONED_MODULES
+    settings.MENTIONED_MODULES = set()
+    try:
+        with installed(the_object):
+            title = describe(the_object)
+            doc = build(the_object, name)
+    finally:
+        page_mentions = settings.MENTIONED_MODULES
+        settings.MENTIONED_MODULES = outer_mentions
+        outer_mentions.update(page_mentions)
+    mentioned = [(getattr(module, "__name__", link_name), link_name) for module, link_name in page_mentions]
+    linked = incremental.linked_modules(the_object, mentioned) if want_links else []
+    return name, title, doc, mentioned, linked
+
+
 def calculate_file_name(name: str, output_folder: str) -> str | None:
     """Returns name. If this was written, what would its name be. Returns None for degenerate names."""
     name = (
@@ -86,6 +210,24 @@ def modules_in_current() -> list[str]:
     return found
 
 
+def document_many(
+    things: list[Union[TypeLike, str]],
+    output_folder: str,
+) -> list[str]:
+    """Document each thing, in worker processes if `settings.JOBS` allows it."""
+    if settings.JOBS > 1 and len(things) > 1:
+        from pydoc_fork.parallel import document_in_pool
+
+        return document_in_pool(things, output_folder, settings.JOBS)
+
+    written: list[str] = []
+    for thing in things:
+        full_path = document_one(thing, output_folder)
+        if full_path:
+            written.append(full_path)
+    return written
+
+
 def write_docs_per_module(
     modules: list[str],
     output_folder: str,
@@ -99,21 +241,20 @@ def write_docs_per_module(
     # This is going to handle filesystem paths, e.g. ./module/submodule.py
     # There will be ANOTHER method to handle MODULE paths, e.g. module.submodule"
     # Attempting to mix these two types is a bad idea.
-    written: list[str] = []
+    things: list[Union[TypeLike, str]] = []
     for module in modules:
         # file
         if module.lower().endswith(".py"):
-            full_path = document_one(module[:-3], output_folder)
-            if full_path:
-                written.append(full_path)
+            things.append(module[:-3])
         else:
-            full_path = document_one(module, output_folder)
-            if full_path:
-                written.append(full_path)
+            things.append(module)
             # "." needs to mean pwd... does it?
-            full_paths = document_directory(".", output_folder, for_only=module)
-            written.extend(full_paths)
+            things.extend(modules_in_directory(".", for_only=module))
+    # a package is in its own walk, and packages can be asked for twice, a page
+    # written twice would count as unchanged the second time
+    things = list(dict.fromkeys(things))
     # One pass, not ready to walk entire tree.
+    written = document_many(things, output_folder)
 
     third_party_written = write_docs_live_module(output_folder, 0, skip_if_written)
     written.extend(third_party_written)
@@ -125,54 +266,83 @@ def write_docs_live_module(
     total_third_party: int = 0,
     skip_if_written: bool = False,
 ) -> list[str]:
-    """Write out HTML documentation for all modules in a directory tree."""
+    """Write out HTML documentation for the modules the pages so far mentioned, best first."""
 
     # This is going to handle filesystem paths, e.g. ./module/submodule.py
     # There will be ANOTHER method to handle MODULE paths, e.g. module.submodule"
     # Attempting to mix these two types is a bad idea.
+    frontier = crawl.FRONTIER or crawl.start([])
+    budget = crawl.budget()
+    budget.modules_spent = total_third_party
     written: list[str] = []
-    while settings.MENTIONED_MODULES and total_third_party <= 100:
-        module = settings.MENTIONED_MODULES.pop()
-        thing, name = module  # destructure it
-        # should only be live modules or dot notation modules, not paths.
-        full_path = calculate_file_name(name, output_folder)
-        if full_path is None:
-            settings.MENTIONED_MODULES.discard(module)
-            continue
-        if os.path.exists(full_path) and skip_if_written:
-            settings.MENTIONED_MODULES.discard(module)
-        else:
-            actual_full_path = document_one(thing, output_folder)
-            total_third_party += 1
-            if actual_full_path:
-                written.append(actual_full_path)
-            settings.MENTIONED_MODULES.discard(module)
-
-    # TODO: make this a param
+    while not budget.exhausted():
+        pending = []
+        for name, thing, link_name in frontier.pending():
+            # should only be live modules or dot notation modules, not paths.
+            full_path = calculate_file_name(link_name, output_folder)
+            if full_path is None:
+                frontier.skip(name)
+                continue
+            if output_files.exists(full_path) and skip_if_written:
+                frontier.skip(name)
+                output_files.keep(full_path)
+                continue
+            pending.append((name, thing))
+        if not pending:
+            break
+        # Document the best few of what is mentioned so far, then rank again
+        # with what they mentioned. Waves don't depend on --jobs, so serial
+        # and parallel runs spend a budget on the same modules.
+        left = budget.modules_left()
+        wave = pending[: crawl.WAVE if left is None else min(crawl.WAVE, left)]
+        for name, _ in wave:
+            frontier.skip(name)
+        wave_written = document_many([thing for _, thing in wave], output_folder)
+        budget.spend(len(wave), wave_written)
+        written.extend(wave_written)
+
+    spent = budget.exhausted()
+    if spent:
+        unvisited = [name for name, _, _ in frontier.pending()]
+        if unvisited:
+            LOGGER.info("Crawl budget of %s spent, not documenting %s mentioned modules", spent, len(unvisited))
     return written
 
 
-def document_directory(
+def modules_in_directory(
     source_directory: str,
-    output_folder: str,
     for_only: str = "",
 ) -> list[str]:
-    """Write out HTML documentation for all modules in a directory tree."""
+    """Dot names of the modules in a directory tree, skipping __main__."""
     package_path = ""
     # walk packages is why pydoc drags along with it tests folders
-    LOGGER.debug("document_directory: Walking packages for %s", source_directory)
-
-    full_paths: list[str] = []
-    for _, modname, _ in pkgutil.walk_packages([source_directory], package_path):
+    LOGGER.debug("modules_in_directory: Walking packages for %s", source_directory)
+
+    if settings.STATIC:
+        found = walk_packages_statically([source_directory], package_path)
+    else:
+        found = (
+            (modname, is_package) for _, modname, is_package in pkgutil.walk_packages([source_directory], package_path)
+        )
+    modnames: list[str] = []
+    for modname, _ in found:
         if not str(modname).startswith(for_only):
             continue
         if str(modname).endswith(".__main__") or modname == "__main__":
             continue
-        LOGGER.debug("document_directory: current module: %s)", modname)
-        full_path = document_one(modname, output_folder)
-        if full_path:
-            full_paths.append(full_path)
-    return full_paths
+        LOGGER.debug("modules_in_directory: current module: %s)", modname)
+        modnames.append(modname)
+    return modnames
+
+
+def document_directory(
+    source_directory: str,
+    output_folder: str,
+    for_only: str = "",
+) -> list[str]:
+    """Write out HTML documentation for all modules in a directory tree."""
+    things: list[Union[TypeLike, str]] = list(modules_in_directory(source_directory, for_only))
+    return document_many(things, output_folder)
 
 
 def process_path_or_dot_name(
@@ -194,27 +364,54 @@ def process_path_or_dot_name(
     """
     LOGGER.debug("process_path_or_dot_name for %s and writing to %s", files, output_folder)
 
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-
-    from pydoc_fork.reporter.themes import get_theme_css
-
-    base_style_path = locate_file("templates/style.css", __file__)
-    with open(base_style_path, encoding="utf-8") as f:
-        base_style = f.read()
-
-    # Replace :root block with theme-specific variables
-    import re
-
-    theme_vars = get_theme_css(settings.THEME)
-    new_style = re.sub(r":root\s*{[^}]*}", theme_vars, base_style, flags=re.MULTILINE)
-
-    with open(os.path.join(output_folder, "style.css"), "w", encoding="utf-8") as f:
-        f.write(new_style)
+    output_files.start(output_folder, settings.OUTPUT_ARCHIVE)
+    try:
+        return _document_and_finish(files, output_folder, overwrite_existing)
+    finally:
+        # a failed run skipped the writes, don't leave its state to the next run in this process
+        search_index.discard()
+        incremental.discard()
+        model_cache.discard()
+        lookups.finish()
+        crawl.finish()
+        stdlib_bundle.finish()
+        profiling.discard()
+        precompress.discard()
+        theme_variants.finish()
+        output_files.discard()
+
+
+def _document_and_finish(files: list[str], output_folder: str, overwrite_existing: bool) -> list[str]:
+    """Document everything, then write the index, search, inventory, manifest and profile."""
+    # "." grows into the modules it stands for
+    requested = list(files)
+    precompress.start()
+    output_folder = theme_variants.start(output_folder)
 
     _adjust_cli_sys_path()
 
-    written = write_docs_per_module(files, output_folder, skip_if_written=not overwrite_existing)
+    if settings.INCREMENTAL and output_files.archiving():
+        LOGGER.warning("Incremental builds compare against the output folder, ignored with an output archive")
+    elif settings.INCREMENTAL:
+        incremental.start(output_folder)
+    if settings.CACHE:
+        model_cache.start()
+    lookups.start()
+    crawl.start(files)
+    stdlib_bundle.start()
+    search_index.start()
+    inventory.start()
+    profiling.start()
+    # pick up --cache-dir, --no-cache and templates set after import
+    refresh_loader()
+    try:
+        written = write_docs_per_module(files, output_folder, skip_if_written=not overwrite_existing)
+    finally:
+        if settings.JOBS > 1:
+            from pydoc_fork.parallel import shutdown_pool
+
+            shutdown_pool()
+        shutdown_worker()
 
     if settings.GENERATE_INDEX:
         from pydoc_fork.reporter.format_page import docindex, page
@@ -222,18 +419,26 @@ def process_path_or_dot_name(
         index_modules = []
         unique_basenames = sorted(list(set(os.path.basename(path) for path in written)))
         for basename in unique_basenames:
-            if basename in ("style.css", "index.html"):
+            if basename == "index.html":
                 continue
             module_name = basename[:-5]  # remove .html
             index_modules.append({"name": module_name, "url": basename})
 
         index_content = docindex(index_modules)
         index_html = page("Index", index_content)
-        with open(os.path.join(output_folder, "index.html"), "w", encoding="utf-8") as f:
-            f.write(index_html)
+        output_files.write_text(os.path.join(output_folder, "index.html"), [index_html])
         LOGGER.info("wrote index.html")
         written.append(os.path.join(output_folder, "index.html"))
 
+    if settings.INVENTORY and search_index.INDEX is not None:
+        inventory.write(output_folder, search_index.INDEX.pages)
+    search_index.finish(output_folder)
+    incremental.finish()
+    model_cache.finish()
+    profiling.finish()
+    precompress.finish()
+    output_files.prune(output_folder, requested)
+    output_files.finish()
     return written
 
 
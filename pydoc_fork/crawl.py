@@ -0,0 +1,150 @@
+"""
+Which mentioned modules get documented, and in what order.
+
+Pages mention other modules, dependencies and the standard library among
+them, and those get documented too. Modules mentioned by more pages, closer
+to the requested ones or part of the same project go first, always in the
+same order, until a budget of modules, bytes or seconds runs out.
+"""
+
+import logging
+import time
+from collections import Counter
+from typing import Any
+
+from pydoc_fork import output_files, settings
+
+LOGGER = logging.getLogger(__name__)
+
+PRIORITIES = ("links", "depth", "owned")
+"""What the crawl goes by first, the other two break ties, then the name"""
+
+WAVE = 8
+"""Mentioned modules documented between rankings, the same for every --jobs so every run crawls the same modules"""
+
+FRONTIER: "CrawlFrontier | None" = None
+"""Crawl for the current run, None outside of a run."""
+
+
+def _module_name(thing: Any, link_name: str) -> str:
+    """Importable name of a mentioned module, which is what pages are named by."""
+    if isinstance(thing, str):
+        return thing
+    return str(getattr(thing, "__name__", link_name))
+
+
+class CrawlFrontier:
+    """Mentioned modules not documented yet, with how often and how far away they were mentioned."""
+
+    def __init__(self, requested: list[str], priority: str = "links") -> None:
+        """requested are the names asked for, their top level packages count as the project."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Crawl priority must be one of {', '.join(PRIORITIES)}, not {priority!r}")
+        self.priority = priority
+        self.owned = {name.split(".")[0] for name in requested if name not in (".", "")}
+        self.links: Counter[str] = Counter()
+        self.depth: dict[str, int] = {}
+        self.things: dict[str, tuple[Any, str]] = {}
+        self.done: set[str] = set()
+        self.recorded: set[str] = set()
+
+    def record(self, page: str, mentioned: list[tuple[str, str]]) -> None:
+        """A page got documented, count what it mentioned."""
+        self.done.add(page)
+        if page in self.recorded:
+            return
+        self.recorded.add(page)
+        depth = self.depth.get(page, 0) + 1
+        counted = {page}
+        for module_name, link_name in mentioned:
+            if module_name in counted:
+                continue
+            counted.add(module_name)
+            self.links[module_name] += 1
+            self.depth[module_name] = min(self.depth.get(module_name, depth), depth)
+            self.things.setdefault(module_name, (module_name, link_name))
+
+    def collect(self) -> None:
+        """Take mentions from settings.MENTIONED_MODULES, live modules are documented as they are."""
+        for thing, link_name in sorted(settings.MENTIONED_MODULES, key=lambda pair: (pair[1], str(pair[0]))):
+            name = _module_name(thing, link_name)
+            if not isinstance(thing, str) or name not in self.things:
+                self.things[name] = (thing, link_name)
+            self.depth.setdefault(name, 1)
+        settings.MENTIONED_MODULES.clear()
+
+    def sort_key(self, name: str) -> tuple[Any, ...]:
+        """Lower goes first."""
+        links = -self.links[name]
+        depth = self.depth.get(name, 1)
+        owned = 0 if name.split(".")[0] in self.owned else 1
+        if self.priority == "depth":
+            return depth, links, owned, name
+        if self.priority == "owned":
+            return owned, links, depth, name
+        return links, depth, owned, name
+
+    def pending(self) -> list[tuple[str, Any, str]]:
+        """Name, module and link name of everything mentioned but not documented, best first."""
+        self.collect()
+        names = sorted((name for name in self.things if name not in self.done), key=self.sort_key)
+        return [(name, *self.things[name]) for name in names]
+
+    def skip(self, name: str) -> None:
+        """Don't document this one, or not again."""
+        self.done.add(name)
+
+
+class CrawlBudget:
+    """How much of the crawl is left, None means no limit."""
+
+    def __init__(self, modules: int | None, max_bytes: int | None, seconds: float | None) -> None:
+        """The clock starts now."""
+        self.modules = modules
+        self.bytes = max_bytes
+        self.seconds = seconds
+        self.started = time.monotonic()
+        self.modules_spent = 0
+        self.bytes_spent = 0
+
+    def spend(self, attempted: int, written: list[str]) -> None:
+        """Some modules got documented, or at least tried."""
+        self.modules_spent += attempted
+        for full_path in written:
+            self.bytes_spent += output_files.size_of(full_path) or 0
+
+    def modules_left(self) -> int | None:
+        """How many more modules may be documented."""
+        return None if self.modules is None else max(0, self.modules - self.modules_spent)
+
+    def exhausted(self) -> str | None:
+        """Which budget ran out, if any."""
+        if self.modules is not None and self.modules_spent >= self.modules:
+            return f"{self.modules} modules"
+        if self.bytes is not None and self.bytes_spent >= self.bytes:
+            return f"{self.bytes} bytes"
+        if self.seconds is not None and time.monotonic() - self.started >= self.seconds:
+            return f"{self.seconds} seconds"
+        return None
+
+
+def start(requested: list[str]) -> CrawlFrontier:
+    """Begin the crawl for this run."""
+    global FRONTIER  # pylint: disable=global-statement
+    FRONTIER = CrawlFrontier(requested, settings.CRAWL_PRIORITY)
+    return FRONTIER
+
+
+def budget() -> CrawlBudget:
+    """The crawl's budget, as configured."""
+    return CrawlBudget(
+        settings.CRAWL_MAX_MODULES,
+        settings.CRAWL_MAX_BYTES,
+        settings.CRAWL_MAX_SECONDS,
+    )
+
+
+def finish() -> None:
+    """Forget about the crawl."""
+    global FRONTIER  # pylint: disable=global-statement
+    FRONTIER = None
@@ -0,0 +1,166 @@
+"""
+Incremental builds.
+
+A manifest in the output folder remembers, for each page, the hash of the
+module's source, the hashes of the modules the page links to and the hash of
+the page itself. On the next run a page is only re-rendered when one of those
+changed.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sys
+from typing import Any
+
+from pydoc_fork import assets, output_files, settings
+from pydoc_fork.__about__ import __version__
+from pydoc_fork.inspector.module_utils import source_hash
+
+LOGGER = logging.getLogger(__name__)
+
+MANIFEST_NAME = ".pydoc_fork_manifest.json"
+
+MANIFEST: "BuildManifest | None" = None
+"""Manifest for the current run, None when incremental builds are off."""
+
+
+def fingerprint() -> str:
+    """Everything besides source code that changes what a page looks like."""
+    relevant = [
+        __version__,
+        list(sys.version_info[:2]),
+        settings.DOCUMENT_INTERNALS,
+        settings.SKIP_MODULES,
+        settings.PREFER_DOCS_PYTHON_ORG,
+        settings.PYTHONDOCS,
+        settings.ONLY_NAMED_AND_SUBS,
+        settings.PROJECT_NAME,
+        settings.CUSTOM_TEMPLATES,
+        settings.SEARCH,
+        settings.INVENTORIES,
+        # unchanged pages aren't written, so they wouldn't get compressed copies
+        # nor copied to the folders of new themes
+        settings.PRECOMPRESS,
+        settings.THEMES,
+        # pages read from source instead of imported show less
+        settings.STATIC,
+        assets.names(),
+    ]
+    return hashlib.sha256(json.dumps(relevant, default=str).encode()).hexdigest()
+
+
+def file_hash(path: str) -> str | None:
+    """Hash a file on disk, None if it isn't there."""
+    try:
+        with open(path, "rb") as file:
+            return hashlib.sha256(file.read()).hexdigest()
+    except OSError:
+        return None
+
+
+class BuildManifest:
+    """What was rendered last time and from what."""
+
+    def __init__(self, output_folder: str) -> None:
+        """Load the manifest from the output folder, or start an empty one."""
+        self.path = os.path.join(output_folder, MANIFEST_NAME)
+        self.fingerprint = fingerprint()
+        self.entries: dict[str, dict[str, Any]] = {}
+        self._hashes: dict[str, str | None] = {}
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if data.get("fingerprint") == self.fingerprint:
+            self.entries = data.get("entries", {})
+        else:
+            LOGGER.info("Settings or versions changed, re-rendering everything")
+
+    def source_hash(self, name: str) -> str | None:
+        """Source hash of a module, once per run."""
+        if name not in self._hashes:
+            self._hashes[name] = source_hash(name)
+        return self._hashes[name]
+
+    def is_fresh(self, name: str, full_path: str) -> bool:
+        """True if the page on disk is what rendering this module again would produce."""
+        entry = self.entries.get(name)
+        if not entry or entry.get("source") is None:
+            return False
+        if self.source_hash(name) != entry["source"]:
+            return False
+        for linked_name, linked_hash in entry.get("links", {}).items():
+            if self.source_hash(linked_name) != linked_hash:
+                LOGGER.debug("%s is stale because %s changed", name, linked_name)
+                return False
+        return file_hash(full_path) == entry.get("page")
+
+    def mentioned(self, name: str) -> list[tuple[str, str]]:
+        """Modules the page mentioned when it was rendered."""
+        # json made the pairs lists
+        return [(pair[0], pair[1]) for pair in self.entries[name].get("mentioned", [])]
+
+    def record(
+        self,
+        name: str,
+        full_path: str,
+        mentioned: list[tuple[str, str]],
+        linked: list[str],
+    ) -> dict[str, Any]:
+        """Remember how a page was made."""
+        entry = {
+            "source": self.source_hash(name),
+            "links": {
+                linked_name: self.source_hash(linked_name) for linked_name in sorted(set(linked)) if linked_name != name
+            },
+            "page": file_hash(full_path),
+            "mentioned": sorted(mentioned),
+        }
+        self.entries[name] = entry
+        return entry
+
+    def save(self) -> None:
+        """Write the manifest next to the pages."""
+        data = {"fingerprint": self.fingerprint, "entries": self.entries}
+        output_files.write_text(self.path, [json.dumps(data, indent=1, sort_keys=True)])
+
+
+def linked_modules(the_object: Any, mentioned: list[tuple[str, str]]) -> list[str]:
+    """Names of modules whose changes could show up on this object's page.
+
+    That is whatever the page linked to, plus the modules that base classes
+    come from, since inherited members get rendered on the page too.
+    """
+    linked = {module_name for module_name, _ in mentioned}
+    for value in vars(the_object).values() if hasattr(the_object, "__dict__") else []:
+        if isinstance(value, type):
+            try:
+                mro = value.__mro__
+            except AttributeError:
+                continue
+            linked.update(base.__module__ for base in mro if isinstance(getattr(base, "__module__", None), str))
+    return sorted(linked)
+
+
+def start(output_folder: str) -> "BuildManifest":
+    """Load the manifest for this run."""
+    global MANIFEST  # pylint: disable=global-statement
+    MANIFEST = BuildManifest(output_folder)
+    return MANIFEST
+
+
+def finish() -> None:
+    """Save the manifest and forget about it."""
+    global MANIFEST  # pylint: disable=global-statement
+    if MANIFEST is not None:
+        MANIFEST.save()
+        MANIFEST = None
+
+
+def discard() -> None:
+    """Forget about the manifest without saving it, after a failed run."""
+    global MANIFEST  # pylint: disable=global-statement
+    MANIFEST = None
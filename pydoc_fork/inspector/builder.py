@@ -0,0 +1,406 @@
+"""
+Build the documentation model out of live objects.
+
+This is where all the inspecting happens. Noting down which modules a page
+mentions, for the crawl of third party modules, happens here too, because
+that is when the live module objects are at hand.
+"""
+
+import builtins
+import contextlib
+import inspect
+import logging
+import pkgutil
+import sys
+from collections import deque
+from typing import Any, Union, cast
+
+from pydoc_fork import inventory, settings
+from pydoc_fork.inspector import lookups
+from pydoc_fork.inspector.custom_types import TypeLike
+from pydoc_fork.inspector.model import (
+    AttributeSection,
+    ClassDoc,
+    ClassRef,
+    DataDoc,
+    Doc,
+    ModuleDoc,
+    ModuleRef,
+    RoutineDoc,
+    TreeEntry,
+)
+from pydoc_fork.inspector.module_utils import ImportTimeError, getdocloc
+from pydoc_fork.inspector.utils import (
+    _is_bound_method,
+    _split_list,
+    classify_class_attrs,
+    classify_module_members,
+    classname,
+    getdoc,
+    resolve,
+    sort_attributes,
+    visiblename,
+)
+from pydoc_fork.reporter.html_repr_class import html_repr
+
+LOGGER = logging.getLogger(__name__)
+
+ATTRIBUTE_KINDS = (
+    "method",
+    "class method",
+    "static method",
+    "readonly property",
+    "data descriptor",
+    "data",
+)
+"""Kinds of class attributes, in the order they are shown"""
+
+
+def build(
+    the_object: Any,
+    name: str = "",
+    mod: str = "",
+    class_object: TypeLike | None = None,
+) -> Doc:
+    """Build the model for any object, picking the builder by what it is.
+
+    mod is the module the object is shown in, class_object the class, if any.
+    """
+    # 'try' clause is to attempt to handle the possibility that inspect
+    # identifies something in a way that pydoc itself has issues handling;
+    # think 'super' and how it is a descriptor (which raises the exception
+    # by lacking a __name__ attribute) and an instance.
+    if inspect.ismodule(the_object):
+        return build_module(cast(TypeLike, the_object))
+    if inspect.isclass(the_object):
+        return build_class(cast(TypeLike, the_object), name, mod)
+    if inspect.isroutine(the_object):
+        return build_routine(cast(TypeLike, the_object), name, mod, class_object)
+    if inspect.isdatadescriptor(the_object):
+        return build_data(cast(TypeLike, the_object), name)
+    return build_other(the_object, name)
+
+
+def mention(module: Any, link_name: str) -> None:
+    """Remember a module got linked to, so it gets documented too."""
+    settings.MENTIONED_MODULES.add((module, link_name))
+
+
+def class_ref(the_object: Union[TypeLike, type], modname: str) -> ClassRef:
+    """Refer to a class, as seen from the module modname."""
+    if the_object.__module__ not in sys.modules:
+        # it gets a link once its module is imported
+        return _class_ref(the_object, modname)
+    return cast(
+        ClassRef, lookups.LOOKUPS.get("class_ref", the_object, lambda: _class_ref(the_object, modname), modname)
+    )
+
+
+def _class_ref(the_object: Union[TypeLike, type], modname: str) -> ClassRef:
+    """Work out how to refer to a class."""
+    name, module = the_object.__name__, sys.modules.get(the_object.__module__)
+    url = inventory.external_url(f"{the_object.__module__}.{name}")
+    if url is None and module is not None and hasattr(module, name) and getattr(module, name) is the_object:
+        url = f"{module.__name__}.html#{name}"
+    return ClassRef(name, the_object.__module__, classname(the_object, modname), url)
+
+
+def module_ref(the_object: TypeLike) -> ModuleRef:
+    """Refer to a module, prefer another project's docs, then the official docs for the standard library."""
+    external = inventory.external_url(the_object.__name__)
+    if external is not None:
+        # documented elsewhere, no need to document it here
+        return ModuleRef(the_object.__name__, external)
+    url = f"{the_object.__name__}.html"
+    internet_link = getdocloc(the_object)
+
+    if internet_link and settings.PREFER_DOCS_PYTHON_ORG:
+        url = internet_link
+    # BUG: doesn't take into consideration an alternate base
+    if not internet_link:
+        mention(the_object, the_object.__name__)
+    return ModuleRef(the_object.__name__, url)
+
+
+def package_ref(name: str, path: str, is_package: bool) -> ModuleRef:
+    """Refer to a module in a package, name is relative to the package at path."""
+    try:
+        mention(resolve(path + "." + name)[0], name)
+    except (ImportTimeError, ImportError):
+        LOGGER.warning("Can't import %s, won't doc", name)
+    url = f"{path}.{name}.html" if path else f"{name}.html"
+    return ModuleRef(name, url, is_package)
+
+
+def build_module(the_object: TypeLike) -> ModuleDoc:
+    """Inspect a module object."""
+    name = the_object.__name__
+    result = ModuleDoc(name)
+
+    try:
+        all_things = None if settings.DOCUMENT_INTERNALS else the_object.__all__
+    except AttributeError:
+        all_things = None
+    try:
+        result.file = inspect.getabsfile(cast(type, the_object))
+    except TypeError:
+        result.file = None
+    # TODO: Include the rest of the meta data
+    if hasattr(the_object, "__version__"):
+        version = str(the_object.__version__)
+        if version[:11] == "$" + "Revision: " and version[-1:] == "$":
+            version = version[11:-1].strip()
+        result.version = version
+    if hasattr(the_object, "__date__"):
+        result.date = str(the_object.__date__)
+    result.doc_location = getdocloc(the_object)
+
+    # this will get `import foo` but ignore `from foo import bar`
+    # And bar gets no doc string love either!
+    all_modules, all_classes, all_routines, all_data = classify_module_members(the_object)
+    modules = [(key, value) for key, value in all_modules if key not in settings.SKIP_MODULES]
+    modules_by_import_from: dict[str, Any] = {}
+    classes: list[tuple[str, type[Any]]] = []
+    class_links = result.class_links
+    for key, value in all_classes:
+        _class_module = lookups.getmodule(value)
+        if _class_module and _class_module is not the_object and _class_module.__name__ not in settings.SKIP_MODULES:
+            modules_by_import_from[_class_module.__name__] = _class_module
+            mention(_class_module, _class_module.__name__)
+        # if __all__ exists, believe it.  Otherwise use old heuristic.
+        if (
+            # TODO put doc internals switch here
+            # all_things is not None or
+            (_class_module or the_object) is the_object
+            and visiblename(key, all_things, the_object)
+        ):
+            classes.append((key, value))
+            class_links[key] = "#" + key
+    for key, value in classes:
+        for base in value.__bases__:
+            key, modname = base.__name__, base.__module__
+            module = sys.modules.get(modname)
+            if (
+                modname != name
+                and module
+                and hasattr(module, key)
+                and getattr(module, key) is base
+                and key not in class_links
+            ):
+                class_links[key] = modname + ".html#" + key
+    funcs: list[tuple[str, Any]] = []
+    for key, routine in all_routines:
+        # if __all__ exists, believe it.  Otherwise use old heuristic.
+        _func_module = lookups.getmodule(routine)
+        # why does this sometimes return no module?
+        if _func_module and _func_module is not the_object and _func_module.__name__ not in settings.SKIP_MODULES:
+            modules_by_import_from[_func_module.__name__] = _func_module
+            mention(_func_module, _func_module.__name__)
+        if visiblename(key, all_things, the_object):
+            funcs.append((key, routine))
+            result.function_links[key] = "#-" + key
+    data: list[tuple[str, Any]] = []
+    for key, value in all_data:
+        # visibility first, it is much cheaper than finding the module
+        if not visiblename(key, all_things, the_object):
+            continue
+        value_module = lookups.getmodule(type(value))
+        if value_module and value_module.__name__ in settings.SKIP_MODULES:
+            continue
+        data.append((key, value))
+
+    result.doc = getdoc(the_object)
+
+    if hasattr(the_object, "__path__"):
+        module_packages = []
+        for _, modname, is_package in pkgutil.iter_modules(the_object.__path__):
+            if modname not in settings.SKIP_MODULES and modname != "__main__":
+                module_packages.append((modname, is_package))
+        module_packages.sort()
+        result.package_contents = [package_ref(modname, name, is_package) for modname, is_package in module_packages]
+    else:
+        result.modules = [module_ref(value) for _, value in modules]
+
+    # sorted, because set order would make the page differ from run to run
+    result.from_modules = [module_ref(module) for _, module in sorted(modules_by_import_from.items())]
+
+    if classes:
+        # MR: boolean type safety
+        result.class_tree = build_tree(inspect.getclasstree([value for _, value in classes], True), name)
+        result.classes = [build(value, key, name) for key, value in classes]
+    result.functions = [build(value, key, name) for key, value in funcs]
+    result.data = [build(value, key) for key, value in data]
+    if hasattr(the_object, "__author__"):
+        result.author = str(the_object.__author__)
+    if hasattr(the_object, "__credits__"):
+        result.credits = str(the_object.__credits__)
+    return result
+
+
+def build_tree(tree: list[Any], modname: str, parent: Any | None = None) -> list[TreeEntry]:
+    """Class inheritance, from what inspect.getclasstree() returns."""
+    entries: list[TreeEntry] = []
+    for entry in tree:
+        class_object = entry
+        if isinstance(entry, tuple):
+            class_object, bases = entry
+            shown_bases = None
+            if bases and bases != (parent,):
+                shown_bases = [class_ref(base, modname) for base in bases]
+            entries.append(TreeEntry(class_ref(class_object, modname), shown_bases))
+        elif isinstance(entry, list) and entries:
+            entries[-1].children = build_tree(entry, modname, class_object)
+    return entries
+
+
+# noinspection PyBroadException
+def build_class(
+    the_object: TypeLike,
+    name: str = "",
+    mod: str = "",
+) -> ClassDoc:
+    """Inspect a class object, its own and its inherited attributes."""
+    real_name = the_object.__name__
+    name = name or real_name
+
+    mro = deque(lookups.getmro(cast(type, the_object)))
+    # List the mro, if non-trivial.
+    shown_mro = [class_ref(base, the_object.__module__) for base in mro] if len(mro) > 2 else []
+
+    attrs = [
+        (name, kind, cls, value)
+        for name, kind, cls, value in classify_class_attrs(the_object)
+        if visiblename(name, obj=the_object)
+    ]
+
+    # Only ever looked up by name, but a string valued attribute
+    # also links to the attribute holding it.
+    method_links: dict[str, str] = {}
+    for key, _, _, value in attrs:
+        method_links[key] = anchor = "#" + name + "-" + key
+        with contextlib.suppress(Exception):
+            value = getattr(the_object, key)
+        if isinstance(value, str):
+            method_links[value] = anchor
+
+    sections: list[AttributeSection] = []
+    while attrs:
+        this_class = mro.popleft() if mro else attrs[0][2]
+
+        attrs, inherited = _split_list(
+            attrs, lambda t: t[2] is this_class  # noqa: B023  # pylint: disable=cell-var-from-loop
+        )
+
+        if the_object is not builtins.object and this_class is builtins.object:
+            attrs = inherited
+            continue
+        defined_by = None if this_class is the_object else class_ref(this_class, the_object.__module__)
+
+        sort_attributes(attrs, the_object)
+
+        # Pump out the attrs, segregated by kind.
+        for kind in ATTRIBUTE_KINDS:
+            ok, attrs = _split_list(attrs, lambda t: t[1] == kind)  # noqa: B023  # pylint: disable=cell-var-from-loop
+            if ok:
+                members = [_build_attribute(the_object, kind, attribute, value, mod) for attribute, _, _, value in ok]
+                sections.append(AttributeSection(kind, defined_by, members))
+        assert not attrs  # nosec
+        attrs = inherited
+
+    signature_text = None
+    try:
+        signature = inspect.signature(cast(Any, the_object))
+    except (ValueError, TypeError):
+        signature = None
+    if signature:
+        argument_specification = str(signature)
+        if argument_specification and argument_specification != "()":
+            signature_text = argument_specification
+
+    return ClassDoc(
+        name=name,
+        real_name=real_name,
+        bases=[class_ref(base_class, the_object.__module__) for base_class in the_object.__bases__ or []],
+        mro=shown_mro,
+        signature=signature_text,
+        doc=getdoc(the_object),
+        method_links=method_links,
+        sections=sections,
+    )
+
+
+def _build_attribute(the_object: TypeLike, kind: str, name: str, value: Any, mod: str) -> Doc:
+    """One class attribute, value is what classify_class_attrs found."""
+    if kind in ("readonly property", "data descriptor"):
+        return build_data(value, name)
+    if kind == "data":
+        return DataDoc(name, getdoc(value), html_repr(getattr(the_object, name)))
+    # noinspection PyBroadException
+    try:
+        value = getattr(the_object, name)
+    except Exception:  # nosec
+        # Some descriptors may meet a failure in their __get__.
+        # (bug #1785)
+        return build_data(value, name)
+    return build(value, name, mod, the_object)
+
+
+def build_routine(
+    the_object: TypeLike,
+    name: str = "",
+    mod: str = "",
+    class_object: TypeLike | None = None,
+) -> RoutineDoc:
+    """Inspect a function or method object."""
+    # AttributeError: 'cached_property' object has no attribute '__name__'
+    try:
+        maybe_real_name = the_object.__name__
+    except AttributeError:
+        maybe_real_name = None
+    real_name = maybe_real_name if isinstance(maybe_real_name, str) else None
+    name = name or real_name or "<unnamed>"
+    result = RoutineDoc(name, real_name, ((class_object and class_object.__name__) or "") + "-" + name)
+
+    if _is_bound_method(the_object):
+        imported_class = the_object.__self__.__class__
+        if class_object:
+            if imported_class is not class_object:
+                result.note_kind, result.note_class = "from", class_ref(imported_class, mod)
+        elif the_object.__self__ is not None:
+            result.note_kind, result.note_class = "instance", class_ref(the_object.__self__.__class__, mod)
+        else:
+            result.note_kind, result.note_class = "unbound", class_ref(imported_class, mod)
+
+    result.is_async = inspect.iscoroutinefunction(the_object) or inspect.isasyncgenfunction(the_object)
+
+    if (
+        name != real_name
+        and class_object
+        and real_name is not None
+        and inspect.getattr_static(class_object, real_name, []) is the_object
+    ):
+        result.alias_anchor = f"#{class_object.__name__}-{real_name}"
+
+    if inspect.isroutine(the_object):
+        signature: inspect.Signature | None = None
+        try:
+            signature = inspect.signature(the_object)
+        except RuntimeError as what_happened:
+            LOGGER.warning("RuntimeError: %s", what_happened)
+        except Exception:  # nosec
+            pass
+        if signature:
+            result.signature = str(signature)
+
+    result.doc = getdoc(the_object)
+    return result
+
+
+def build_data(the_object: TypeLike, name: str = "") -> DataDoc:
+    """Inspect a data descriptor."""
+    return DataDoc(name, getdoc(the_object))
+
+
+def build_other(the_object: TypeLike, name: str = "") -> DataDoc:
+    """Anything else, shown by its value."""
+    return DataDoc(name, value_repr=html_repr(the_object))
@@ -0,0 +1,102 @@
+"""
+Run scoped memo of inspect lookups.
+
+The same classes and functions turn up on page after page, object, Exception
+and Enum on nearly every one. Which module they live in, their MRO and how
+they are referred to is worked out once per run.
+
+Entries are keyed by object identity, with a weakref where the object allows
+one, so entries go away with their object. Objects that can't be weakly
+referenced are kept alive until the run ends, so their id can't be reused.
+"""
+
+import inspect
+import logging
+import weakref
+from collections import Counter
+from collections.abc import Callable
+from typing import Any
+
+LOGGER = logging.getLogger(__name__)
+
+
+class LookupCache:
+    """Results of lookups on objects, by kind, object identity and an optional extra key."""
+
+    def __init__(self) -> None:
+        """Set up, empty"""
+        self._entries: dict[int, dict[tuple[str, str], Any]] = {}
+        self._holds: dict[int, Any] = {}
+        self.hits: Counter[str] = Counter()
+        self.misses: Counter[str] = Counter()
+
+    def get(self, kind: str, the_object: Any, compute: Callable[[], Any], extra: str = "") -> Any:
+        """The result of compute() for this object, computed the first time it is asked for.
+
+        None is not remembered, lookups that find nothing may find something
+        once more modules are imported.
+        """
+        identity = id(the_object)
+        entries = self._entries.get(identity)
+        if entries is not None and (kind, extra) in entries:
+            self.hits[kind] += 1
+            return entries[(kind, extra)]
+        self.misses[kind] += 1
+        value = compute()
+        if value is None:
+            return value
+        if entries is None:
+            entries = self._entries[identity] = {}
+            self._hold(the_object)
+        entries[(kind, extra)] = value
+        return value
+
+    def _hold(self, the_object: Any) -> None:
+        """Forget an object's entries when it goes away, or keep it around if it can't tell us."""
+        identity = id(the_object)
+        try:
+            self._holds[identity] = weakref.ref(the_object, lambda _: self._forget(identity))
+        except TypeError:
+            self._holds[identity] = the_object
+
+    def _forget(self, identity: int) -> None:
+        """Drop the entries of an object that was garbage collected."""
+        self._entries.pop(identity, None)
+        self._holds.pop(identity, None)
+
+    def report(self) -> str:
+        """Hit rates, one per kind of lookup."""
+        kinds = sorted(set(self.hits) | set(self.misses))
+        return ", ".join(
+            f"{kind} {self.hits[kind]} hits {self.misses[kind]} misses "
+            f"({100 * self.hits[kind] // max(1, self.hits[kind] + self.misses[kind])}%)"
+            for kind in kinds
+        )
+
+
+LOOKUPS = LookupCache()
+"""Lookups for the current run"""
+
+
+def getmodule(the_object: Any) -> Any:
+    """inspect.getmodule, once per object per run."""
+    return LOOKUPS.get("getmodule", the_object, lambda: inspect.getmodule(the_object))
+
+
+def getmro(the_object: type) -> tuple[type, ...]:
+    """inspect.getmro, once per class per run."""
+    # the class itself isn't kept, that would keep it alive
+    return (the_object, *LOOKUPS.get("getmro", the_object, lambda: inspect.getmro(the_object)[1:]))
+
+
+def start() -> LookupCache:
+    """Forget lookups from an earlier run."""
+    global LOOKUPS  # pylint: disable=global-statement
+    LOOKUPS = LookupCache()
+    return LOOKUPS
+
+
+def finish() -> None:
+    """Log how well the lookups were reused."""
+    if LOOKUPS.hits or LOOKUPS.misses:
+        LOGGER.info("Lookups: %s", LOOKUPS.report())
@@ -0,0 +1,258 @@
+"""
+Intermediate model of whatever got inspected.
+
+The inspector builds these once from live objects, the reporter turns them
+into HTML. Nothing in here holds on to a live object, only strings, flags and
+other model nodes, so a model can outlive the import that produced it.
+
+Doc strings are kept raw, turning them into markup happens at render time
+because linking names depends on where the doc is shown.
+"""
+
+from typing import Any, Union
+
+
+class DocNode:
+    """Base for model nodes, compares and prints by its slots."""
+
+    __slots__: tuple[str, ...] = ()
+
+    def __eq__(self, other: object) -> bool:
+        """Same type, same slot values"""
+        if type(self) is not type(other):
+            return NotImplemented
+        return all(getattr(self, slot) == getattr(other, slot) for slot in self.__slots__)
+
+    def __hash__(self) -> int:
+        """Nodes are mutable while being built, so hash like an object"""
+        return id(self)
+
+    def __repr__(self) -> str:
+        """For debugging and test failures"""
+        fields = ", ".join(f"{slot}={getattr(self, slot)!r}" for slot in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class ClassRef(DocNode):
+    """A class as mentioned from somewhere else, e.g. a base class."""
+
+    __slots__ = ("module", "name", "text", "url")
+
+    def __init__(self, name: str, module: str, text: str, url: str | None = None) -> None:
+        """text is the name as shown from where it is mentioned, url is None if it can't be linked"""
+        self.name = name
+        self.module = module
+        self.text = text
+        self.url = url
+
+
+class ModuleRef(DocNode):
+    """A module as mentioned from another module."""
+
+    __slots__ = ("is_package", "name", "url")
+
+    def __init__(self, name: str, url: str, is_package: bool = False) -> None:
+        """Set up"""
+        self.name = name
+        self.url = url
+        self.is_package = is_package
+
+
+class TreeEntry(DocNode):
+    """One class in a class tree, with the classes deriving from it."""
+
+    __slots__ = ("bases", "children", "cls")
+
+    def __init__(
+        self,
+        cls: ClassRef,
+        bases: list[ClassRef] | None = None,
+        children: list["TreeEntry"] | None = None,
+    ) -> None:
+        """bases is None when they are obvious from the tree"""
+        self.cls = cls
+        self.bases = bases
+        self.children = children or []
+
+
+class DataDoc(DocNode):
+    """A data descriptor, or any other value.
+
+    value_repr is None for data descriptors, they have no value to show.
+    """
+
+    __slots__ = ("doc", "name", "value_repr")
+
+    def __init__(self, name: str, doc: str = "", value_repr: str | None = None) -> None:
+        """Set up"""
+        self.name = name
+        self.doc = doc
+        self.value_repr = value_repr
+
+
+class RoutineDoc(DocNode):
+    """A function or method."""
+
+    __slots__ = (
+        "alias_anchor",
+        "anchor",
+        "doc",
+        "is_async",
+        "name",
+        "note_class",
+        "note_kind",
+        "real_name",
+        "signature",
+    )
+
+    def __init__(
+        self,
+        name: str,
+        real_name: str | None,
+        anchor: str,
+        doc: str = "",
+        signature: str | None = None,
+        is_async: bool = False,
+        note_kind: str = "",
+        note_class: ClassRef | None = None,
+        alias_anchor: str | None = None,
+    ) -> None:
+        """
+        note_kind is "from", "instance" or "unbound" for methods bound to
+        note_class. alias_anchor links an alias to the method it is an alias of.
+        """
+        self.name = name
+        self.real_name = real_name
+        self.anchor = anchor
+        self.doc = doc
+        self.signature = signature
+        self.is_async = is_async
+        self.note_kind = note_kind
+        self.note_class = note_class
+        self.alias_anchor = alias_anchor
+
+
+class AttributeSection(DocNode):
+    """Attributes of one kind that a class defines or inherits from one base."""
+
+    __slots__ = ("defined_by", "kind", "members")
+
+    def __init__(
+        self,
+        kind: str,
+        defined_by: ClassRef | None,
+        members: list["Doc"],
+    ) -> None:
+        """kind as in classify_class_attrs, defined_by is None if defined by the class itself"""
+        self.kind = kind
+        self.defined_by = defined_by
+        self.members = members
+
+
+class ClassDoc(DocNode):
+    """A class and its attributes, grouped by where they come from."""
+
+    __slots__ = ("bases", "doc", "method_links", "mro", "name", "real_name", "sections", "signature")
+
+    def __init__(
+        self,
+        name: str,
+        real_name: str,
+        bases: list[ClassRef],
+        mro: list[ClassRef],
+        signature: str | None,
+        doc: str,
+        method_links: dict[str, str],
+        sections: list[AttributeSection],
+    ) -> None:
+        """mro is empty when trivial"""
+        self.name = name
+        self.real_name = real_name
+        self.bases = bases
+        self.mro = mro
+        self.signature = signature
+        self.doc = doc
+        self.method_links = method_links
+        self.sections = sections
+
+
+class ModuleDoc(DocNode):
+    """A module or package."""
+
+    __slots__ = (
+        "author",
+        "class_links",
+        "class_tree",
+        "classes",
+        "credits",
+        "data",
+        "date",
+        "doc",
+        "doc_location",
+        "file",
+        "from_modules",
+        "function_links",
+        "functions",
+        "modules",
+        "name",
+        "package_contents",
+        "version",
+    )
+
+    def __init__(self, name: str) -> None:
+        """Everything but the name gets filled in by the builder"""
+        self.name = name
+        self.file: str | None = None
+        self.version: str | None = None
+        self.date: str | None = None
+        self.doc_location: str | None = None
+        self.doc = ""
+        self.function_links: dict[str, str] = {}
+        self.class_links: dict[str, str] = {}
+        self.package_contents: list[ModuleRef] | None = None
+        self.modules: list[ModuleRef] = []
+        self.from_modules: list[ModuleRef] = []
+        self.class_tree: list[TreeEntry] = []
+        self.classes: list[Doc] = []
+        self.functions: list[Doc] = []
+        self.data: list[Doc] = []
+        self.author: str | None = None
+        self.credits: str | None = None
+
+
+Doc = Union[ModuleDoc, ClassDoc, RoutineDoc, DataDoc]
+"""Anything the builder can make out of an object"""
+
+NODE_TYPES: dict[str, type[DocNode]] = {
+    node_type.__name__: node_type
+    for node_type in (ClassRef, ModuleRef, TreeEntry, DataDoc, RoutineDoc, AttributeSection, ClassDoc, ModuleDoc)
+}
+
+
+def to_data(node: Any) -> Any:
+    """Turn a model into plain data that json can write, from_data turns it back."""
+    if isinstance(node, DocNode):
+        data = {slot: to_data(getattr(node, slot)) for slot in node.__slots__}
+        data["__node__"] = type(node).__name__
+        return data
+    if isinstance(node, list):
+        return [to_data(item) for item in node]
+    if isinstance(node, dict):
+        # link maps, name to url
+        return {"__dict__": node}
+    return node
+
+
+def from_data(data: Any) -> Any:
+    """Rebuild a model from what to_data made of it."""
+    if isinstance(data, list):
+        return [from_data(item) for item in data]
+    if isinstance(data, dict):
+        if "__dict__" in data:
+            return data["__dict__"]
+        node_type = NODE_TYPES[data["__node__"]]
+        node = node_type.__new__(node_type)
+        for slot in node_type.__slots__:
+            setattr(node, slot, from_data(data[slot]))
+        return node
+    return data
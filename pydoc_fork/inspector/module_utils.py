@@ -3,6 +3,7 @@ Module Manipulation
 """
 
 import builtins
+import hashlib
 
 # noinspection PyProtectedMember
 import importlib._bootstrap
@@ -12,14 +13,19 @@ import importlib._bootstrap_external
 import importlib.abc
 import importlib.machinery
 import importlib.util
+import inspect
 import logging
 import os
+import pkgutil
 import sys
+import sysconfig
 from typing import Any, cast
 
+from pydoc_fork import settings
 from pydoc_fork.inspector.custom_types import TypeLike
 
 LOGGER = logging.getLogger(__name__)
+STDLIB_BASEDIR = cast(str, sysconfig.get_path("stdlib"))
 
 
 class ImportTimeError(Exception):
@@ -151,6 +157,11 @@ def locate(path: str, force_load: bool = False) -> Any:
         path = path.replace("-", "_")
 
     LOGGER.debug("locate(): locating %s", path)
+    if settings.STATIC:
+        # circular ref
+        from pydoc_fork.inspector.static_module import locate_static
+
+        return locate_static(path)
     parts = [part for part in path.split(".") if part]
 
     module, index = None, 0
@@ -175,3 +186,84 @@ def locate(path: str, force_load: bool = False) -> Any:
             LOGGER.debug("locate(): Don't think this is a module %s", the_object)
             return None
     return the_object
+
+
+def find_spec_quietly(name: str) -> importlib.machinery.ModuleSpec | None:
+    """Find where a module lives without running it or its parent packages.
+
+    Returns None for builtins and anything not found on sys.path.
+    """
+    module = sys.modules.get(name)
+    spec = getattr(module, "__spec__", None)
+    if spec is not None and spec.has_location:
+        return spec
+    path = None
+    parts = name.split(".")
+    for index in range(len(parts)):
+        try:
+            spec = importlib.machinery.PathFinder.find_spec(".".join(parts[: index + 1]), path)
+        except (ImportError, ValueError):
+            return None
+        if spec is None:
+            return None
+        path = spec.submodule_search_locations
+        if path is None and index < len(parts) - 1:
+            return None
+    return spec
+
+
+def source_hash(name: str) -> str | None:
+    """Hash a module's source file, plus the submodule names if it is a package.
+
+    None means there is nothing on disk to hash, e.g. builtins.
+    """
+    spec = find_spec_quietly(name)
+    if spec is None or not spec.has_location or not spec.origin or not os.path.isfile(spec.origin):
+        return None
+    digest = hashlib.sha256()
+    with open(spec.origin, "rb") as file:
+        digest.update(file.read())
+    if spec.submodule_search_locations:
+        # adding or removing a submodule changes the package's page
+        for _, modname, is_package in pkgutil.iter_modules(spec.submodule_search_locations):
+            digest.update(f"\0{modname}:{is_package}".encode())
+    return digest.hexdigest()
+
+
+KNOWN_STDLIB = ("errno", "exceptions", "gc", "imp", "marshal", "posix", "signal", "sys", "_thread", "zipimport")
+"""Standard library modules that may not have a file in Python's folder"""
+
+
+def in_stdlib_folder(file: str, basedir: str = STDLIB_BASEDIR) -> bool:
+    """True if a module's file is in Python's own folder, not in site-packages."""
+    basedir = os.path.normcase(basedir)
+    file = os.path.normcase(file)
+    return file.startswith(basedir) and not file.startswith(os.path.join(basedir, "site-packages"))
+
+
+def is_stdlib(the_object: TypeLike, basedir: str = STDLIB_BASEDIR) -> bool:
+    """True if the object is a standard library module."""
+    if not isinstance(the_object, type(os)):
+        return False
+    try:
+        file = inspect.getabsfile(cast(type, the_object))
+    except TypeError:
+        file = "(built-in)"
+    return the_object.__name__ in KNOWN_STDLIB or in_stdlib_folder(file, basedir)
+
+
+def getdocloc(the_object: TypeLike, basedir: str = STDLIB_BASEDIR) -> str | None:
+    """Return the location of module docs or None"""
+    # # This is nasty special case coding, how many more special cases are there?
+    # is_exception =the_object.__name__ in ("xml.etree", "test.pydoc_mod")
+    # # special case for etree
+    # "https://docs.python.org/3/library/xml.etree.elementtree.html"
+
+    if settings.PREFER_DOCS_PYTHON_ORG and is_stdlib(the_object, basedir):
+        if settings.PYTHONDOCS.startswith(("http://", "https://")):
+            doc_loc = f"{settings.PYTHONDOCS.rstrip('/')}/{the_object.__name__.lower()}.html"
+        else:
+            doc_loc = os.path.join(settings.PYTHONDOCS, the_object.__name__.lower() + ".html")
+    else:
+        doc_loc = None
+    return doc_loc
@@ -0,0 +1,355 @@
+"""
+Import-free inspection.
+
+Parses source with `ast` and builds stand-in objects (a real module object,
+real classes, functions with a `__signature__`) that the reporter can document
+exactly like imported ones. Nothing from the documented code gets executed,
+so its dependencies don't even have to be installed.
+
+What can't be known without running the code is left out: names brought in
+with `from x import y`, members of base classes from other modules, and
+anything computed at import time shows up as its source text.
+"""
+
+import ast
+import builtins
+import contextlib
+import importlib.machinery
+import inspect
+import logging
+import os
+import pkgutil
+import sys
+import types
+from collections.abc import Iterator
+from typing import Any
+
+from pydoc_fork.inspector.module_utils import find_spec_quietly
+
+LOGGER = logging.getLogger(__name__)
+
+STATIC_MODULES: dict[str, types.ModuleType] = {}
+"""Stand-in modules built so far, by dotted name."""
+
+_PLACEHOLDER_CLASSES: dict[tuple[str, str], type] = {}
+
+
+class ModuleStub(types.ModuleType):
+    """A module that was imported by documented code, but not parsed (yet)."""
+
+
+class StaticValue:
+    """A value we only know the source text of."""
+
+    def __init__(self, source: str) -> None:
+        """Remember the source"""
+        self.source = source
+
+    def __repr__(self) -> str:
+        """Show the source, it is the best we have"""
+        return self.source
+
+
+def _stub(*args: Any, **kwargs: Any) -> None:  # pylint: disable=unused-argument
+    """Template for functions"""
+
+
+async def _async_stub(*args: Any, **kwargs: Any) -> None:  # pylint: disable=unused-argument
+    """Template for async functions"""
+
+
+def _placeholder_class(module: str, name: str) -> type:
+    """A class from somewhere we didn't parse, one per name so MROs stay consistent."""
+    key = (module, name)
+    if key not in _PLACEHOLDER_CLASSES:
+        _PLACEHOLDER_CLASSES[key] = type(name, (), {"__module__": module, "__doc__": None})
+    return _PLACEHOLDER_CLASSES[key]
+
+
+class _ModuleBuilder:
+    """Turn one module's syntax tree into stand-in objects."""
+
+    def __init__(self, name: str, file_name: str, source: str, is_package: bool) -> None:
+        """Set up"""
+        self.name = name
+        self.file_name = file_name
+        self.source = source
+        self.package = name if is_package else name.rpartition(".")[0]
+        # local name -> (module, attribute) for `from x import y`
+        self.imported_names: dict[str, tuple[str, str]] = {}
+
+    def segment(self, node: ast.AST | None) -> StaticValue:
+        """Source text of an expression."""
+        text = ast.get_source_segment(self.source, node) if node is not None else None
+        return StaticValue(text or "...")
+
+    def value(self, node: ast.expr) -> Any:
+        """Python value of a literal, otherwise its source text."""
+        try:
+            return ast.literal_eval(node)
+        except (ValueError, TypeError, SyntaxError, MemoryError, RecursionError):
+            return self.segment(node)
+
+    def absolute(self, module: str | None, level: int) -> str:
+        """Resolve a relative import."""
+        if not level:
+            return module or ""
+        base = self.package.split(".") if self.package else []
+        if level > 1:
+            base = base[: len(base) - (level - 1)]
+        return ".".join(base + ([module] if module else []))
+
+    def dotted(self, node: ast.expr) -> str | None:
+        """`a.b.C` as a string, None for anything more complicated."""
+        if isinstance(node, ast.Name):
+            return node.id
+        if isinstance(node, ast.Attribute):
+            parent = self.dotted(node.value)
+            return f"{parent}.{node.attr}" if parent else None
+        return None
+
+    def base_class(self, node: ast.expr, namespace: dict[str, Any]) -> type | None:
+        """Find or invent the class a base class expression refers to."""
+        if isinstance(node, ast.Subscript):
+            # Generic[T], Protocol[T] and friends
+            node = node.value
+        dotted = self.dotted(node)
+        if not dotted:
+            return None
+        head, _, rest = dotted.partition(".")
+        if not rest:
+            found = namespace.get(head)
+            if isinstance(found, type):
+                return found
+            if head in self.imported_names:
+                return _placeholder_class(*self.imported_names[head])
+            builtin = getattr(builtins, head, None)
+            if isinstance(builtin, type):
+                return builtin
+            return _placeholder_class(self.name, head)
+        module, _, class_name = dotted.rpartition(".")
+        head_module = namespace.get(head)
+        if isinstance(head_module, types.ModuleType):
+            module = head_module.__name__ + module[len(head) :]
+        return _placeholder_class(module, class_name)
+
+    def signature(self, node: ast.FunctionDef | ast.AsyncFunctionDef) -> inspect.Signature | None:
+        """Build a signature from the argument list, defaults and annotations as source text."""
+        args = node.args
+        empty = inspect.Parameter.empty
+
+        def annotation(arg: ast.arg) -> Any:
+            return self.segment(arg.annotation) if arg.annotation is not None else empty
+
+        parameters = []
+        positional = [*args.posonlyargs, *args.args]
+        defaults = [empty] * (len(positional) - len(args.defaults)) + [self.segment(d) for d in args.defaults]
+        for index, arg in enumerate(positional):
+            kind = (
+                inspect.Parameter.POSITIONAL_ONLY
+                if index < len(args.posonlyargs)
+                else inspect.Parameter.POSITIONAL_OR_KEYWORD
+            )
+            parameters.append(inspect.Parameter(arg.arg, kind, default=defaults[index], annotation=annotation(arg)))
+        if args.vararg:
+            parameters.append(
+                inspect.Parameter(args.vararg.arg, inspect.Parameter.VAR_POSITIONAL, annotation=annotation(args.vararg))
+            )
+        for arg, default in zip(args.kwonlyargs, args.kw_defaults, strict=True):
+            parameters.append(
+                inspect.Parameter(
+                    arg.arg,
+                    inspect.Parameter.KEYWORD_ONLY,
+                    default=self.segment(default) if default is not None else empty,
+                    annotation=annotation(arg),
+                )
+            )
+        if args.kwarg:
+            parameters.append(
+                inspect.Parameter(args.kwarg.arg, inspect.Parameter.VAR_KEYWORD, annotation=annotation(args.kwarg))
+            )
+        returns = self.segment(node.returns) if node.returns is not None else inspect.Signature.empty
+        try:
+            return inspect.Signature(parameters, return_annotation=returns)
+        except (ValueError, TypeError):
+            LOGGER.debug("Can't build a signature for %s in %s", node.name, self.name)
+            return None
+
+    def function(self, node: ast.FunctionDef | ast.AsyncFunctionDef, qualname: str) -> types.FunctionType:
+        """A function object that documents like the real one."""
+        template = _async_stub if isinstance(node, ast.AsyncFunctionDef) else _stub
+        # pointing the code at the real file lets inspect.getcomments find comments above the def
+        code = template.__code__.replace(co_filename=self.file_name, co_firstlineno=node.lineno, co_name=node.name)
+        function = types.FunctionType(code, {}, node.name)
+        function.__qualname__ = qualname
+        function.__module__ = self.name
+        function.__doc__ = ast.get_docstring(node, clean=False)
+        function.__signature__ = self.signature(node)  # type: ignore[attr-defined]
+        return function
+
+    def decorated(self, node: ast.FunctionDef | ast.AsyncFunctionDef, qualname: str, namespace: dict[str, Any]) -> Any:
+        """Apply the decorators we understand, ignore the rest."""
+        function = self.function(node, qualname)
+        for decorator in node.decorator_list:
+            dotted = self.dotted(decorator) or ""
+            if dotted in ("staticmethod", "classmethod"):
+                return staticmethod(function) if dotted == "staticmethod" else classmethod(function)
+            if dotted in ("property", "functools.cached_property", "cached_property"):
+                return property(function, doc=function.__doc__)
+            prop_name, _, accessor = dotted.rpartition(".")
+            existing = namespace.get(prop_name)
+            if accessor in ("setter", "deleter") and isinstance(existing, property):
+                if accessor == "setter":
+                    return existing.setter(function)
+                return existing.deleter(function)
+        return function
+
+    def klass(self, node: ast.ClassDef, qualname: str, outer: dict[str, Any]) -> type:
+        """A class object with the same members as the real one."""
+        namespace: dict[str, Any] = {
+            "__module__": self.name,
+            "__qualname__": qualname,
+            "__doc__": ast.get_docstring(node, clean=False),
+        }
+        self.statements(node.body, namespace, qualname + ".")
+        bases = tuple(base for base in (self.base_class(b, outer) for b in node.bases) if base is not None)
+        try:
+            return type(node.name, bases, namespace)
+        except TypeError:
+            # MRO or layout conflicts between bases we only know by name
+            LOGGER.debug("Can't combine the bases of %s in %s, using object", node.name, self.name)
+            return type(node.name, (), namespace)
+
+    def statements(self, body: list[ast.stmt], namespace: dict[str, Any], qual_prefix: str = "") -> None:
+        """Fill a module or class namespace from its statements."""
+        for node in body:
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                namespace[node.name] = self.decorated(node, qual_prefix + node.name, namespace)
+            elif isinstance(node, ast.ClassDef):
+                namespace[node.name] = self.klass(node, qual_prefix + node.name, namespace)
+            elif isinstance(node, ast.Assign):
+                for target in node.targets:
+                    if isinstance(target, ast.Name):
+                        namespace[target.id] = self.value(node.value)
+            elif isinstance(node, ast.AnnAssign) and node.value is not None and isinstance(node.target, ast.Name):
+                namespace[node.target.id] = self.value(node.value)
+            elif isinstance(node, ast.Import) and not qual_prefix:
+                for alias in node.names:
+                    if alias.asname:
+                        namespace[alias.asname] = module_stub(alias.name)
+                    else:
+                        head = alias.name.partition(".")[0]
+                        namespace[head] = module_stub(head)
+            elif isinstance(node, ast.ImportFrom):
+                module = self.absolute(node.module, node.level)
+                for alias in node.names:
+                    if alias.name != "*":
+                        self.imported_names[alias.asname or alias.name] = (module, alias.name)
+            elif isinstance(node, ast.If):
+                self.statements(node.body, namespace, qual_prefix)
+                self.statements(node.orelse, namespace, qual_prefix)
+            elif isinstance(node, ast.Try):
+                self.statements(node.body, namespace, qual_prefix)
+                for handler in node.handlers:
+                    self.statements(handler.body, namespace, qual_prefix)
+                self.statements(node.orelse, namespace, qual_prefix)
+                self.statements(node.finalbody, namespace, qual_prefix)
+
+    def build(self, spec: importlib.machinery.ModuleSpec) -> types.ModuleType:
+        """Parse the whole module."""
+        tree = ast.parse(self.source, filename=self.file_name)
+        module = types.ModuleType(self.name, ast.get_docstring(tree, clean=False))
+        module.__file__ = self.file_name
+        if spec.submodule_search_locations is not None:
+            module.__path__ = list(spec.submodule_search_locations)
+        namespace: dict[str, Any] = {}
+        self.statements(tree.body, namespace)
+        for key, value in namespace.items():
+            setattr(module, key, value)
+        return module
+
+
+def module_stub(name: str) -> types.ModuleType:
+    """Something to link to for `import name`, parsed only if someone documents it."""
+    if name in STATIC_MODULES:
+        return STATIC_MODULES[name]
+    stub = ModuleStub(name)
+    spec = find_spec_quietly(name)
+    if spec is not None and spec.has_location and spec.origin:
+        stub.__file__ = spec.origin  # pylint: disable=attribute-defined-outside-init
+    return stub
+
+
+def load_static(name: str) -> types.ModuleType | None:
+    """Build the stand-in for a module from its source, None if there is no source."""
+    if name in STATIC_MODULES:
+        return STATIC_MODULES[name]
+    spec = find_spec_quietly(name)
+    if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+        LOGGER.debug("No python source to parse for %s", name)
+        return None
+    try:
+        with open(spec.origin, encoding="utf-8") as file:
+            source = file.read()
+        module = _ModuleBuilder(name, spec.origin, source, spec.submodule_search_locations is not None).build(spec)
+    except (OSError, SyntaxError, UnicodeDecodeError, ValueError) as error:
+        LOGGER.warning("Skipping static inspection of %s, got a %s", name, error)
+        return None
+    STATIC_MODULES[name] = module
+    return module
+
+
+def locate_static(path: str) -> Any:
+    """Like module_utils.locate, but parses instead of importing."""
+    parts = [part for part in path.replace("-", "_").split(".") if part]
+    for index in range(len(parts), 0, -1):
+        module = load_static(".".join(parts[:index]))
+        if module is None:
+            continue
+        the_object: Any = module
+        for part in parts[index:]:
+            try:
+                the_object = getattr(the_object, part)
+            except AttributeError:
+                return None
+        return the_object
+    return None
+
+
+def is_stand_in(the_object: Any) -> bool:
+    """True for modules built by this module."""
+    return isinstance(the_object, types.ModuleType) and STATIC_MODULES.get(the_object.__name__) is the_object
+
+
+@contextlib.contextmanager
+def installed(the_object: Any) -> Iterator[None]:
+    """Put a stand-in module in sys.modules while it is being documented.
+
+    The reporter looks modules up by name (inspect.getmodule) to decide what
+    was defined where, and would otherwise find nothing or the real module.
+    """
+    if not is_stand_in(the_object):
+        yield
+        return
+    name = the_object.__name__
+    previous = sys.modules.get(name)
+    sys.modules[name] = the_object
+    try:
+        yield
+    finally:
+        if previous is None:
+            del sys.modules[name]
+        else:
+            sys.modules[name] = previous
+
+
+def walk_packages_statically(paths: list[str], prefix: str = "") -> Iterator[tuple[str, bool]]:
+    """Like pkgutil.walk_packages, without importing packages to find their submodules."""
+    for finder, name, is_package in pkgutil.iter_modules(paths, prefix):
+        yield name, is_package
+        finder_path = getattr(finder, "path", None)
+        if is_package and finder_path:
+            yield from walk_packages_statically(
+                [os.path.join(finder_path, name.rpartition(".")[2])],
+                name + ".",
+            )
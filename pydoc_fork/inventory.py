@@ -0,0 +1,145 @@
+"""
+Sphinx inventories, objects.inv, in and out.
+
+The objects.inv written next to the pages lets Sphinx projects link to them
+with intersphinx. Inventories of other projects, Sphinx or pydoc_fork, are
+read at the start of a run and names found in them link to those projects
+instead of being imported and documented here too.
+"""
+
+import logging
+import os
+import re
+import zlib
+
+from pydoc_fork import output_files, settings
+
+LOGGER = logging.getLogger(__name__)
+
+INVENTORY_NAME = "objects.inv"
+
+ROLES = {
+    "module": "py:module",
+    "class": "py:class",
+    "function": "py:function",
+    "method": "py:method",
+    "data": "py:data",
+}
+"""Sphinx role of each kind of search index entry"""
+
+EXTERNAL: dict[str, str] = {}
+"""Url of every name in the other projects' inventories"""
+
+_LINE = re.compile(r"(.+?)\s+(\S+)\s+(-?\d+)\s+?(\S*)\s+(.*)")
+
+Line = tuple[str, str, str, str, str]
+"""Name, role, priority, location and display name"""
+
+
+def dump(project: str, lines: list[Line]) -> bytes:
+    """An inventory in Sphinx's version 2 format."""
+    header = (
+        "# Sphinx inventory version 2\n"
+        f"# Project: {project}\n"
+        "# Version: \n"
+        "# The remainder of this file is compressed using zlib.\n"
+    )
+    body = "".join(
+        f"{name} {role} {priority} {location} {display}\n" for name, role, priority, location, display in lines
+    )
+    return header.encode("utf-8") + zlib.compress(body.encode("utf-8"), 9)
+
+
+def parse(data: bytes) -> list[Line]:
+    """Lines of a version 2 inventory, raises ValueError for anything else."""
+    parts = data.split(b"\n", 4)
+    if len(parts) < 5 or parts[0].rstrip() != b"# Sphinx inventory version 2":
+        raise ValueError("not a version 2 Sphinx inventory")
+    try:
+        body = zlib.decompress(parts[4]).decode("utf-8")
+    except zlib.error as error:
+        raise ValueError(str(error)) from error
+    lines = []
+    for line in body.splitlines():
+        match = _LINE.fullmatch(line.rstrip())
+        if match is None:
+            continue
+        name, role, priority, location, display = match.groups()
+        if location.endswith("$"):
+            location = location[:-1] + name
+        lines.append((name, role, priority, location, display))
+    return lines
+
+
+def lines_for(pages: dict[str, list[list[str]]]) -> list[Line]:
+    """Inventory lines for search index entries, by page."""
+    lines = set()
+    for entries in pages.values():
+        for name, kind, url, _ in entries:
+            lines.add((name, ROLES[kind], "1", url, "-"))
+    return sorted(lines)
+
+
+def write(output_folder: str, pages: dict[str, list[list[str]]]) -> str:
+    """Write objects.inv, keeping lines of pages that are still there but weren't written this run."""
+    path = os.path.join(output_folder, INVENTORY_NAME)
+    lines = lines_for(pages)
+    # an archive starts empty, whatever is in the output folder
+    previous = [] if output_files.archiving() else _read_previous(path)
+    for line in previous:
+        url = line[3].split("#", 1)[0]
+        if url not in pages and os.path.exists(os.path.join(output_folder, url)):
+            lines.append(line)
+    lines = sorted(set(lines))
+    output_files.write_bytes(path, [dump(settings.PROJECT_NAME, lines)])
+    LOGGER.info("wrote %s, %s names", INVENTORY_NAME, len(lines))
+    return path
+
+
+def _read_previous(path: str) -> list[Line]:
+    """Lines of the inventory an earlier run wrote, if any."""
+    try:
+        with open(path, "rb") as file:
+            return parse(file.read())
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as error:
+        LOGGER.warning("Ignoring unreadable %s, got %s", path, error)
+        return []
+
+
+def read_source(source: str) -> dict[str, str]:
+    """Urls by name from one inventory, source is a base url, or a base url=where the inventory is."""
+    base_url, _, location = source.partition("=")
+    location = location or base_url.rstrip("/") + "/" + INVENTORY_NAME
+    if location.startswith(("http://", "https://")):
+        # only needed with remote inventories, and slow to import
+        import urllib.request
+
+        with urllib.request.urlopen(location, timeout=30) as response:  # nosec
+            data = response.read()
+    else:
+        with open(location, "rb") as file:
+            data = file.read()
+    return {name: base_url.rstrip("/") + "/" + uri for name, role, _, uri, _ in parse(data) if role.startswith("py:")}
+
+
+def start() -> dict[str, str]:
+    """Read the inventories of other projects, first one to list a name wins."""
+    global EXTERNAL  # pylint: disable=global-statement
+    EXTERNAL = {}
+    for source in settings.INVENTORIES:
+        try:
+            urls = read_source(source)
+        except (OSError, ValueError) as error:
+            LOGGER.warning("Can't read inventory %s, got %s", source, error)
+            continue
+        LOGGER.info("Read %s names from inventory %s", len(urls), source)
+        for name, url in urls.items():
+            EXTERNAL.setdefault(name, url)
+    return EXTERNAL
+
+
+def external_url(name: str) -> str | None:
+    """Where another project documents a dotted name, if it does."""
+    return EXTERNAL.get(name)
@@ -0,0 +1,139 @@
+"""
+Import and inspect modules in a separate worker process.
+
+A module that blocks on import, or a C extension that crashes the
+interpreter, only takes the worker down. The module is reported and
+skipped, a fresh worker picks up with the next one. Workers are also
+replaced every so often, since everything they import stays in their
+sys.modules.
+"""
+
+import contextlib
+import logging
+import multiprocessing
+import os
+import sys
+from multiprocessing.connection import Connection
+from typing import TYPE_CHECKING, Any
+
+from pydoc_fork import inventory, settings
+from pydoc_fork.parallel import settings_snapshot
+
+if TYPE_CHECKING:
+    from pydoc_fork.commands import Inspected
+
+LOGGER = logging.getLogger(__name__)
+
+
+def _serve(
+    connection: Connection,
+    snapshot: dict[str, Any],
+    sys_path: list[str],
+    cwd: str,
+    external: dict[str, str],
+) -> None:
+    """Worker loop, inspect whatever the parent asks for until told to stop."""
+    # circular ref
+    from pydoc_fork.commands import inspect_one
+
+    for key, value in snapshot.items():
+        setattr(settings, key, value)
+    inventory.EXTERNAL = external
+    sys.path[:] = sys_path
+    os.chdir(cwd)
+    while True:
+        try:
+            request = connection.recv()
+        except EOFError:
+            return
+        if request is None:
+            return
+        name, force_load, want_links = request
+        settings.MENTIONED_MODULES.clear()
+        try:
+            connection.send(inspect_one(name, force_load, want_links))
+        except Exception as error:  # pylint: disable=broad-except
+            # the module is broken, not the worker
+            LOGGER.debug("Inspecting %s failed", name, exc_info=True)
+            connection.send(f"{type(error).__name__}: {error}")
+
+
+class IsolatedWorker:
+    """One worker process and the pipe to talk to it."""
+
+    def __init__(self) -> None:
+        """Start the worker"""
+        self.connection, child_connection = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(
+            target=_serve,
+            args=(child_connection, settings_snapshot(), list(sys.path), os.getcwd(), inventory.EXTERNAL),
+            daemon=True,
+        )
+        self.process.start()
+        child_connection.close()
+        self.handled = 0
+
+    def inspect(self, name: str, force_load: bool, want_links: bool, timeout: float) -> Any:
+        """Ask the worker to inspect a module.
+
+        Raises TimeoutError if it takes too long, EOFError if the worker died.
+        """
+        self.handled += 1
+        self.connection.send((name, force_load, want_links))
+        if not self.connection.poll(timeout):
+            raise TimeoutError(name)
+        return self.connection.recv()
+
+    def stop(self) -> None:
+        """Ask the worker to finish, kill it if it won't."""
+        with contextlib.suppress(OSError):
+            self.connection.send(None)
+        self.process.join(timeout=5)
+        self.kill()
+
+    def kill(self) -> None:
+        """Stop the worker right now."""
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.connection.close()
+
+
+_WORKER: IsolatedWorker | None = None
+
+
+def inspect_isolated(name: str, force_load: bool = False, want_links: bool = False) -> "Inspected | None":
+    """Inspect a module in the worker, None if it failed, hung or crashed the worker."""
+    global _WORKER  # pylint: disable=global-statement
+    if _WORKER is None:
+        _WORKER = IsolatedWorker()
+    worker = _WORKER
+    try:
+        result = worker.inspect(name, force_load, want_links, settings.IMPORT_TIMEOUT)
+    except TimeoutError:
+        LOGGER.warning("Skipping %s, still importing after %s seconds", name, settings.IMPORT_TIMEOUT)
+        worker.kill()
+        _WORKER = None
+        return None
+    except (EOFError, OSError):
+        worker.kill()
+        LOGGER.warning("Skipping %s, the worker inspecting it died (exit code %s)", name, worker.process.exitcode)
+        _WORKER = None
+        return None
+
+    if worker.handled >= settings.RECYCLE_AFTER:
+        LOGGER.debug("Recycling worker after %s modules", worker.handled)
+        worker.stop()
+        _WORKER = None
+    if isinstance(result, str):
+        LOGGER.warning("Skipping %s, inspecting it failed with %s", name, result)
+        return None
+    return result
+
+
+def shutdown_worker() -> None:
+    """Stop the worker, if one was started."""
+    global _WORKER  # pylint: disable=global-statement
+    if _WORKER is not None:
+        _WORKER.stop()
+        _WORKER = None
@@ -0,0 +1,195 @@
+"""
+Cache of inspected modules, across runs.
+
+Importing and inspecting modules is most of the work. The model of each
+module is saved to a cache folder, keyed by the module's source, where it was
+found, the Python and pydoc_fork versions and the settings that change what
+gets inspected. The next run renders from the cache without importing.
+
+The folder is kept under a size limit by removing the least recently used
+entries at the end of a run.
+"""
+
+import contextlib
+import glob
+import hashlib
+import json
+import logging
+import os
+import sys
+from typing import Any
+
+from pydoc_fork import settings
+from pydoc_fork.__about__ import __version__
+from pydoc_fork.inspector.model import Doc, from_data, to_data
+from pydoc_fork.inspector.module_utils import find_spec_quietly, source_hash
+
+LOGGER = logging.getLogger(__name__)
+
+CACHE: "ModelCache | None" = None
+"""Cache for the current run, None when caching is off."""
+
+
+def default_cache_dir() -> str:
+    """Per user cache folder."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "pydoc_fork")
+
+
+def settings_key() -> str:
+    """Everything besides the module's source that changes what inspecting it finds."""
+    relevant = [
+        __version__,
+        list(sys.version_info[:3]),
+        settings.DOCUMENT_INTERNALS,
+        settings.SKIP_MODULES,
+        settings.PREFER_DOCS_PYTHON_ORG,
+        settings.PYTHONDOCS,
+        settings.STATIC,
+        settings.INVENTORIES,
+    ]
+    return json.dumps(relevant, default=str)
+
+
+class CachedModule:
+    """A module as it was inspected on an earlier run."""
+
+    __slots__ = ("doc", "linked", "mentioned", "title")
+
+    def __init__(self, title: str, doc: Doc, mentioned: list[tuple[str, str]], linked: list[str]) -> None:
+        """Set up"""
+        self.title = title
+        self.doc = doc
+        self.mentioned = mentioned
+        self.linked = linked
+
+
+class ModelCache:
+    """A folder of json files, one per inspected module."""
+
+    def __init__(self, folder: str, max_bytes: int) -> None:
+        """Set up, nothing is read until asked for."""
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.settings_key = settings_key()
+        self.hits = 0
+        self.misses = 0
+        self._hashes: dict[str, str | None] = {}
+
+    def source_hash(self, name: str) -> str | None:
+        """Source hash of a module, once per run."""
+        if name not in self._hashes:
+            self._hashes[name] = source_hash(name)
+        return self._hashes[name]
+
+    def path(self, name: str) -> str | None:
+        """Where the module would be cached, None for modules without source."""
+        digest = self.source_hash(name)
+        spec = find_spec_quietly(name)
+        if digest is None or spec is None:
+            return None
+        key = json.dumps([self.settings_key, name, spec.origin, digest])
+        return os.path.join(self.folder, hashlib.sha256(key.encode()).hexdigest() + ".json")
+
+    def load(self, name: str) -> CachedModule | None:
+        """The module as inspected before, if nothing it depends on changed."""
+        path = self.path(name)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+            for linked_name, linked_hash in data["links"].items():
+                if self.source_hash(linked_name) != linked_hash:
+                    LOGGER.debug("cached %s is stale because %s changed", name, linked_name)
+                    self.misses += 1
+                    return None
+            cached = CachedModule(
+                data["title"],
+                from_data(data["model"]),
+                # json made the pairs lists
+                [(pair[0], pair[1]) for pair in data["mentioned"]],
+                list(data["links"]),
+            )
+        except FileNotFoundError:
+            self.misses += 1
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            LOGGER.warning("Ignoring unreadable cache entry for %s at %s", name, path)
+            self.misses += 1
+            return None
+        # mtime is what eviction goes by
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        self.hits += 1
+        return cached
+
+    def store(
+        self,
+        name: str,
+        title: str,
+        doc: Doc,
+        mentioned: list[tuple[str, str]],
+        linked: list[str],
+    ) -> None:
+        """Save the inspected module for the next run."""
+        path = self.path(name)
+        if path is None:
+            return
+        data: dict[str, Any] = {
+            "title": title,
+            "links": {
+                linked_name: self.source_hash(linked_name) for linked_name in sorted(set(linked)) if linked_name != name
+            },
+            "mentioned": sorted(mentioned),
+            "model": to_data(doc),
+        }
+        # workers share the folder, so never leave a half written file where a reader could find it
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(temporary_path, path)
+        except OSError as error:
+            LOGGER.warning("Can't cache %s, got %s", name, error)
+            with contextlib.suppress(OSError):
+                os.remove(temporary_path)
+
+    def prune(self) -> None:
+        """Remove least recently used entries until the folder fits in max_bytes."""
+        entries = []
+        for path in glob.glob(os.path.join(self.folder, "*.json")):
+            with contextlib.suppress(OSError):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+                total -= size
+                LOGGER.debug("Evicted %s from the cache", path)
+
+
+def start() -> ModelCache:
+    """Open the cache for this run."""
+    global CACHE  # pylint: disable=global-statement
+    CACHE = ModelCache(settings.CACHE_DIR or default_cache_dir(), settings.CACHE_MAX_MB * 1024 * 1024)
+    return CACHE
+
+
+def finish() -> None:
+    """Trim the cache and forget about it."""
+    global CACHE  # pylint: disable=global-statement
+    if CACHE is not None:
+        LOGGER.info("Model cache: %s hits, %s misses", CACHE.hits, CACHE.misses)
+        CACHE.prune()
+        CACHE = None
+
+
+def discard() -> None:
+    """Forget about the cache without trimming it, after a failed run."""
+    global CACHE  # pylint: disable=global-statement
+    CACHE = None
@@ -0,0 +1,209 @@
+"""
+One zip or tar file instead of an output folder full of small files.
+
+Files go into the archive as they are written, named by their path relative
+to the output folder. Every entry gets the same timestamp, owner and mode,
+and entries come in the order they were written, which is the same from run
+to run, so the same docs make the same archive, byte for byte.
+"""
+
+import contextlib
+import gzip
+import hashlib
+import io
+import logging
+import os
+import tarfile
+import threading
+import zipfile
+
+LOGGER = logging.getLogger(__name__)
+
+FIXED_DATE = (1980, 1, 1, 0, 0, 0)
+"""Timestamp of every zip entry, the earliest zip can store"""
+
+SUFFIXES = (".zip", ".tar", ".tar.gz", ".tgz")
+"""Kinds of archive, by file name"""
+
+
+class ArchiveSink:
+    """Files written by path, kept under their path relative to root."""
+
+    def __init__(self, root: str) -> None:
+        """Nothing written yet."""
+        self.root = os.path.abspath(root)
+        self.hashes: dict[str, str] = {}
+        self.sizes: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def name_of(self, path: str) -> str:
+        """Entry name of a path in the output folder."""
+        name = os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+        if name.startswith("../") or name == "..":
+            raise ValueError(f"{path} is outside of the output folder {self.root}")
+        return name
+
+    def add(self, path: str, data: bytes) -> bool:
+        """Add a file, False if the same file was already added."""
+        name = self.name_of(path)
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            previous = self.hashes.get(name)
+            if previous == digest:
+                return False
+            if previous is not None:
+                LOGGER.warning("%s was written twice with different content, the last one wins", name)
+            self._write(name, data)
+            self.hashes[name] = digest
+            self.sizes[name] = len(data)
+        return True
+
+    def has(self, path: str) -> bool:
+        """True if the file was added."""
+        return self.name_of(path) in self.hashes
+
+    def size_of(self, path: str) -> int | None:
+        """Size of an added file."""
+        return self.sizes.get(self.name_of(path))
+
+    def _write(self, name: str, data: bytes) -> None:
+        """Store one entry."""
+        raise NotImplementedError()
+
+    def close(self) -> None:
+        """Finish the archive."""
+
+    def abort(self) -> None:
+        """Give up on the archive, after a failed run."""
+
+
+class CapturedFiles(ArchiveSink):  # pylint: disable=abstract-method
+    """Files kept in memory, a worker process sends them to the parent's archive."""
+
+    def __init__(self, root: str) -> None:
+        """Nothing captured yet."""
+        super().__init__(root)
+        self.files: list[tuple[str, bytes]] = []
+
+    def add(self, path: str, data: bytes) -> bool:
+        """Keep the file, the parent decides whether it is new."""
+        with self._lock:
+            self.files.append((path, data))
+        return True
+
+    def has(self, path: str) -> bool:
+        """Only the parent knows."""
+        return False
+
+    def size_of(self, path: str) -> int | None:
+        """Size of the last capture of a path."""
+        for captured_path, data in reversed(self.files):
+            if captured_path == path:
+                return len(data)
+        return None
+
+    def take(self) -> list[tuple[str, bytes]]:
+        """Hand over the files captured so far."""
+        with self._lock:
+            taken, self.files = self.files, []
+        return taken
+
+
+class _FileArchive(ArchiveSink):  # pylint: disable=abstract-method
+    """Written to a temporary file that replaces the archive when it's done."""
+
+    def __init__(self, path: str, root: str) -> None:
+        """Create the temporary file."""
+        super().__init__(root)
+        self.path = path
+        self.temporary_path = f"{path}.{os.getpid()}.tmp"
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.file = open(self.temporary_path, "wb")  # noqa: SIM115  # pylint: disable=consider-using-with
+
+    def _close_entries(self) -> None:
+        """Write whatever the archive format needs at the end."""
+
+    def close(self) -> None:
+        """Finish the archive and move it into place."""
+        try:
+            self._close_entries()
+            self.file.close()
+            os.replace(self.temporary_path, self.path)
+        except BaseException:
+            self.file.close()
+            with contextlib.suppress(OSError):
+                os.remove(self.temporary_path)
+            raise
+        LOGGER.info("wrote %s, %s files", self.path, len(self.hashes))
+
+    def abort(self) -> None:
+        """Throw the half written archive away, an archive from an earlier run stays as it was."""
+        try:
+            # closed properly, or zip and tar would write their endings to a closed file later
+            self._close_entries()
+        finally:
+            self.file.close()
+            with contextlib.suppress(OSError):
+                os.remove(self.temporary_path)
+        LOGGER.info("didn't write %s, the run failed", self.path)
+
+
+class ZipArchive(_FileArchive):
+    """A deflated zip file."""
+
+    def __init__(self, path: str, root: str) -> None:
+        """Open the zip."""
+        super().__init__(path, root)
+        # pylint: disable=consider-using-with
+        self.zip = zipfile.ZipFile(self.file, "w", compression=zipfile.ZIP_DEFLATED)
+
+    def _write(self, name: str, data: bytes) -> None:
+        """Deflate one entry."""
+        info = zipfile.ZipInfo(name, FIXED_DATE)
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.external_attr = 0o644 << 16
+        self.zip.writestr(info, data)
+
+    def _close_entries(self) -> None:
+        """Write the central directory."""
+        self.zip.close()
+
+
+class TarArchive(_FileArchive):
+    """A tar file, gzipped if its name says so."""
+
+    def __init__(self, path: str, root: str) -> None:
+        """Open the tar, and the gzip stream around it, which would otherwise carry the time."""
+        super().__init__(path, root)
+        self.gzip = None
+        stream: io.IOBase = self.file
+        if path.endswith((".tar.gz", ".tgz")):
+            self.gzip = gzip.GzipFile(filename="", mode="wb", fileobj=self.file, mtime=0)
+            stream = self.gzip
+        # pylint: disable=consider-using-with
+        self.tar = tarfile.open(fileobj=stream, mode="w", format=tarfile.PAX_FORMAT)  # noqa: SIM115
+
+    def _write(self, name: str, data: bytes) -> None:
+        """Add one entry, owned by nobody in particular."""
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = 0
+        info.mode = 0o644
+        self.tar.addfile(info, io.BytesIO(data))
+
+    def _close_entries(self) -> None:
+        """Write the end of archive blocks and the gzip trailer."""
+        self.tar.close()
+        if self.gzip is not None:
+            self.gzip.close()
+
+
+def open_archive(path: str, root: str) -> ArchiveSink:
+    """A zip or tar archive, by the file name, for the files of output folder root."""
+    if path.endswith(".zip"):
+        return ZipArchive(path, root)
+    if path.endswith((".tar", ".tar.gz", ".tgz")):
+        return TarArchive(path, root)
+    raise ValueError(f"Output archive must end with one of {', '.join(SUFFIXES)}, not {path!r}")
@@ -0,0 +1,341 @@
+"""
+Write output files only when their content changes.
+
+Every file goes to a temporary file next to it first, hashed on the way, and
+replaces the old one with an atomic rename only if the hashes differ. An
+unchanged file keeps its modification time, so rsync, CDN uploads and make
+only see what really changed, and a reader never finds a half written page.
+
+With an output archive, files go into the archive instead and nothing is
+read from or written to the output folder.
+
+Mirrors get a copy of every file written to their source folder, with some
+bytes swapped, which is how one build makes several themes.
+
+The pages a run wrote are recorded in the output folder, by the modules it
+was asked for. The next run for the same modules removes the pages it didn't
+write again, e.g. of a module that was deleted. Pages of runs for other
+modules into the same folder stay, and so do assets, they are named by their
+content and pages cached elsewhere may still link to them.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections.abc import Iterable
+
+from pydoc_fork import precompress
+from pydoc_fork.output_archive import ArchiveSink, CapturedFiles, open_archive
+
+LOGGER = logging.getLogger(__name__)
+
+TALLY: "OutputTally | None" = None
+"""Files written, left alone and removed this run, None outside of a run."""
+
+LAST: "OutputTally | None" = None
+"""Tally of the last finished run."""
+
+SINK: ArchiveSink | None = None
+"""Archive the files go into, None to write them to the output folder."""
+
+MIRRORS: list["Mirror"] = []
+"""Other folders that get a copy of what is written"""
+
+_INHERITED: list[ArchiveSink] = []
+"""The parent's archive as a forked worker got it, kept so the worker never closes it"""
+
+OUTPUTS_NAME = ".pydoc_fork_outputs.json"
+"""Pages each run wrote to the output folder, by the modules it was asked for"""
+
+_CHUNK = 1024 * 1024
+
+_SIDECARS = (".gz", ".br")
+
+
+class OutputTally:
+    """Paths of the files written, unchanged and removed."""
+
+    def __init__(self) -> None:
+        """Nothing yet."""
+        self.written: list[str] = []
+        self.unchanged: list[str] = []
+        self.removed: list[str] = []
+
+    def take(self) -> "OutputTally":
+        """Hand over what was counted so far, a worker sends it to the parent."""
+        taken = OutputTally()
+        taken.written, self.written = self.written, []
+        taken.unchanged, self.unchanged = self.unchanged, []
+        taken.removed, self.removed = self.removed, []
+        return taken
+
+    def merge(self, other: "OutputTally") -> None:
+        """Add a worker's tally."""
+        self.written.extend(other.written)
+        self.unchanged.extend(other.unchanged)
+        self.removed.extend(other.removed)
+
+    def summary(self) -> str:
+        """One line for people."""
+        return f"{len(self.written)} files written, {len(self.unchanged)} unchanged, {len(self.removed)} removed"
+
+
+class Mirror:
+    """Another folder with the same files as source, except for some bytes in the pages."""
+
+    def __init__(self, source: str, folder: str, replacements: list[tuple[bytes, bytes]], skip: set[str]) -> None:
+        """Files named in skip are left out, the mirror has its own."""
+        self.source = os.path.abspath(source)
+        self.folder = folder
+        self.replacements = replacements
+        self.skip = skip
+
+    def target(self, path: str) -> str | None:
+        """Where the copy of a file goes, None if it isn't copied."""
+        relative = os.path.relpath(os.path.abspath(path), self.source)
+        name = os.path.basename(relative)
+        # compressed copies are made from the copy, the manifest describes the source
+        if relative.startswith("..") or name in self.skip or name.startswith(".") or name.endswith(_SIDECARS):
+            return None
+        return os.path.join(self.folder, relative)
+
+    def convert(self, path: str, data: bytes) -> bytes:
+        """The copy's content."""
+        if not path.endswith(".html"):
+            return data
+        for old, new in self.replacements:
+            data = data.replace(old, new)
+        return data
+
+
+def _hash_file(path: str, size: int) -> str | None:
+    """Hash of the file, None if it isn't there or isn't size bytes long."""
+    try:
+        if os.path.getsize(path) != size:
+            return None
+        digest = hashlib.sha256()
+        with open(path, "rb") as file:
+            for chunk in iter(lambda: file.read(_CHUNK), b""):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.hexdigest()
+
+
+def write_bytes(path: str, chunks: Iterable[bytes]) -> bool:
+    """Write chunks to path unless it already holds exactly them, True if it was written."""
+    mirrored = [(mirror, target) for mirror in MIRRORS if (target := mirror.target(path)) is not None]
+    if not mirrored:
+        return _write(path, chunks)
+    data = b"".join(chunks)
+    changed = _write(path, [data])
+    for mirror, target in mirrored:
+        make_folder(os.path.dirname(target))
+        write_bytes(target, [mirror.convert(path, data)])
+    return changed
+
+
+def _write(path: str, chunks: Iterable[bytes]) -> bool:
+    """Write one file, to the archive when archiving."""
+    if SINK is not None:
+        return _add_to_archive(SINK, path, chunks)
+    # compressing threads write files too
+    temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    compressor = precompress.COMPRESSOR
+    compressed = compressor is not None and compressor.wants(path)
+    stream = compressor.stream(path) if compressor is not None and compressed else None
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        with open(temporary_path, "wb") as file:
+            for chunk in chunks:
+                digest.update(chunk)
+                size += len(chunk)
+                file.write(chunk)
+                if stream is not None:
+                    stream.feed(chunk)
+        if _hash_file(path, size) == digest.hexdigest():
+            os.remove(temporary_path)
+            changed = False
+        else:
+            os.replace(temporary_path, path)
+            changed = True
+    except BaseException:
+        if stream is not None:
+            stream.abort()
+        with contextlib.suppress(OSError):
+            os.remove(temporary_path)
+        raise
+    if TALLY is not None:
+        (TALLY.written if changed else TALLY.unchanged).append(path)
+    if stream is not None:
+        stream.close()
+    elif compressor is not None and compressed:
+        # its sidecars were there, so it's read back only if it changed
+        compressor.submit(path, None, changed)
+    return changed
+
+
+def _add_to_archive(sink: ArchiveSink, path: str, chunks: Iterable[bytes]) -> bool:
+    """Add a file to the archive, unless the same file is already there."""
+    data = b"".join(chunks)
+    changed = sink.add(path, data)
+    if TALLY is not None:
+        (TALLY.written if changed else TALLY.unchanged).append(path)
+    compressor = precompress.COMPRESSOR
+    if compressor is not None and compressor.wants(path):
+        compressor.submit(path, data, changed)
+    return changed
+
+
+def write_text(path: str, pieces: Iterable[str]) -> bool:
+    """Write text, a piece at a time, with the platform's line endings like open(path, "w") does."""
+    if os.linesep == "\n":
+        return write_bytes(path, (piece.encode("utf-8") for piece in pieces))
+    return write_bytes(path, (piece.replace("\n", os.linesep).encode("utf-8") for piece in pieces))
+
+
+def remove(path: str) -> bool:
+    """Remove a file that isn't output anymore, and its compressed copies, True if it was there."""
+    if SINK is not None:
+        # the output folder isn't ours while archiving
+        return False
+    for mirror in MIRRORS:
+        target = mirror.target(path)
+        if target is not None:
+            remove(target)
+    for suffix in _SIDECARS:
+        _remove(path + suffix)
+    return _remove(path)
+
+
+def keep(path: str) -> None:
+    """A file this run leaves as it is without writing it, e.g. an incremental build's unchanged page."""
+    if TALLY is not None and SINK is None:
+        TALLY.unchanged.append(path)
+
+
+def prune(root: str, requested: list[str]) -> None:
+    """Remove the pages the last run for the same modules wrote to root and this one didn't, record this one's."""
+    if TALLY is None or SINK is not None:
+        return
+    root = os.path.abspath(root)
+    produced = set()
+    for path in [*TALLY.written, *TALLY.unchanged]:
+        relative = os.path.relpath(os.path.abspath(path), root).replace(os.sep, "/")
+        # compressed copies and mirrors go with their page
+        if relative.endswith(".html") and not relative.startswith(".."):
+            produced.add(relative)
+    record_path = os.path.join(root, OUTPUTS_NAME)
+    try:
+        with open(record_path, encoding="utf-8") as file:
+            record = json.load(file)
+    except (OSError, ValueError):
+        record = {}
+    if not isinstance(record, dict):
+        record = {}
+    key = " ".join(sorted(requested))
+    others = {relative for other, paths in record.items() if other != key for relative in paths}
+    for relative in sorted(set(record.get(key, [])) - produced - others):
+        if remove(os.path.join(root, relative)):
+            LOGGER.info("removed %s, this run didn't write it", relative)
+    record[key] = sorted(produced)
+    write_text(record_path, [json.dumps(record, indent=1, sort_keys=True)])
+
+
+def _remove(path: str) -> bool:
+    """Remove one file, True if it was there."""
+    try:
+        os.remove(path)
+    except OSError:
+        return False
+    if TALLY is not None:
+        TALLY.removed.append(path)
+    return True
+
+
+def archiving() -> bool:
+    """True if files go into an archive, and what is in the output folder doesn't matter."""
+    return SINK is not None
+
+
+def exists(path: str) -> bool:
+    """True if the file was written, to the archive when archiving."""
+    if SINK is not None:
+        return SINK.has(path)
+    return os.path.exists(path)
+
+
+def size_of(path: str) -> int | None:
+    """Size of a written file, None if there is no such file."""
+    if SINK is not None:
+        return SINK.size_of(path)
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def make_folder(folder: str) -> None:
+    """Create a folder for output files, unless they go into an archive."""
+    if SINK is None:
+        os.makedirs(folder, exist_ok=True)
+
+
+def start_worker(root: str, archive: bool) -> OutputTally:
+    """Count a worker process's output files, kept in memory for the parent's archive, if there is one."""
+    global TALLY, SINK  # pylint: disable=global-statement
+    if SINK is not None:
+        # A forked worker shares the archive's file with the parent. Closing
+        # its copy, garbage collection does too, would write the entries
+        # buffered before the fork and the archive's ending into it again.
+        _INHERITED.append(SINK)
+    TALLY = OutputTally()
+    SINK = CapturedFiles(root) if archive else None
+    return TALLY
+
+
+def take_captured() -> list[tuple[str, bytes]]:
+    """Files captured so far."""
+    return SINK.take() if isinstance(SINK, CapturedFiles) else []
+
+
+def replay(files: list[tuple[str, bytes]]) -> None:
+    """Put a worker's files where they go."""
+    for path, data in files:
+        if SINK is not None:
+            SINK.add(path, data)
+        else:
+            write_bytes(path, [data])
+
+
+def start(root: str = "", archive: str | None = None) -> OutputTally:
+    """Count output files for this run, and open the archive they go into, if any."""
+    global TALLY, SINK  # pylint: disable=global-statement
+    TALLY = OutputTally()
+    SINK = open_archive(archive, root) if archive else None
+    return TALLY
+
+
+def finish() -> OutputTally | None:
+    """Finish the archive, log the counts and stop counting."""
+    global TALLY, LAST, SINK  # pylint: disable=global-statement
+    if SINK is not None:
+        SINK.close()
+        SINK = None
+    if TALLY is not None:
+        LOGGER.info("Output: %s", TALLY.summary())
+    LAST, TALLY = TALLY, None
+    return LAST
+
+
+def discard() -> None:
+    """Throw away the half written archive and stop counting, after a failed run."""
+    global TALLY, SINK  # pylint: disable=global-statement
+    if SINK is not None:
+        SINK.abort()
+        SINK = None
+    TALLY = None
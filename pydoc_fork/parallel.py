@@ -0,0 +1,179 @@
+"""
+Farm page generation out to a pool of worker processes.
+
+Each worker imports and renders its share of modules. The parent merges the
+written paths and the modules each page mentioned back into its own state,
+so the rest of the run can't tell the difference from a serial run.
+"""
+
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Any, Union
+
+from pydoc_fork import (
+    crawl,
+    incremental,
+    inventory,
+    model_cache,
+    output_files,
+    precompress,
+    profiling,
+    search_index,
+    settings,
+    stdlib_bundle,
+    theme_variants,
+)
+from pydoc_fork.inspector import lookups
+from pydoc_fork.inspector.custom_types import TypeLike
+
+LOGGER = logging.getLogger(__name__)
+
+_POOL: ProcessPoolExecutor | None = None
+
+
+def settings_snapshot() -> dict[str, Any]:
+    """Copy the configuration globals so a worker can be set up like the parent."""
+    return {key: value for key, value in vars(settings).items() if key.isupper() and key != "MENTIONED_MODULES"}
+
+
+def _init_worker(
+    snapshot: dict[str, Any],
+    sys_path: list[str],
+    cwd: str,
+    output_folder: str,
+    external: dict[str, str],
+) -> None:
+    """Make a freshly started worker look like the parent process."""
+    for key, value in snapshot.items():
+        setattr(settings, key, value)
+    # read once by the parent, other projects' inventories may be downloads
+    inventory.EXTERNAL = external
+    settings.MENTIONED_MODULES.clear()
+    sys.path[:] = sys_path
+    os.chdir(cwd)
+    # workers only read the manifest, the parent saves what they send back
+    incremental.MANIFEST = incremental.BuildManifest(output_folder) if settings.INCREMENTAL else None
+    # the parent decides what gets crawled
+    crawl.FRONTIER = None
+    # circular ref
+    from pydoc_fork import isolation
+
+    # a forked worker would share the parent's isolation worker and its pipe
+    isolation._WORKER = None  # pylint: disable=protected-access
+    # the parent trims the cache once everyone is done
+    model_cache.CACHE = None
+    if settings.CACHE:
+        model_cache.start()
+    lookups.start()
+    stdlib_bundle.start()
+    search_index.start()
+    profiling.start()
+    # only the parent writes to the archive
+    output_files.start_worker(output_folder, bool(settings.OUTPUT_ARCHIVE))
+    theme_variants.mirror(output_folder)
+    precompress.start()
+    from pydoc_fork.reporter.jinja_code import refresh_loader
+
+    refresh_loader()
+
+
+def _document_in_worker(
+    thing: str,
+    output_folder: str,
+) -> tuple[
+    str | None,
+    list[tuple[str, str]],
+    dict[str, Any] | None,
+    dict[str, list[search_index.Entry]],
+    list[profiling.ModuleProfile],
+    output_files.OutputTally,
+    list[tuple[str, bytes]],
+]:
+    """Document one module, report its file, mentions, manifest entry, search entries, profile and output."""
+    # circular ref
+    from pydoc_fork.commands import document_one
+
+    settings.MENTIONED_MODULES.clear()
+    full_path = document_one(thing, output_folder)
+    # Module objects don't cross process boundaries, their importable names do.
+    # Pages that weren't rendered here mention modules by importable name already.
+    mentioned = sorted(
+        {(module if isinstance(module, str) else module.__name__, name) for module, name in settings.MENTIONED_MODULES}
+    )
+    settings.MENTIONED_MODULES.clear()
+    entry = incremental.MANIFEST.entries.get(thing) if incremental.MANIFEST is not None else None
+    found: dict[str, list[search_index.Entry]] = {}
+    if search_index.INDEX is not None:
+        found, search_index.INDEX.pages = search_index.INDEX.pages, {}
+    profiled = profiling.PROFILE.take() if profiling.PROFILE is not None else []
+    # threads left running when the pool stops the worker would never finish
+    precompress.wait()
+    tally = output_files.TALLY.take() if output_files.TALLY is not None else output_files.OutputTally()
+    return full_path, mentioned, entry, found, profiled, tally, output_files.take_captured()
+
+
+def _get_pool(jobs: int, output_folder: str) -> ProcessPoolExecutor:
+    """Start the pool on first use, so workers see the final configuration."""
+    global _POOL  # pylint: disable=global-statement
+    if _POOL is None:
+        LOGGER.debug("Starting %s worker processes", jobs)
+        _POOL = ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_worker,
+            initargs=(settings_snapshot(), list(sys.path), os.getcwd(), output_folder, inventory.EXTERNAL),
+        )
+    return _POOL
+
+
+def shutdown_pool() -> None:
+    """Stop the workers, if any were started."""
+    global _POOL  # pylint: disable=global-statement
+    if _POOL is not None:
+        _POOL.shutdown()
+        _POOL = None
+
+
+def document_in_pool(
+    things: list[Union[TypeLike, str]],
+    output_folder: str,
+    jobs: int,
+) -> list[str]:
+    """Document each thing in a worker process, return written paths in input order."""
+    names = [thing if isinstance(thing, str) else thing.__name__ for thing in things]
+    # Same module twice would mean two workers racing on one file.
+    unique_names = list(dict.fromkeys(names))
+
+    pool = _get_pool(jobs, output_folder)
+    results = dict(
+        zip(
+            unique_names,
+            pool.map(partial(_document_in_worker, output_folder=output_folder), unique_names),
+            strict=True,
+        )
+    )
+
+    written: list[str] = []
+    for name in names:
+        full_path, _, _, _, _, _, _ = results[name]
+        if full_path:
+            written.append(full_path)
+    for name in unique_names:
+        _, mentioned, entry, found, profiled, tally, captured = results[name]
+        for module_name, link_name in mentioned:
+            settings.MENTIONED_MODULES.add((module_name, link_name))
+        if crawl.FRONTIER is not None:
+            crawl.FRONTIER.record(name, mentioned)
+        if entry is not None and incremental.MANIFEST is not None:
+            incremental.MANIFEST.entries[name] = entry
+        if search_index.INDEX is not None:
+            for url, page_entries in found.items():
+                search_index.INDEX.add(url, page_entries)
+        if profiling.PROFILE is not None:
+            profiling.PROFILE.modules.extend(profiled)
+        if output_files.TALLY is not None:
+            output_files.TALLY.merge(tally)
+        output_files.replay(captured)
+    return written
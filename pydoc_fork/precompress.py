@@ -0,0 +1,218 @@
+"""
+Gzip and brotli sidecars, page.html.gz and page.html.br, for static hosts.
+
+The chunks of a page are handed to a small thread pool as the page is
+written, and compressed there while the rest is rendered and the next module
+is inspected. zlib and brotli let go of the GIL while they work, and a big
+page is never held whole in memory. A page whose sidecars are already there
+is most likely unchanged, it isn't compressed unless it did change, then it
+is read back. Sidecars go through output_files like everything else, so they
+are only rewritten when they change, and gzip's header carries no timestamp
+to make sure they don't change needlessly. Brotli sidecars need the optional
+brotli package. Going into an output archive, files are compressed as they
+are added, so entries keep their order.
+"""
+
+import gzip
+import io
+import logging
+import os
+import queue
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from pydoc_fork import settings
+
+LOGGER = logging.getLogger(__name__)
+
+COMPRESSOR: "Precompressor | None" = None
+"""Compressor for the current run, None when precompression is off."""
+
+COMPRESSIBLE = (".html", ".css", ".js", ".json")
+"""Extensions that get sidecars"""
+
+_CHUNK = 1024 * 1024
+
+_QUEUED = 4
+"""Chunks of a page waiting for its compressing thread, before the writer waits too"""
+
+
+def load_brotli() -> Any | None:
+    """The brotli module, None if it isn't installed."""
+    try:
+        import brotli  # type: ignore[import-not-found]  # pylint: disable=import-outside-toplevel
+    except ImportError:
+        return None
+    return brotli
+
+
+class SidecarStream:
+    """Chunks of a file on their way from its writer to a compressing thread."""
+
+    def __init__(self) -> None:
+        """Nothing written yet."""
+        self.chunks: queue.Queue[bytes | None] = queue.Queue(maxsize=_QUEUED)
+        self.buffer = bytearray()
+        self.failed = False
+
+    def feed(self, chunk: bytes) -> None:
+        """Pass on what was written, in chunks big enough to be worth a trip to the thread."""
+        self.buffer += chunk
+        if len(self.buffer) >= _CHUNK:
+            self.chunks.put(bytes(self.buffer))
+            self.buffer.clear()
+
+    def close(self) -> None:
+        """The file is written."""
+        if self.buffer:
+            self.chunks.put(bytes(self.buffer))
+            self.buffer.clear()
+        self.chunks.put(None)
+
+    def abort(self) -> None:
+        """Writing the file failed, it gets no sidecars."""
+        self.failed = True
+        self.buffer.clear()
+        self.chunks.put(None)
+
+    def __iter__(self) -> Iterator[bytes]:
+        """The chunks, as they come."""
+        while (chunk := self.chunks.get()) is not None:
+            yield chunk
+
+
+class Precompressor:
+    """Compresses files in threads, at most a few files behind the writer."""
+
+    def __init__(self, threads: int, brotli: Any | None, inline: bool = False) -> None:
+        """Threads start when the first file comes in, inline compresses on the caller's thread."""
+        self.brotli = brotli
+        self.inline = inline
+        self.suffixes = (".gz", ".br") if brotli is not None else (".gz",)
+        self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="precompress")
+        # bounds the work piling up when rendering outruns compressing
+        self.limit = threads * 2
+        self.pending: deque[Future[None]] = deque()
+
+    def wants(self, path: str) -> bool:
+        """True for files that get sidecars."""
+        return path.endswith(COMPRESSIBLE)
+
+    def has_sidecars(self, path: str) -> bool:
+        """True if every sidecar of the file is there."""
+        return all(os.path.exists(path + suffix) for suffix in self.suffixes)
+
+    def stream(self, path: str) -> SidecarStream | None:
+        """Compress a file as it is written, None if its sidecars are there, it is most likely unchanged."""
+        if self.inline or self.has_sidecars(path):
+            return None
+        stream = SidecarStream()
+        self._queue(lambda: self._compress(path, stream, stream))
+        return stream
+
+    def submit(self, path: str, data: bytes | None, changed: bool) -> None:
+        """A file was written, or found unchanged, compress it unless its sidecars are already there.
+
+        data is what went into an archive, None to read the file back from the output folder.
+        """
+        if not changed and self.has_sidecars(path):
+            return
+        chunks: Iterable[bytes] = [data] if data is not None else _read_chunks(path)
+        if self.inline:
+            self._compress(path, chunks)
+            return
+        self._queue(lambda: self._compress(path, chunks))
+
+    def _queue(self, work: Callable[[], None]) -> None:
+        """Run on a thread, once there is room."""
+        while len(self.pending) >= self.limit:
+            self._settle(self.pending.popleft())
+        self.pending.append(self.pool.submit(work))
+
+    def _compress(self, path: str, chunks: Iterable[bytes], stream: SidecarStream | None = None) -> None:
+        """Write the sidecars of one file, compressing it a chunk at a time."""
+        # circular ref
+        from pydoc_fork.output_files import write_bytes
+
+        gzipped = io.BytesIO()
+        brotli = self.brotli.Compressor() if self.brotli is not None else None
+        brotli_chunks: list[bytes] = []
+        with gzip.GzipFile(filename="", mode="wb", fileobj=gzipped, compresslevel=9, mtime=0) as gzip_file:
+            for chunk in chunks:
+                gzip_file.write(chunk)
+                if brotli is not None:
+                    brotli_chunks.append(brotli.process(chunk))
+        if stream is not None and stream.failed:
+            return
+        write_bytes(path + ".gz", [gzipped.getvalue()])
+        if brotli is not None:
+            brotli_chunks.append(brotli.finish())
+            write_bytes(path + ".br", brotli_chunks)
+
+    def _settle(self, future: "Future[None]") -> None:
+        """Wait for one file, a failure leaves that file without sidecars."""
+        try:
+            future.result()
+        except OSError as error:
+            LOGGER.warning("Can't write compressed copies, got %s", error)
+
+    def wait(self) -> None:
+        """Wait until every file so far has its sidecars."""
+        while self.pending:
+            self._settle(self.pending.popleft())
+
+    def close(self) -> None:
+        """Wait, then stop the threads."""
+        self.wait()
+        self.pool.shutdown()
+
+    def cancel(self) -> None:
+        """Stop the threads, files they haven't started on get no sidecars."""
+        self.pending.clear()
+        self.pool.shutdown(cancel_futures=True)
+
+
+def _read_chunks(path: str) -> Iterator[bytes]:
+    """A file, a chunk at a time."""
+    with open(path, "rb") as file:
+        yield from iter(lambda: file.read(_CHUNK), b"")
+
+
+def start() -> Precompressor | None:
+    """Start compressing for this run, if asked to."""
+    global COMPRESSOR  # pylint: disable=global-statement
+    # circular ref
+    from pydoc_fork.output_files import archiving
+
+    if not settings.PRECOMPRESS:
+        COMPRESSOR = None
+        return None
+    brotli = load_brotli()
+    if brotli is None:
+        LOGGER.info("brotli isn't installed, writing only .gz copies")
+    COMPRESSOR = Precompressor(min(4, os.cpu_count() or 1), brotli, inline=archiving())
+    return COMPRESSOR
+
+
+def wait() -> None:
+    """Wait for the sidecars of everything written so far."""
+    if COMPRESSOR is not None:
+        COMPRESSOR.wait()
+
+
+def finish() -> None:
+    """Write the remaining sidecars and stop."""
+    global COMPRESSOR  # pylint: disable=global-statement
+    if COMPRESSOR is not None:
+        COMPRESSOR.close()
+        COMPRESSOR = None
+
+
+def discard() -> None:
+    """Stop without compressing what is still waiting, after a failed run."""
+    global COMPRESSOR  # pylint: disable=global-statement
+    if COMPRESSOR is not None:
+        COMPRESSOR.cancel()
+        COMPRESSOR = None
@@ -0,0 +1,183 @@
+"""
+Where a docs build spends its time, per module.
+
+With a report path configured, every module documented records how long it
+took to import, inspect, render and write, how big its page is and the peak
+memory traced while it was documented. The report is written as json and the
+slowest modules are printed when the run is done. Off, nothing is timed and
+tracemalloc is never started.
+"""
+
+import json
+import logging
+import os
+import time
+import tracemalloc
+from collections.abc import Iterable, Iterator
+from typing import Any
+
+from pydoc_fork import settings
+
+LOGGER = logging.getLogger(__name__)
+
+PROFILE: "BuildProfile | None" = None
+"""Profile of the current run, None when not profiling."""
+
+PHASES = ("import", "inspect", "render", "write")
+"""What each module's time is split into"""
+
+
+class ModuleProfile:
+    """Time, size and memory of documenting one module.
+
+    source is how the model was made: imported, isolated, cached, bundled or
+    failed. Time spent importing a module is part of inspecting it when the
+    import happened in the isolation worker.
+    """
+
+    __slots__ = ("bytes", "name", "peak_memory", "seconds", "source")
+
+    def __init__(self, name: str) -> None:
+        """Nothing measured yet."""
+        self.name = name
+        self.source = "imported"
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.bytes = 0
+        self.peak_memory = 0
+
+    def total(self) -> float:
+        """Seconds spent on this module."""
+        return sum(self.seconds.values())
+
+    def as_json(self) -> dict[str, Any]:
+        """For the report."""
+        return {
+            "name": self.name,
+            "source": self.source,
+            **{f"{phase}_seconds": round(seconds, 6) for phase, seconds in self.seconds.items()},
+            "total_seconds": round(self.total(), 6),
+            "bytes": self.bytes,
+            "peak_memory": self.peak_memory,
+        }
+
+
+class BuildProfile:
+    """Every module documented this run, in the order they were done."""
+
+    def __init__(self) -> None:
+        """Start tracing memory, unless something else already is."""
+        self.modules: list[ModuleProfile] = []
+        self.current: ModuleProfile | None = None
+        self.started = time.perf_counter()
+        self.owns_tracing = not tracemalloc.is_tracing()
+        if self.owns_tracing:
+            tracemalloc.start()
+
+    def begin(self, name: str) -> ModuleProfile:
+        """A module is about to be documented."""
+        self.current = ModuleProfile(name)
+        tracemalloc.reset_peak()
+        return self.current
+
+    def end(self, record: ModuleProfile, full_path: str | None) -> None:
+        """The module is done, full_path is None if it failed."""
+        if full_path is None:
+            record.source = "failed"
+        else:
+            # circular ref
+            from pydoc_fork.output_files import size_of
+
+            record.bytes = size_of(full_path) or 0
+        record.peak_memory = tracemalloc.get_traced_memory()[1]
+        self.modules.append(record)
+        self.current = None
+
+    def take(self) -> list[ModuleProfile]:
+        """Hand over what was recorded so far, a worker sends it to the parent."""
+        taken, self.modules = self.modules, []
+        return taken
+
+    def report(self) -> dict[str, Any]:
+        """Everything recorded, slowest module first."""
+        modules = sorted(self.modules, key=lambda record: (-record.total(), record.name))
+        return {
+            "wall_seconds": round(time.perf_counter() - self.started, 6),
+            "modules": [record.as_json() for record in modules],
+            "totals": {
+                "modules": len(modules),
+                **{f"{phase}_seconds": round(sum(m.seconds[phase] for m in modules), 6) for phase in PHASES},
+                "bytes": sum(record.bytes for record in modules),
+                "peak_memory": max((record.peak_memory for record in modules), default=0),
+            },
+        }
+
+    def summary(self, top: int) -> str:
+        """The slowest modules as a table."""
+        modules = sorted(self.modules, key=lambda record: (-record.total(), record.name))[:top]
+        lines = [f"Slowest {len(modules)} of {len(self.modules)} modules, seconds:"]
+        headings = ("total", *PHASES, "KB", "peak MB")
+        lines.append(" ".join(f"{heading:>8}" for heading in headings) + "  module")
+        for record in modules:
+            times = " ".join(f"{record.seconds[phase]:8.3f}" for phase in PHASES)
+            lines.append(
+                f"{record.total():8.3f} {times} {record.bytes / 1024:8.1f} "
+                f"{record.peak_memory / 1024 / 1024:8.1f}  {record.name} ({record.source})"
+            )
+        return "\n".join(lines)
+
+    def write(self, path: str) -> str:
+        """Write the json report."""
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(self.report(), file, indent=2)
+        return path
+
+    def stop(self) -> None:
+        """Stop tracing memory, if this started it."""
+        if self.owns_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def timed(pieces: Iterable[str], record: ModuleProfile) -> Iterator[str]:
+    """Pass pieces of a page through, counting the time spent making them as rendering."""
+    iterator = iter(pieces)
+    while True:
+        started = time.perf_counter()
+        try:
+            piece = next(iterator)
+        except StopIteration:
+            record.seconds["render"] += time.perf_counter() - started
+            return
+        record.seconds["render"] += time.perf_counter() - started
+        yield piece
+
+
+def start() -> BuildProfile | None:
+    """Start profiling this run, if a report was asked for."""
+    global PROFILE  # pylint: disable=global-statement
+    PROFILE = BuildProfile() if settings.PROFILE else None
+    return PROFILE
+
+
+def finish() -> str | None:
+    """Write the report, print the slowest modules and stop profiling."""
+    global PROFILE  # pylint: disable=global-statement
+    if PROFILE is None or not settings.PROFILE:
+        PROFILE = None
+        return None
+    profile, PROFILE = PROFILE, None
+    profile.stop()
+    path = profile.write(settings.PROFILE)
+    LOGGER.info("wrote profile of %s modules to %s", len(profile.modules), path)
+    print(profile.summary(settings.PROFILE_TOP))
+    return path
+
+
+def discard() -> None:
+    """Stop profiling without a report, after a failed run."""
+    global PROFILE  # pylint: disable=global-statement
+    if PROFILE is not None:
+        PROFILE.stop()
+        PROFILE = None
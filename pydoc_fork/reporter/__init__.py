@@ -1,6 +1,6 @@
 """
 This module has everything that turns type info into html.
 
-It also has a lot of type-lookup and type-discovery logic woven
-into into it, what we'd call a bad separation of concerns.
+It renders the model that pydoc_fork.inspector.builder makes, the doc* functions
+that take live objects build the model first.
 """
@@ -2,40 +2,41 @@
 Roughly a UI component for classes
 """
 
-import builtins
-import contextlib
-import inspect
-import sys
-from collections import deque
-from collections.abc import Callable
-from typing import Any, Union, cast
-
-from pydoc_fork import settings
+from collections.abc import Iterator
+from typing import Any, Union
+
+from pydoc_fork.inspector.builder import build_class, class_ref
 from pydoc_fork.inspector.custom_types import TypeLike
-from pydoc_fork.inspector.utils import (
-    _split_list,
-    classify_class_attrs,
-    classname,
-    getdoc,
-    sort_attributes,
-    visiblename,
-)
-from pydoc_fork.reporter import inline_styles
-from pydoc_fork.reporter.format_data import document_data
-from pydoc_fork.reporter.format_other import docother
+from pydoc_fork.inspector.model import AttributeSection, ClassDoc, ClassRef, DataDoc, RoutineDoc, TreeEntry
+from pydoc_fork.reporter import inline_styles, jinja_code
+from pydoc_fork.reporter.format_data import render_data
+from pydoc_fork.reporter.format_other import render_other
 from pydoc_fork.reporter.formatter_html import markup, section
-from pydoc_fork.reporter.jinja_code import JINJA_ENV
+from pydoc_fork.reporter.jinja_code import get_template
+
+ATTRIBUTE_LABELS = {
+    "method": "Methods",
+    "class method": "Class methods",
+    "static method": "Static methods",
+    "readonly property": "Readonly properties",
+    "data descriptor": "Data descriptors",
+    "data": "Data and other attributes",
+}
+"""Heading for each kind of class attribute"""
+
+
+def render_class_ref(ref: ClassRef) -> str:
+    """Link to a class, or just its name if it can't be linked to."""
+    if ref.url:
+        return f'<a href="{ref.url}">{ref.text}</a>'
+    return ref.text
 
 
 def classlink(the_object: Union[TypeLike, type], modname: str) -> str:
     """Make a link for a class."""
-    name, module = the_object.__name__, sys.modules.get(the_object.__module__)
-    if module is not None and hasattr(module, name) and getattr(module, name) is the_object:
-        return f'<a href="{module.__name__}.html#{name}">{classname(cast(TypeLike, the_object), modname)}</a>'
-    return classname(the_object, modname)
+    return render_class_ref(class_ref(the_object, modname))
 
 
-# noinspection PyBroadException
 def docclass(
     the_object: TypeLike,
     name: str = "",
@@ -44,233 +45,239 @@ def docclass(
     classes: dict[str, str] | None = None,
 ) -> str:
     """Produce HTML documentation for a class object."""
+    return render_class(build_class(the_object, name, mod), funcs, classes)
+
+
+def render_class(
+    doc: ClassDoc,
+    funcs: dict[str, str] | None = None,
+    classes: dict[str, str] | None = None,
+) -> str:
+    """Render a class, funcs and classes are what names in doc strings can link to."""
     funcs = funcs or {}
     classes = classes or {}
-
-    real_name = the_object.__name__
-    name = name or real_name
-    bases = the_object.__bases__
+    methods = doc.method_links
 
     contents: list[str] = []
     push = contents.append
 
-    class HorizontalRule:
-        """Cute little class to pump out a horizontal rule between sections."""
-
-        def __init__(self) -> None:
-            self.need_one = 0
-
-        def maybe(self) -> None:
-            """Skip"""
-            if self.need_one:
-                push("<hr>\n")
-            self.need_one = 1
-
-    # pylint:disable=invalid-name
-    hr = HorizontalRule()
-
-    # List the mro, if non-trivial.
-    mro = deque(inspect.getmro(cast(type, the_object)))
-    if len(mro) > 2:
-        hr.maybe()
+    # horizontal rule between sections
+    need_rule = False
+    if doc.mro:
+        need_rule = True
         push("<dl><dt>Method resolution order:</dt>\n")
-        for base in mro:
-            push(f"<dd>{classlink(base, the_object.__module__)}</dd>\n")
+        for base in doc.mro:
+            push(f"<dd>{render_class_ref(base)}</dd>\n")
         push("</dl>\n")
 
-    def spill(msg: str, attrs_in: list[Any], predicate: Callable[[Any], Any]) -> list[Any]:
-        """Not sure"""
-        ok, attrs = _split_list(attrs_in, predicate)
-        if ok:
-            hr.maybe()
-            push(msg)
-            for name, _, _, value in ok:
-                # noinspection PyBroadException
-                try:
-                    value = getattr(the_object, name)
-                except Exception:  # nosec
-                    # Some descriptors may meet a failure in their __get__.
-                    # (bug #1785)
-                    push(
-                        document_data(
-                            value,
-                            name,
-                            # mod, unused
-                        )
-                    )
-                else:
-                    # circular ref
-                    # pylint: disable=import-outside-toplevel
-                    from pydoc_fork.reporter.format_page import document
-
-                    push(document(value, name, mod, funcs, classes, module_dict, the_object))
-                push("\n")
-        return attrs
-
-    def kind_is(expected_kind: str) -> Callable[[Any], bool]:
-        """Build an attribute-kind predicate compatible with _split_list."""
-
-        def predicate(item: Any) -> bool:
-            return item[1] == expected_kind
-
-        return predicate
-
-    def spilldescriptors(
-        msg: str,
-        attrs_in: list[Any],  # Tuple[str, str, type, "object"]
-        predicate: Callable[[Any], bool],
-    ) -> list[Any]:
-        """Not sure"""
-        ok, attrs = _split_list(attrs_in, predicate)
-        if ok:
-            hr.maybe()
-            push(msg)
-            for name, _, _, value in ok:
-                push(
-                    document_data(
-                        value,
-                        name,
-                        # mod, ignored
-                    )
-                )
-        return attrs
-
-    def spilldata(msg: str, attrs_in: list[Any], predicate: Callable[[Any], bool]) -> list[Any]:
-        """Not sure"""
-        ok, attrs = _split_list(attrs_in, predicate)
-        if ok:
-            hr.maybe()
-            push(msg)
-            for name, _, __, value in ok:
-                base = docother(
-                    getattr(the_object, name),
-                    name,
-                    # mod ignored
-                )
-                found_doc = getdoc(value)
-                if not found_doc:
-                    push(f"<dl><dt>{base}</dl>\n")
-                else:
-                    found_doc = markup(getdoc(value), funcs, classes, module_dict)
-                    found_doc = f"<dd><tt>{found_doc}</tt>"
-                    push(f"<dl><dt>{base}{found_doc}</dl>\n")
-                push("\n")
-        return attrs
-
-    attrs = [
-        (name, kind, cls, value)
-        for name, kind, cls, value in classify_class_attrs(the_object)
-        if visiblename(name, obj=the_object)
-    ]
-
-    module_dict: dict[Any, str] = {}
-    for key, _, _, value in attrs:
-        module_dict[key] = anchor = "#" + name + "-" + key
-        with contextlib.suppress(Exception):
-            value = getattr(the_object, key)
-        with contextlib.suppress(TypeError):
-            # The value may not be hashable (e.g., a data attr with
-            # a dict or list value).
-            module_dict[value] = anchor
-
-    while attrs:
-        this_class = mro.popleft() if mro else attrs[0][2]
-
-        # flake8 doesn't like the closure in the lambda
-        is_this_class: Callable[[Any], Any] = lambda t: t[2] is this_class  # noqa
-        attrs, inherited = _split_list(attrs, is_this_class)
-
-        if the_object is not builtins.object and this_class is builtins.object:
-            attrs = inherited
-            continue
-        if this_class is the_object:
+    inherited = _InheritedFragments(doc, funcs, classes)
+    for attribute_section in doc.sections:
+        if need_rule:
+            push("<hr>\n")
+        need_rule = True
+        if attribute_section.defined_by is None:
             tag = "defined here"
         else:
-            tag = f"inherited from {classlink(this_class, the_object.__module__)}"
-        tag += ":<br>\n"
-
-        sort_attributes(attrs, the_object)
-
-        # feature to remove typing annotations cruft.
-        for kind in attrs.copy():
-            module_name = inspect.getmodule(kind)
-            if module_name and module_name.__name__ in settings.SKIP_MODULES:
-                attrs.remove(kind)
-
-        # Pump out the attrs, segregated by kind.
-        attrs = spill(f"Methods {tag}", attrs, kind_is("method"))
-        attrs = spill(f"Class methods {tag}", attrs, kind_is("class method"))
-        attrs = spill(f"Static methods {tag}", attrs, kind_is("static method"))
-        attrs = spilldescriptors(
-            f"Readonly properties {tag}",
-            attrs,
-            kind_is("readonly property"),
-        )
-        attrs = spilldescriptors(
-            f"Data descriptors {tag}",
-            attrs,
-            kind_is("data descriptor"),
-        )
-        attrs = spilldata(f"Data and other attributes {tag}", attrs, kind_is("data"))
-        assert not attrs  # nosec
-        attrs = inherited
+            tag = f"inherited from {render_class_ref(attribute_section.defined_by)}"
+        push(f"{ATTRIBUTE_LABELS[attribute_section.kind]} {tag}:<br>\n")
+        if attribute_section.defined_by is None:
+            push(render_members(attribute_section, funcs, classes, methods))
+        else:
+            push(inherited.render(attribute_section))
 
     contents_as_string = "".join(contents)  # type got redefined
 
+    name, real_name = doc.name, doc.real_name
     if name == real_name:
         title = f'<a name="{name}">class <strong>{real_name}</strong></a>'
     else:
         title = f'<strong>{name}</strong> = <a name="{name}">class {real_name}</a>'
-    if bases:
-        parents = []
-        for base_class in bases:
-            parents.append(classlink(base_class, the_object.__module__))
+    if doc.bases:
+        parents = [render_class_ref(base) for base in doc.bases]
         title = title + f"({', '.join(parents)})"
 
-    decl = ""
-    try:
-        signature = inspect.signature(cast(Any, the_object))
-    except (ValueError, TypeError):
-        signature = None
-    if signature:
-        argument_specification = str(signature)
-        if argument_specification and argument_specification != "()":
-            # this will cause double escape on ->
-            # escape(argument_specification)
-            decl = name + argument_specification + "\n\n"
-
-    doc = getdoc(the_object)
-    if decl:
-        doc = decl + (doc or "")
-    doc = markup(doc, funcs, classes, module_dict)
-    doc = doc and f"<tt>{doc}<br>&nbsp;</tt>"
-
-    section_html = section(title, contents_as_string, 3, doc)
-    template = JINJA_ENV.get_template("class.jinja2")
+    text = doc.doc
+    if doc.signature:
+        # this will cause double escape on ->
+        # escape(argument_specification)
+        text = name + doc.signature + "\n\n" + (text or "")
+    marked_up = markup(text, funcs, classes, methods)
+    marked_up = marked_up and f"<tt>{marked_up}<br>&nbsp;</tt>"
+
+    section_html = section(title, contents_as_string, 3, marked_up)
+    template = get_template("class.jinja2")
     return template.render(section_html=section_html)
 
 
-def format_tree(tree: list[Any], modname: str, parent: Any | None = None) -> str:
+def render_members(
+    attribute_section: AttributeSection,
+    funcs: dict[str, str],
+    classes: dict[str, str],
+    methods: dict[str, str],
+) -> str:
+    """The members of one section of a class."""
+    # circular ref
+    # pylint: disable=import-outside-toplevel
+    from pydoc_fork.reporter.format_page import render_doc
+
+    contents: list[str] = []
+    push = contents.append
+    for member in attribute_section.members:
+        if attribute_section.kind in ("readonly property", "data descriptor"):
+            push(render_data(member))  # type: ignore[arg-type]
+        elif attribute_section.kind == "data":
+            push(render_attribute(member, funcs, classes, methods))  # type: ignore[arg-type]
+            push("\n")
+        else:
+            push(render_doc(member, funcs, classes, methods))
+            push("\n")
+    return "".join(contents)
+
+
+_CLASS_NAME = "\x00pydoc_fork_class_name\x00"
+_CLASS_ANCHOR = "\x00pydoc_fork_class_anchor\x00"
+
+_FRAGMENTS: dict[Any, str] = {}
+"""Inherited sections as rendered for any class, by what went into rendering them"""
+_FRAGMENTS_LIMIT = 1024
+_fragments_generation = -1
+
+_LINK_KEYS: dict[int, tuple[dict[str, str], frozenset[tuple[str, str]]]] = {}
+"""Hashable copies of the module's link maps, by identity, which the held map keeps valid"""
+
+
+def _links_key(links: dict[str, str]) -> frozenset[tuple[str, str]]:
+    """Hashable copy of a link map, every class on a page shares the same maps."""
+    found = _LINK_KEYS.get(id(links))
+    if found is None:
+        if len(_LINK_KEYS) >= 16:
+            _LINK_KEYS.clear()
+        found = _LINK_KEYS[id(links)] = (links, frozenset(links.items()))
+    return found[1]
+
+
+class _InheritedFragments:
+    """Renders inherited sections of one class, reusing what another class rendered.
+
+    A section inherited from a base renders the same in every subclass, except
+    for anchors and method links, which start with the subclass's name. It is
+    rendered with placeholders in their place, cached, and the placeholders
+    swapped for the name of whichever class is being rendered.
+    """
+
+    def __init__(self, doc: ClassDoc, funcs: dict[str, str], classes: dict[str, str]) -> None:
+        """Nothing is worked out until an inherited section shows up."""
+        self.doc = doc
+        self.funcs = funcs
+        self.classes = classes
+        self._methods: dict[str, str] | None = None
+        self._links: tuple[Any, ...] = ()
+
+    def _neutral_links(self) -> tuple[dict[str, str], tuple[Any, ...]]:
+        """The class's method links, with its name replaced by a placeholder."""
+        if self._methods is None:
+            prefix = f"#{self.doc.name}-"
+            self._methods = {
+                key: f"#{_CLASS_NAME}-{value[len(prefix) :]}" if value.startswith(prefix) else value
+                for key, value in self.doc.method_links.items()
+            }
+            self._links = (_links_key(self.funcs), _links_key(self.classes), frozenset(self._methods.items()))
+        return self._methods, self._links
+
+    def _neutral_member(self, member: Any) -> Any:
+        """A member with the class's name in its anchors replaced by a placeholder, None if it can't be."""
+        if isinstance(member, DataDoc):
+            return member
+        if not isinstance(member, RoutineDoc):
+            return None
+        prefix = f"{self.doc.real_name}-"
+        if not member.anchor.startswith(prefix):
+            return None
+        alias_anchor = member.alias_anchor
+        if alias_anchor is not None:
+            if not alias_anchor.startswith(f"#{prefix}"):
+                return None
+            alias_anchor = f"#{_CLASS_ANCHOR}-{alias_anchor[len(prefix) + 1 :]}"
+        return RoutineDoc(
+            member.name,
+            member.real_name,
+            f"{_CLASS_ANCHOR}-{member.anchor[len(prefix) :]}",
+            member.doc,
+            member.signature,
+            member.is_async,
+            member.note_kind,
+            member.note_class,
+            alias_anchor,
+        )
+
+    def render(self, attribute_section: AttributeSection) -> str:
+        """The members of a section inherited from a base class."""
+        global _fragments_generation  # pylint: disable=global-statement
+        if _fragments_generation != jinja_code.LOADER_GENERATION:
+            # templates changed, everything rendered with the old ones is stale
+            _FRAGMENTS.clear()
+            _fragments_generation = jinja_code.LOADER_GENERATION
+
+        members = [self._neutral_member(member) for member in attribute_section.members]
+        if None in members:
+            return render_members(attribute_section, self.funcs, self.classes, self.doc.method_links)
+        methods, links = self._neutral_links()
+        defined_by = attribute_section.defined_by
+        key = (
+            attribute_section.kind,
+            defined_by and (defined_by.text, defined_by.url),
+            tuple(_member_key(member) for member in members),
+            links,
+        )
+        fragment = _FRAGMENTS.get(key)
+        if fragment is None:
+            if len(_FRAGMENTS) >= _FRAGMENTS_LIMIT:
+                del _FRAGMENTS[next(iter(_FRAGMENTS))]
+            neutral = AttributeSection(attribute_section.kind, defined_by, members)
+            fragment = _FRAGMENTS[key] = render_members(neutral, self.funcs, self.classes, methods)
+        return fragment.replace(_CLASS_ANCHOR, self.doc.real_name).replace(_CLASS_NAME, self.doc.name)
+
+
+def _member_key(member: Union[DataDoc, RoutineDoc]) -> tuple[Any, ...]:
+    """Everything about a member that shows up when it is rendered."""
+    values = [getattr(member, slot) for slot in member.__slots__]
+    note_class = getattr(member, "note_class", None)
+    if note_class is not None:
+        values[member.__slots__.index("note_class")] = (note_class.text, note_class.url)
+    return (type(member).__name__, *values)
+
+
+def render_attribute(
+    doc: DataDoc,
+    funcs: dict[str, str],
+    classes: dict[str, str],
+    methods: dict[str, str],
+) -> str:
+    """A data attribute of a class, its value and doc string."""
+    base = render_other(doc)
+    if not doc.doc:
+        return f"<dl><dt>{base}</dl>\n"
+    found_doc = markup(doc.doc, funcs, classes, methods)
+    return f"<dl><dt>{base}<dd><tt>{found_doc}</tt></dl>\n"
+
+
+def format_tree(tree: list[TreeEntry]) -> str:
     """
     Creates a representation of class inheritance.
     """
+    return "".join(stream_tree(tree))
+
 
-    # """Produce HTML for a class tree as given by inspect.getclasstree()."""
-    result = ""
+def stream_tree(tree: list[TreeEntry]) -> Iterator[str]:
+    """Class inheritance, a class at a time."""
+    yield "<dl>\n"
     for entry in tree:
-        class_object = entry
-        if isinstance(entry, tuple):
-            class_object, bases = entry
-            result = result + f'<dt><span style="font-family:{inline_styles.SAN_SERIF}">'
-            result = result + classlink(class_object, modname)
-            if bases and bases != (parent,):
-                parents = []
-                for base in bases:
-                    parents.append(classlink(base, modname))
-                result = result + "(" + ", ".join(parents) + ")"
-            result = result + "\n</span></dt>"
-
-        elif isinstance(entry, list):
-            nested_tree = format_tree(entry, modname, class_object)
-            result = result + f"<dd>\n{nested_tree}</dd>\n"
-    return f"<dl>\n{result}</dl>\n"
+        result = f'<dt><span style="font-family:{inline_styles.SAN_SERIF}">' + render_class_ref(entry.cls)
+        if entry.bases is not None:
+            result = result + "(" + ", ".join(render_class_ref(base) for base in entry.bases) + ")"
+        yield result + "\n</span></dt>"
+        if entry.children:
+            yield "<dd>\n"
+            yield from stream_tree(entry.children)
+            yield "</dd>\n"
+    yield "</dl>\n"
@@ -2,8 +2,9 @@
 Roughly a UI component for variables and their values
 """
 
+from pydoc_fork.inspector.builder import build_data
 from pydoc_fork.inspector.custom_types import TypeLike
-from pydoc_fork.inspector.utils import getdoc
+from pydoc_fork.inspector.model import DataDoc
 from pydoc_fork.reporter.formatter_html import markup
 
 
@@ -12,8 +13,12 @@ def document_data(
     name: str = "",
 ) -> str:
     """Produce html documentation for a data descriptor."""
-    from pydoc_fork.reporter.jinja_code import JINJA_ENV
+    return render_data(build_data(the_object, name))
 
-    template = JINJA_ENV.get_template("data.jinja2")
-    doc = markup(getdoc(the_object))
-    return template.render(name=name, doc=doc)
+
+def render_data(doc: DataDoc) -> str:
+    """Render a data descriptor."""
+    from pydoc_fork.reporter.jinja_code import get_template
+
+    template = get_template("data.jinja2")
+    return template.render(name=doc.name, doc=markup(doc.doc))
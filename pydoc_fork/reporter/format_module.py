@@ -2,94 +2,59 @@
 Roughly a UI component for modules
 """
 
-import contextlib
-import inspect
 import os
-import pkgutil
-import sys
-from typing import Any, cast
+from collections.abc import Iterable, Iterator
+from itertools import chain
 
 from pydoc_fork import settings
+from pydoc_fork.inspector.builder import build_module, module_ref
 from pydoc_fork.inspector.custom_types import TypeLike
-from pydoc_fork.inspector.utils import getdoc, isdata, visiblename
+from pydoc_fork.inspector.model import ModuleDoc, ModuleRef
+from pydoc_fork.inspector.module_utils import getdocloc  # noqa: F401  # pylint: disable=unused-import
 from pydoc_fork.reporter import inline_styles
-from pydoc_fork.reporter.format_class import format_tree
+from pydoc_fork.reporter.format_class import stream_tree
 from pydoc_fork.reporter.formatter_html import (
-    STDLIB_BASEDIR,
     bigsection,
     escape,
     file_link,
     heading,
     markup,
-    module_package_link,
     multicolumn,
+    package_link,
+    stream_bigsection,
 )
-from pydoc_fork.reporter.jinja_code import JINJA_ENV
-
-
-def getdocloc(the_object: TypeLike, basedir: str = STDLIB_BASEDIR) -> str | None:
-    """Return the location of module docs or None"""
-    try:
-        file = inspect.getabsfile(cast(type, the_object))
-    except TypeError:
-        file = "(built-in)"
-
-    basedir = os.path.normcase(basedir)
-    is_known_stdlib = the_object.__name__ in (
-        "errno",
-        "exceptions",
-        "gc",
-        "imp",
-        "marshal",
-        "posix",
-        "signal",
-        "sys",
-        "_thread",
-        "zipimport",
-    )
-    is_module = isinstance(the_object, type(os))
-    is_in_pythons_folder = file.startswith(basedir) and not file.startswith(os.path.join(basedir, "site-packages"))
-    # # This is nasty special case coding, how many more special cases are there?
-    # is_exception =the_object.__name__ in ("xml.etree", "test.pydoc_mod")
-    # # special case for etree
-    # "https://docs.python.org/3/library/xml.etree.elementtree.html"
-
-    if is_module and (is_known_stdlib or is_in_pythons_folder) and settings.PREFER_DOCS_PYTHON_ORG:
-        if settings.PYTHONDOCS.startswith(("http://", "https://")):
-            doc_loc = f"{settings.PYTHONDOCS.rstrip('/')}/{the_object.__name__.lower()}.html"
-        else:
-            doc_loc = os.path.join(settings.PYTHONDOCS, the_object.__name__.lower() + ".html")
-    else:
-        doc_loc = None
-    return doc_loc
+from pydoc_fork.reporter.jinja_code import stream_template
+from pydoc_fork.reporter.string_utils import joined
+
+
+def render_module_ref(ref: ModuleRef) -> str:
+    """Link to a module."""
+    return f'<a href="{ref.url}">{ref.name}</a>'
 
 
 def modulelink(the_object: TypeLike) -> str:
     """Make a link for a module."""
-    url = f"{the_object.__name__}.html"
-    internet_link = getdocloc(the_object)
-
-    if internet_link and settings.PREFER_DOCS_PYTHON_ORG:
-        url = internet_link
-    # BUG: doesn't take into consideration an alternate base
-    if not internet_link:
-        settings.MENTIONED_MODULES.add((the_object, the_object.__name__))
-    return f'<a href="{url}">{the_object.__name__}</a>'
+    return render_module_ref(module_ref(the_object))
 
 
 def docmodule(
     the_object: TypeLike,
 ) -> str:
     """Produce HTML documentation for a module object."""
-    # circular ref
-    from pydoc_fork.reporter.format_page import document
+    return render_module(build_module(the_object))
+
+
+def render_module(doc: ModuleDoc) -> str:
+    """Render a module."""
+    return "".join(stream_module(doc))
 
-    name = the_object.__name__
 
-    try:
-        all_things = None if settings.DOCUMENT_INTERNALS else the_object.__all__
-    except AttributeError:
-        all_things = None
+def stream_module(doc: ModuleDoc) -> Iterator[str]:
+    """Render a module a piece at a time, one class or function per piece."""
+    # circular ref
+    from pydoc_fork.reporter.format_page import render_doc
+
+    name = doc.name
     parts = name.split(".")
     links = []
     for i in range(len(parts) - 1):
@@ -100,37 +65,28 @@ def docmodule(
         )
     linked_name = ".".join(links + parts[-1:])
     head = f"<big><big><strong>{linked_name}</strong></big></big>"
-    try:
-        path = inspect.getabsfile(cast(type, the_object))
+    if doc.file is not None:
         # BUG Fails if these are on 2 different drives
         # MR : Make relative
         output_folder_path = os.path.normcase(os.path.abspath(settings.OUTPUT_FOLDER))
-        path = os.path.relpath(path, output_folder_path).replace("\\", "/")
+        path = os.path.relpath(doc.file, output_folder_path).replace("\\", "/")
         # end MR
         # uh, oh, forgot why I wrote this
         # url = urllib.parse.quote(path)
         # MR
         file_link_text = file_link(path, path)
-    except TypeError:
+    else:
         file_link_text = "(built-in)"
     info = []
-    # TODO: Include the rest of the meta data
-    if hasattr(the_object, "__version__"):
-        version = str(the_object.__version__)
-        if version[:11] == "$" + "Revision: " and version[-1:] == "$":
-            version = version[11:-1].strip()
-        info.append(f"version {escape(version)}")
-    if hasattr(the_object, "__date__"):
-        info.append(escape(str(the_object.__date__)))
+    if doc.version is not None:
+        info.append(f"version {escape(doc.version)}")
+    if doc.date is not None:
+        info.append(escape(doc.date))
     if info:
         head = head + f" ({', '.join(info)})"
-    document_location = getdocloc(the_object)
-    if document_location is not None:
-        # Was this just a bug? document_location/locals?
-        # document_location = '<br><a href="%(docloc)s">Module Reference</a>' % locals()
-        document_location = f'<br><a href="{document_location}">Module Reference</a>'
-    else:
-        document_location = ""
+    # Was this just a bug? document_location/locals?
+    # document_location = '<br><a href="%(docloc)s">Module Reference</a>' % locals()
+    document_location = f'<br><a href="{doc.doc_location}">Module Reference</a>' if doc.doc_location is not None else ""
 
     nav_links = ['<a href=".">index</a>']
     if file_link_text:
@@ -138,115 +94,43 @@ def docmodule(
     if document_location:
         nav_links.append(document_location)
 
-    # this will get `import foo` but ignore `from foo import bar`
-    # And bar gets no doc string love either!
-    modules = inspect.getmembers(the_object, inspect.ismodule)
-
-    for to_remove in settings.SKIP_MODULES:
-        for module_info in modules[:]:
-            candidate_module, _ = module_info
-            if candidate_module == to_remove:
-                with contextlib.suppress(ValueError):
-                    modules.remove(module_info)
-    modules_by_import_from: set[tuple[None, Any]] = set()
-    classes: list[tuple[str, type[Any]]] = []
-    class_dict: dict[Any, str] = {}
-    for key, value in inspect.getmembers(the_object, inspect.isclass):
-        _class_module = inspect.getmodule(value)
-        if _class_module and _class_module is not the_object and _class_module.__name__ not in settings.SKIP_MODULES:
-            modules_by_import_from.add((None, _class_module))
-            settings.MENTIONED_MODULES.add((_class_module, _class_module.__name__))
-        # if __all__ exists, believe it.  Otherwise use old heuristic.
-        if (
-            # TODO put doc internals switch here
-            # all_things is not None or
-            (inspect.getmodule(value) or the_object) is the_object
-            and visiblename(key, all_things, the_object)
-        ):
-            classes.append((key, value))
-            class_dict[key] = class_dict[value] = "#" + key
-    for key, value in classes:
-        for base in value.__bases__:
-            key, modname = base.__name__, base.__module__
-            module = sys.modules.get(modname)
-            if (
-                modname != name
-                and module
-                and hasattr(module, key)
-                and getattr(module, key) is base
-                and key not in class_dict
-            ):
-                class_dict[key] = class_dict[base] = modname + ".html#" + key
-    funcs: list[tuple[str, Any]] = []
-    function_dict: dict[Any, str] = {}
-    for key, routine in inspect.getmembers(the_object, inspect.isroutine):
-        # if __all__ exists, believe it.  Otherwise use old heuristic.
-        _func_module = inspect.getmodule(routine)
-        # why does this sometimes return no module?
-        if _func_module and _func_module is not the_object and _func_module.__name__ not in settings.SKIP_MODULES:
-            modules_by_import_from.add((None, _func_module))
-            settings.MENTIONED_MODULES.add((_func_module, _func_module.__name__))
-        if visiblename(key, all_things, the_object):
-            funcs.append((key, routine))
-            function_dict[key] = "#-" + key
-            if inspect.isfunction(routine):
-                function_dict[routine] = function_dict[key]
-    data: list[tuple[str, Any]] = []
-    for key, value in inspect.getmembers(the_object, isdata):
-        value_module = inspect.getmodule(type(value))
-        if value_module and value_module.__name__ in settings.SKIP_MODULES:
-            continue
-        if visiblename(key, all_things, the_object):
-            data.append((key, value))
-
+    funcs, classes = doc.function_links, doc.class_links
     result_data = {
         "heading_html": heading(
             head,
             "",
             nav_links=nav_links,
         ),
-        "doc_html": markup(getdoc(the_object), function_dict, class_dict),
+        "doc_html": markup(doc.doc, funcs, classes),
     }
 
-    if hasattr(the_object, "__path__"):
-        module_packages = []
-        for _, modname, is_package in pkgutil.iter_modules(the_object.__path__):
-            if modname not in settings.SKIP_MODULES and modname != "__main__":
-                module_packages.append((modname, name, is_package, 0))
-        module_packages.sort()
-        contents_string = multicolumn(module_packages, module_package_link)
+    if doc.package_contents is not None:
+        contents_string = multicolumn(doc.package_contents, package_link)
         result_data["package_contents"] = bigsection("Package Contents", contents_string)
-    elif modules:
-        contents_string = multicolumn(modules, lambda t: modulelink(t[1]))
+    elif doc.modules:
+        contents_string = multicolumn(doc.modules, render_module_ref)
         result_data["modules"] = bigsection("Modules", contents_string)
 
-    if modules_by_import_from:
-        contents_string = multicolumn(list(modules_by_import_from), lambda t: modulelink(t[1]))
+    if doc.from_modules:
+        contents_string = multicolumn(doc.from_modules, render_module_ref)
         result_data["from_modules"] = bigsection("`from` Modules", contents_string)
 
-    if classes:
-        class_list = [value for (key, value) in classes]
-        # MR: boolean type safety
-        contents_list = [format_tree(inspect.getclasstree(class_list, True), name)]
-        for key, value in classes:
-            contents_list.append(document(value, key, name, function_dict, class_dict))
-        result_data["classes"] = bigsection("Classes", " ".join(contents_list))
-    if funcs:
-        contents_list = []
-        for key, value in funcs:
-            contents_list.append(document(value, key, name, function_dict, class_dict))
-        result_data["functions"] = bigsection("Functions", " ".join(contents_list))
-    if data:
-        contents_list = []
-        for key, value in data:
-            contents_list.append(document(value, key))
-        result_data["data"] = bigsection("Data", "<br>\n".join(contents_list))
-    if hasattr(the_object, "__author__"):
-        contents = markup(str(the_object.__author__))
-        result_data["author"] = bigsection("Author", contents)
-    if hasattr(the_object, "__credits__"):
-        contents = markup(str(the_object.__credits__))
-        result_data["credits"] = bigsection("Credits", contents)
-
-    template = JINJA_ENV.get_template("module.jinja2")
-    return template.render(**result_data)
+    slots: dict[str, Iterable[str]] = {}
+    if doc.classes:
+        contents: Iterable[str] = chain(
+            stream_tree(doc.class_tree),
+            chain.from_iterable((" ", render_doc(class_doc, funcs, classes)) for class_doc in doc.classes),
+        )
+        slots["classes"] = stream_bigsection("Classes", contents)
+    if doc.functions:
+        contents = (render_doc(routine_doc, funcs, classes) for routine_doc in doc.functions)
+        slots["functions"] = stream_bigsection("Functions", joined(" ", contents))
+    if doc.data:
+        contents = (render_doc(data_doc) for data_doc in doc.data)
+        slots["data"] = stream_bigsection("Data", joined("<br>\n", contents))
+    if doc.author is not None:
+        result_data["author"] = bigsection("Author", markup(doc.author))
+    if doc.credits is not None:
+        result_data["credits"] = bigsection("Credits", markup(doc.credits))
+
+    return stream_template("module.jinja2", slots, **result_data)
@@ -2,8 +2,9 @@
 Fallback docs
 """
 
+from pydoc_fork.inspector.builder import build_other
 from pydoc_fork.inspector.custom_types import TypeLike
-from pydoc_fork.reporter.formatter_html import html_repr
+from pydoc_fork.inspector.model import DataDoc
 
 
 def docother(
@@ -11,7 +12,12 @@ def docother(
     name: str = "",
 ) -> str:
     """Produce HTML documentation for a data object."""
-    from pydoc_fork.reporter.jinja_code import JINJA_ENV
+    return render_other(build_other(the_object, name))
 
-    template = JINJA_ENV.get_template("fallback.jinja2")
-    return template.render(name=name, value_repr=html_repr(the_object))
+
+def render_other(doc: DataDoc) -> str:
+    """Render a value."""
+    from pydoc_fork.reporter.jinja_code import get_template
+
+    template = get_template("fallback.jinja2")
+    return template.render(name=doc.name, value_repr=doc.value_repr)
@@ -2,28 +2,42 @@
 Roughly page and top level containers
 """
 
-import inspect
 import pkgutil
-from typing import Any, cast
+from collections.abc import Iterable, Iterator
+from typing import Any
 
+from pydoc_fork.inspector.builder import build
 from pydoc_fork.inspector.custom_types import TypeLike
-from pydoc_fork.reporter.format_class import docclass
-from pydoc_fork.reporter.format_data import document_data
-from pydoc_fork.reporter.format_module import docmodule
-from pydoc_fork.reporter.format_other import docother
-from pydoc_fork.reporter.format_routine import docroutine
+from pydoc_fork.inspector.model import ClassDoc, DataDoc, Doc, ModuleDoc, RoutineDoc
+from pydoc_fork.reporter.format_class import render_class
+from pydoc_fork.reporter.format_data import render_data
+from pydoc_fork.reporter.format_module import render_module, stream_module
+from pydoc_fork.reporter.format_other import render_other
+from pydoc_fork.reporter.format_routine import render_routine
 from pydoc_fork.reporter.formatter_html import (
     bigsection,
     heading,
     module_package_link,
     multicolumn,
 )
-from pydoc_fork.reporter.jinja_code import JINJA_ENV
+from pydoc_fork.reporter.jinja_code import get_template, stream_template
 
 
 def render(title: str, the_object: Any, name: str) -> str:
-    """Compose two functions"""
-    return page(title, document(the_object, name))
+    """Compose two functions, the_object can be a live object or its model"""
+    return "".join(stream_render(title, the_object, name))
+
+
+def stream_render(title: str, the_object: Any, name: str) -> Iterator[str]:
+    """Like render, but yields the page in pieces so it can be written out as it is made"""
+    doc: Doc = (
+        the_object if isinstance(the_object, (ModuleDoc, ClassDoc, RoutineDoc, DataDoc)) else build(the_object, name)
+    )
+    if isinstance(doc, ModuleDoc):
+        contents: Iterable[str] = stream_module(doc)
+    else:
+        contents = [render_doc(doc)]
+    return stream_template("page.jinja2", {"contents": contents}, title=title)
 
 
 def page(title: str, contents: str) -> str:
@@ -31,12 +45,20 @@ def page(title: str, contents: str) -> str:
 
     This is part of the public API
     """
-    template = JINJA_ENV.get_template("page.jinja2")
+    template = get_template("page.jinja2")
     result = template.render(title=title, contents=contents)
     return result
 
 
-def document(the_object: Any, name: str = "", *args: Any) -> str:  # pylint: disable=keyword-arg-before-vararg
+def document(
+    the_object: Any,
+    name: str = "",
+    mod: str = "",
+    funcs: dict[str, str] | None = None,
+    classes: dict[str, str] | None = None,
+    methods: dict[str, str] | None = None,
+    class_object: TypeLike | None = None,
+) -> str:
     """Generate documentation for an object.
     This also part of the public API of class
 
@@ -44,29 +66,27 @@ def document(the_object: Any, name: str = "", *args: Any) -> str:  # pylint: dis
 
     Modules ignore 1st name.
 
-    Public API doesn't call with *args
-    Args are:
-    name, fdict, cdict (name twice?)
-    mod, funcs, classes, mdict, the_object
+    Public API doesn't call with more than the object and name.
     """
-    args = (the_object, name, *args)
-
-    # 'try' clause is to attempt to handle the possibility that inspect
-    # identifies something in a way that pydoc itself has issues handling;
-    # think 'super' and how it is a descriptor (which raises the exception
-    # by lacking a __name__ attribute) and an instance.
-    # try:
-    if inspect.ismodule(the_object):
-        return docmodule(cast(TypeLike, the_object))
-    if inspect.isclass(the_object):
-        return docclass(*args)
-    if inspect.isroutine(the_object):
-        return docroutine(*args)
-    # except AttributeError:
-    #     pass  # nosec
-    if inspect.isdatadescriptor(the_object):
-        return document_data(cast(TypeLike, the_object), name)
-    return docother(the_object, name)
+    return render_doc(build(the_object, name, mod, class_object), funcs, classes, methods)
+
+
+def render_doc(
+    doc: Doc,
+    funcs: dict[str, str] | None = None,
+    classes: dict[str, str] | None = None,
+    methods: dict[str, str] | None = None,
+) -> str:
+    """Render any part of the model, the dicts are what names in doc strings can link to."""
+    if isinstance(doc, ModuleDoc):
+        return render_module(doc)
+    if isinstance(doc, ClassDoc):
+        return render_class(doc, funcs, classes)
+    if isinstance(doc, RoutineDoc):
+        return render_routine(doc, funcs, classes, methods)
+    if doc.value_repr is None:
+        return render_data(doc)
+    return render_other(doc)
 
 
 def docindex(modules: list) -> str:
@@ -78,7 +98,7 @@ def docindex(modules: list) -> str:
         ),
         "modules": modules,
     }
-    template = JINJA_ENV.get_template("index.jinja2")
+    template = get_template("index.jinja2")
     return template.render(**result_data)
 
 
@@ -1,15 +1,14 @@
 """Roughly a UI component for routines"""
 
-import inspect
 import logging
-from typing import Any
 
+from pydoc_fork.inspector.builder import build_routine
 from pydoc_fork.inspector.custom_types import TypeLike
-from pydoc_fork.inspector.utils import _is_bound_method, getdoc
+from pydoc_fork.inspector.model import RoutineDoc
 from pydoc_fork.reporter import inline_styles
-from pydoc_fork.reporter.format_class import classlink
+from pydoc_fork.reporter.format_class import render_class_ref
 from pydoc_fork.reporter.formatter_html import disabled_text, escape, markup
-from pydoc_fork.reporter.jinja_code import JINJA_ENV
+from pydoc_fork.reporter.jinja_code import get_template
 
 LOGGER = logging.getLogger(__name__)
 
@@ -18,69 +17,47 @@ def docroutine(
     the_object: TypeLike,
     name: str = "",
     mod: str = "",
-    funcs: dict[Any, str] | None = None,
-    classes: dict[Any, str] | None = None,
-    methods: dict[Any, str] | None = None,
+    funcs: dict[str, str] | None = None,
+    classes: dict[str, str] | None = None,
+    methods: dict[str, str] | None = None,
     class_object: TypeLike | None = None,
 ) -> str:
     """Produce HTML documentation for a function or method object."""
-    if not funcs:
-        funcs = {}
-    if not classes:
-        classes = {}
-    if not methods:
-        methods = {}
-    # AttributeError: 'cached_property' object has no attribute '__name__'
-    try:
-        maybe_real_name = the_object.__name__
-    except AttributeError:
-        maybe_real_name = None
-    real_name = maybe_real_name if isinstance(maybe_real_name, str) else None
-    name = name or real_name or "<unnamed>"
-    anchor = ((class_object and class_object.__name__) or "") + "-" + name
+    return render_routine(build_routine(the_object, name, mod, class_object), funcs, classes, methods)
+
+
+def render_routine(
+    doc: RoutineDoc,
+    funcs: dict[str, str] | None = None,
+    classes: dict[str, str] | None = None,
+    methods: dict[str, str] | None = None,
+) -> str:
+    """Render a function or method, the dicts are what names in its doc string can link to."""
+    name, real_name = doc.name, doc.real_name
     note = ""
-    if _is_bound_method(the_object):
-        imported_class = the_object.__self__.__class__
-        if class_object:
-            if imported_class is not class_object:
-                note = " from " + classlink(imported_class, mod)
+    if doc.note_class is not None:
+        link = render_class_ref(doc.note_class)
+        if doc.note_kind == "from":
+            note = " from " + link
+        elif doc.note_kind == "instance":
+            note = f" method of {link} instance"
         else:
-            if the_object.__self__ is not None:
-                link = classlink(the_object.__self__.__class__, mod)
-                note = f" method of {link} instance"
-            else:
-                link = classlink(imported_class, mod)
-                note = f" unbound {link} method"
+            note = f" unbound {link} method"
 
-    if inspect.iscoroutinefunction(the_object) or inspect.isasyncgenfunction(the_object):
-        async_qualifier = "async "
-    else:
-        async_qualifier = ""
+    async_qualifier = "async " if doc.is_async else ""
 
     if name == real_name:
-        title = f'<a name="{anchor}"><strong>{real_name}</strong></a>'
+        title = f'<a name="{doc.anchor}"><strong>{real_name}</strong></a>'
     else:
-        if class_object and real_name is not None and inspect.getattr_static(class_object, real_name, []) is the_object:
-            real_link = f'<a href="#{class_object.__name__ + "-" + real_name}">{real_name}</a>'
-        else:
-            real_link = real_name or name
-        title = f'<a name="{anchor}"><strong>{name}</strong></a> = {real_link}'
-    argument_specification = None
-    if inspect.isroutine(the_object):
-        try:
-            signature: inspect.Signature | None = inspect.signature(the_object)
-        except RuntimeError as what_happened:
-            LOGGER.warning("RuntimeError: %s", what_happened)
-        except Exception:
-            signature = None
-        if signature:
-            argument_specification = str(signature)
-            if real_name == "<lambda>":
-                title = f"<strong>{name}</strong> <em>lambda</em> "
-                # XXX lambda's won't usually have func_annotations['return']
-                # since the syntax doesn't support but it is possible.
-                # So removing parentheses isn't truly safe.
-                argument_specification = argument_specification[1:-1]  # remove parentheses
+        real_link = f'<a href="{doc.alias_anchor}">{real_name}</a>' if doc.alias_anchor else real_name or name
+        title = f'<a name="{doc.anchor}"><strong>{name}</strong></a> = {real_link}'
+    argument_specification = doc.signature
+    if argument_specification is not None and real_name == "<lambda>":
+        title = f"<strong>{name}</strong> <em>lambda</em> "
+        # XXX lambda's won't usually have func_annotations['return']
+        # since the syntax doesn't support but it is possible.
+        # So removing parentheses isn't truly safe.
+        argument_specification = argument_specification[1:-1]  # remove parentheses
     if not argument_specification:
         argument_specification = "(...)"
 
@@ -91,6 +68,5 @@ def docroutine(
         + (note and disabled_text(f'<span style="font-family:{inline_styles.SAN_SERIF}">{note}</span>'))
     )
 
-    template = JINJA_ENV.get_template("function.jinja2")
-    doc = markup(getdoc(the_object), funcs, classes, methods)
-    return template.render(decl=decl, doc=doc)
+    template = get_template("function.jinja2")
+    return template.render(decl=decl, doc=markup(doc.doc, funcs, classes, methods))
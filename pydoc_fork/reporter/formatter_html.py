@@ -2,44 +2,29 @@
 Roughly components
 """
 
+import functools
 import logging
 import re
-import sysconfig
-from collections.abc import Callable, Sequence
+from collections.abc import Callable, Iterable, Iterator, Sequence
 from enum import Enum
-from typing import Any, cast
+from typing import Any
 
-import markdown
-
-from pydoc_fork import settings
-from pydoc_fork.inspector.module_utils import ImportTimeError
-from pydoc_fork.inspector.utils import resolve
+from pydoc_fork.inspector.builder import package_ref
+from pydoc_fork.inspector.model import ModuleRef
+from pydoc_fork.inspector.module_utils import STDLIB_BASEDIR  # noqa: F401  # pylint: disable=unused-import
 from pydoc_fork.reporter import inline_styles
-from pydoc_fork.reporter.html_repr_class import HTMLRepr
-from pydoc_fork.reporter.jinja_code import JINJA_ENV
-from pydoc_fork.reporter.rst_support import rst_to_html
+from pydoc_fork.reporter.html_repr_class import HTMLRepr, html_repr  # noqa: F401  # pylint: disable=unused-import
+from pydoc_fork.reporter.jinja_code import get_template, stream_template
 from pydoc_fork.reporter.string_utils import replace
 
 LOGGER = logging.getLogger(__name__)
-STDLIB_BASEDIR = cast(str, sysconfig.get_path("stdlib"))
 
 """Formatter class for HTML documentation."""
 
 
-# monkey patching was messing with mypy-- is this now a redeclare?
-def html_repr(value: Any) -> str:
-    """Turn method into function"""
-    _repr_instance = HTMLRepr()
-    try:
-        return _repr_instance.repr(value)
-    except Exception as exception:
-        return f"No representation, got {exception!s}"
-
-
 def escape(value: Any) -> str:
     """HTML safe repr and escape"""
-    _repr_instance = HTMLRepr()
-    result = _repr_instance.escape(value)
+    result = HTMLRepr.escape(value)
     if "&amp;gt;" in result:
         LOGGER.warning("possible double escape")
     return result
@@ -51,7 +36,7 @@ def heading(
     nav_links: Sequence[str] | None = None,
 ) -> str:
     """Format a page heading."""
-    template = JINJA_ENV.get_template("heading.jinja2")
+    template = get_template("heading.jinja2")
     return template.render(title=title, extras=extras, nav_links=nav_links)
 
 
@@ -67,7 +52,7 @@ def section(
     """Format a section with a heading."""
     if marginalia is None:
         marginalia = "<tt>" + "&nbsp;" * width + "</tt>"
-    template = JINJA_ENV.get_template("section.jinja2")
+    template = get_template("section.jinja2")
     return template.render(
         title=title,
         marginalia=marginalia,
@@ -100,6 +85,19 @@ def bigsection(
     )
 
 
+def stream_bigsection(title: str, contents: Iterable[str]) -> Iterator[str]:
+    """Like bigsection, but the contents are written out as they are made."""
+    return stream_template(
+        "section.jinja2",
+        {"contents": contents},
+        title=f"<big><strong>{title}</strong></big>",
+        marginalia="",
+        prelude="",
+        gap="&nbsp;",
+        section_class="theme-section",
+    )
+
+
 def preformat(text: str) -> str:
     """Format literal preformatted text."""
     text = escape(text.expandtabs())
@@ -121,13 +119,13 @@ def multicolumn(
                 column.append(the_format(the_list[i]))
         columns.append(column)
 
-    template = JINJA_ENV.get_template("multicolumn.jinja2")
+    template = get_template("multicolumn.jinja2")
     return template.render(columns=columns, column_width=100 // cols)
 
 
 def disabled_text(text: str) -> str:
     """Wrap in gray"""
-    template = JINJA_ENV.get_template("disabled_text.jinja2")
+    template = get_template("disabled_text.jinja2")
     return template.render(text=text, color=inline_styles.DISABLED_TEXT)
 
 
@@ -143,19 +141,18 @@ def namelink(name: str, *dicts: dict[Any, str]) -> str:
 def module_package_link(module_package_info: tuple[str, str, str, str]) -> str:
     """Make a link for a module or package to display in an index."""
     name, path, ispackage, shadowed = module_package_info
-    try:
-        settings.MENTIONED_MODULES.add((resolve(path + "." + name)[0], name))
-    except (ImportTimeError, ImportError):
-        LOGGER.warning("Can't import %s, won't doc", name)
+    ref = package_ref(name, path, bool(ispackage))
 
     if shadowed:
         return disabled_text(name)
+    return package_link(ref)
 
-    url = f"{path}.{name}.html" if path else f"{name}.html"
 
-    text = f"<strong>{name}</strong>&nbsp;(package)" if ispackage else name
+def package_link(ref: ModuleRef) -> str:
+    """Link to a module in a package."""
+    text = f"<strong>{ref.name}</strong>&nbsp;(package)" if ref.is_package else ref.name
 
-    return f'<a href="{url}">{text}</a>'
+    return f'<a href="{ref.url}">{text}</a>'
 
 
 def file_link(url: str, path: str) -> str:
@@ -171,6 +168,41 @@ class MarkupSyntax(Enum):
     MARKDOWN = 2
 
 
+_MARKUP_PATTERN = re.compile(r"\b((http|https|ftp)://\S+[\w/]|RFC[- ]?(\d+)|PEP[- ]?(\d+)|(self\.)?(\w+))")
+"""URLs, RFC and PEP numbers and identifiers, what markup() can turn into links"""
+
+
+@functools.lru_cache(maxsize=4096)
+def _preformat_short(text: str) -> str:
+    """preformat, for the few distinct bits of punctuation and space between words."""
+    return preformat(text)
+
+
+def _preformat_piece(text: str) -> str:
+    """preformat a piece of a doc string."""
+    return _preformat_short(text) if len(text) <= 32 else preformat(text)
+
+
+def _link(name: str, url: str | None) -> str:
+    """A name, linked if there is somewhere to link it to."""
+    return name if url is None else f'<a href="{url}">{name}</a>'
+
+
+_CALL_INDEXES: dict[tuple[int, int], tuple[dict[Any, str], dict[Any, str], int, int, dict[Any, str]]] = {}
+
+
+def _call_index(funcs: dict[Any, str], classes: dict[Any, str]) -> dict[Any, str]:
+    """Functions and classes in one map, functions first, built once per page."""
+    key = (id(funcs), id(classes))
+    found = _CALL_INDEXES.get(key)
+    if found is None or found[2] != len(funcs) or found[3] != len(classes):
+        if len(_CALL_INDEXES) >= 16:
+            _CALL_INDEXES.clear()
+        # the maps are held on to, so their ids can't be reused while they are in here
+        found = _CALL_INDEXES[key] = (funcs, classes, len(funcs), len(classes), {**classes, **funcs})
+    return found[4]
+
+
 def markup(
     text: str,
     funcs: dict[Any, str] | None = None,
@@ -196,54 +228,59 @@ def markup(
     _preformat: Callable[[str], str]
     markup_to_html: Callable[[str], str]
     if syntax == MarkupSyntax.NOTHING:
-        _preformat = preformat
+        _preformat = _preformat_piece
         markup_to_html = nothing
     elif syntax == MarkupSyntax.RST:
+        # docutils is slow to import and rarely needed
+        from pydoc_fork.reporter.rst_support import rst_to_html
+
         _preformat = nothing
         markup_to_html = rst_to_html
         # make_rst_link =
     elif syntax == MarkupSyntax.MARKDOWN:
+        import markdown
+
         _preformat = nothing
         markup_to_html = markdown.markdown
         # make_markdown_link =
     else:
         raise NotImplementedError()
 
-    results = []
+    call_index = _call_index(funcs, classes) if funcs and classes else funcs or classes
+    results: list[str] = []
+    push = results.append
     here = 0
-    pattern = re.compile(r"\b((http|https|ftp)://\S+[\w/]|RFC[- ]?(\d+)|PEP[- ]?(\d+)|(self\.)?(\w+))")
-    while True:
-        match = pattern.search(text, here)
-        if not match:
-            break
+    for match in _MARKUP_PATTERN.finditer(text):
         start, end = match.span()
-        results.append(_preformat(text[here:start]))
+        if start > here:
+            push(_preformat(text[here:start]))
 
         the_all, scheme, rfc, pep, self_dot, name = match.groups()
         if scheme:
             # Hyperlink actual urls
             url = _preformat(the_all).replace('"', "&quot;")
-            results.append(f'<a href="{url}">{url}</a>')
+            push(f'<a href="{url}">{url}</a>')
         elif rfc:
             url = f"https://www.rfc-editor.org/rfc/rfc{int(rfc)}.txt"
-            results.append(f'<a href="{url}">{_preformat(the_all)}</a>')
+            push(f'<a href="{url}">{_preformat(the_all)}</a>')
         elif pep:
             url = f"https://www.python.org/dev/peps/pep-{int(pep):04d}/"
-            results.append(f'<a href="{url}">{_preformat(the_all)}</a>')
+            push(f'<a href="{url}">{_preformat(the_all)}</a>')
         elif self_dot:
             # Create a link for methods like 'self.method(...)'
             # and use <strong> for attributes like 'self.attr'
             if text[end : end + 1] == "(":
-                results.append("self." + namelink(name, methods))
+                push("self." + _link(name, methods.get(name)))
             else:
-                results.append(f"self.<strong>{name}</strong>")
+                push(f"self.<strong>{name}</strong>")
         elif text[end : end + 1] == "(":
-            results.append(namelink(name, methods, funcs, classes))
+            method_url = methods.get(name)
+            push(_link(name, call_index.get(name) if method_url is None else method_url))
         else:
             # This assumes everything else is a class!!
-            results.append(namelink(name, classes))
+            push(_link(name, classes.get(name)))
         here = end
     # plain text with links to HTML
-    results.append(_preformat(text[here:]))
+    push(_preformat(text[here:]))
     rejoined_semi_html = "".join(results)
     return markup_to_html(rejoined_semi_html)
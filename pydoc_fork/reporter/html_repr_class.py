@@ -7,6 +7,9 @@ from typing import Any, cast
 from pydoc_fork.reporter import inline_styles
 from pydoc_fork.reporter.string_utils import cram, replace, stripid
 
+_ESCAPE_SEQUENCES = re.compile(r'((\\[\\abfnrtv\'"]|\\[0-9]..|\\x..|\\u....)+)')
+"""Backslash escapes in a string's repr, which get highlighted"""
+
 
 class HTMLRepr(Repr):
     """Class for safely making an HTML representation of a Python object."""
@@ -21,10 +24,14 @@ class HTMLRepr(Repr):
     @staticmethod
     def escape(text: str) -> str:
         """Simple html escaping"""
-        result = replace(text, "&", "&amp;", "<", "&lt;", ">", "&gt;")
-        # if "&amp;" in result:
-        #     print("possible double escape")
-        return result
+        # str.replace beats str.translate with a table of strings, and most text has nothing to escape
+        if "&" in text:
+            text = text.replace("&", "&amp;")
+        if "<" in text:
+            text = text.replace("<", "&lt;")
+        if ">" in text:
+            text = text.replace(">", "&gt;")
+        return text
 
     def repr(self, x: Any) -> str:
         """Delegates to Repr.repr"""
@@ -48,8 +55,7 @@ class HTMLRepr(Repr):
             # needed to make any special characters, so show a raw string.
             return "r" + test_repr[0] + self.escape(test) + test_repr[0]
 
-        return re.sub(
-            r'((\\[\\abfnrtv\'"]|\\[0-9]..|\\x..|\\u....)+)',
+        return _ESCAPE_SEQUENCES.sub(
             f'<span style="color:{inline_styles.REPR_COLOR}">' + r"\1" + "</span>",
             self.escape(test_repr),
         )
@@ -70,3 +76,16 @@ class HTMLRepr(Repr):
     def repr_unicode(self, x: str, level: int) -> str:
         """Compatibility alias for older reprlib integrations."""
         return self.repr_string(x, level)
+
+
+_REPR_INSTANCE = HTMLRepr()
+"""Shared, HTMLRepr keeps no state between calls"""
+
+
+# monkey patching was messing with mypy-- is this now a redeclare?
+def html_repr(value: Any) -> str:
+    """Turn method into function"""
+    try:
+        return _REPR_INSTANCE.repr(value)
+    except Exception as exception:
+        return f"No representation, got {exception!s}"
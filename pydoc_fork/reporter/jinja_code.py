@@ -1,24 +1,145 @@
 """
 Jinja setup
+
+Templates are compiled once per process and the compiled code is kept in the
+cache folder between runs. Templates can also be compiled to python modules
+ahead of time, see compile_templates, which is how the wheel ships them.
 """
 
-from jinja2 import ChoiceLoader, Environment, FileSystemLoader, PackageLoader, select_autoescape
+import hashlib
+import json
+import logging
+import os
+import re
+from collections.abc import Iterable, Iterator
+from typing import Any
 
-from pydoc_fork import settings
+from jinja2 import (
+    BaseLoader,
+    BytecodeCache,
+    ChoiceLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    ModuleLoader,
+    PackageLoader,
+    Template,
+    select_autoescape,
+)
 
+from pydoc_fork import assets, settings
 
-def _build_loader():
-    package_loader = PackageLoader("pydoc_fork")
+LOGGER = logging.getLogger(__name__)
+
+COMPILED_TEMPLATES = os.path.join(os.path.dirname(os.path.dirname(__file__)), "compiled_templates")
+"""Where compile_templates puts the precompiled package templates"""
+
+
+def _template_checksums(loader: BaseLoader) -> dict[str, str]:
+    """Hash of each template's source, to tell if precompiled ones are stale."""
+    return {
+        name: hashlib.sha256(loader.get_source(JINJA_ENV, name)[0].encode("utf-8")).hexdigest()
+        for name in loader.list_templates()
+        if name.endswith(".jinja2")
+    }
+
+
+def _precompiled_are_current(package_loader: BaseLoader) -> bool:
+    """True if the precompiled templates were compiled from the templates installed now."""
+    try:
+        with open(os.path.join(COMPILED_TEMPLATES, "checksums.json"), encoding="utf-8") as file:
+            compiled = json.load(file)
+    except (OSError, ValueError):
+        return False
+    if compiled != _template_checksums(package_loader):
+        LOGGER.debug("Precompiled templates are out of date, compiling from source")
+        return False
+    return True
+
+
+def _build_loader() -> BaseLoader:
+    package_loader: BaseLoader = PackageLoader("pydoc_fork")
     if settings.CUSTOM_TEMPLATES:
         return ChoiceLoader([FileSystemLoader(settings.CUSTOM_TEMPLATES), package_loader])
+    if _precompiled_are_current(package_loader):
+        return ChoiceLoader([ModuleLoader(COMPILED_TEMPLATES), package_loader])
     return package_loader
 
 
-JINJA_ENV = Environment(loader=_build_loader(), autoescape=select_autoescape())
+def _build_bytecode_cache() -> BytecodeCache | None:
+    """Keep compiled templates in the cache folder, unless caching is off."""
+    if not settings.CACHE:
+        return None
+    # circular ref
+    from pydoc_fork.model_cache import default_cache_dir
+
+    folder = os.path.join(settings.CACHE_DIR or default_cache_dir(), "templates")
+    try:
+        os.makedirs(folder, exist_ok=True)
+    except OSError as error:
+        LOGGER.warning("Can't cache compiled templates in %s, got %s", folder, error)
+        return None
+    return FileSystemBytecodeCache(folder)
+
+
+JINJA_ENV = Environment(autoescape=select_autoescape())
 """Object to let Jinja find template folder"""
-JINJA_ENV.globals.update(settings=settings)
+JINJA_ENV.globals.update(settings=settings, asset_url=assets.url)
+JINJA_ENV.loader = _build_loader()
+
+_TEMPLATES: dict[str, Template] = {}
+"""Templates already looked up, cleared when the loader changes"""
+
+LOADER_GENERATION = 0
+"""Bumped when the loader changes, so anything rendered before can be thrown away"""
+
+
+def get_template(template_name: str) -> Template:
+    """Look up a template once per process."""
+    template = _TEMPLATES.get(template_name)
+    if template is None:
+        template = _TEMPLATES[template_name] = JINJA_ENV.get_template(template_name)
+    return template
 
 
 def refresh_loader() -> None:
     """Rebuild the Jinja loader after settings change (e.g. CUSTOM_TEMPLATES set via config)."""
+    global LOADER_GENERATION  # pylint: disable=global-statement
+    LOADER_GENERATION += 1
+    JINJA_ENV.bytecode_cache = _build_bytecode_cache()
     JINJA_ENV.loader = _build_loader()
+    if JINJA_ENV.cache is not None:
+        JINJA_ENV.cache.clear()
+    _TEMPLATES.clear()
+
+
+def compile_templates(target: str = COMPILED_TEMPLATES) -> None:
+    """Compile the package templates to python modules, for shipping in the wheel."""
+    package_loader = PackageLoader("pydoc_fork")
+    environment = JINJA_ENV.overlay(loader=package_loader, bytecode_cache=None)
+    environment.compile_templates(target, zip=None, filter_func=lambda name: name.endswith(".jinja2"))
+    with open(os.path.join(target, "checksums.json"), "w", encoding="utf-8") as file:
+        json.dump(_template_checksums(package_loader), file, indent=2, sort_keys=True)
+
+
+_SLOT = re.compile("\x00pydoc_fork_slot:(\\w+)\x00")
+
+
+def stream_template(template_name: str, slots: dict[str, Iterable[str]], **context: Any) -> Iterator[str]:
+    """Render a template piece by piece, with some variables streamed in from iterables.
+
+    Each slot variable is rendered as a placeholder, which gets replaced by
+    whatever its iterable yields. Nothing bigger than one piece is held in memory.
+    """
+    template = get_template(template_name)
+    if settings.CUSTOM_TEMPLATES:
+        # a custom template could filter or slice a variable, so it gets the whole string
+        yield template.render(**context, **{key: "".join(value) for key, value in slots.items()})
+        return
+    placeholders = {key: f"\x00pydoc_fork_slot:{key}\x00" for key in slots}
+    for chunk in template.generate(**context, **placeholders):
+        for index, piece in enumerate(_SLOT.split(chunk)):
+            if index % 2:
+                yield from slots[piece]
+            elif piece:
+                yield piece
@@ -4,6 +4,7 @@ String manipulation
 
 import logging
 import re
+from collections.abc import Iterable, Iterator
 
 LOGGER = logging.getLogger(__name__)
 
@@ -35,3 +36,14 @@ def stripid(text: str) -> str:
     """Remove the hexadecimal id from a Python object representation."""
     # The behaviour of %p is implementation-dependent in terms of case.
     return _re_stripid.sub(r"\1", text)
+
+
+def joined(separator: str, parts: Iterable[str]) -> Iterator[str]:
+    """Like separator.join(parts), but one part at a time.
+    >>> "".join(joined(", ", ["a", "b"]))
+    'a, b'
+    """
+    for index, part in enumerate(parts):
+        if index:
+            yield separator
+        yield part
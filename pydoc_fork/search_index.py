@@ -0,0 +1,172 @@
+"""
+Search index for the generated site.
+
+Modules, classes, functions, methods and module data are indexed by the
+words in their names, with the first line of their doc string. The index is
+written as small json shards in the search folder, one per two letter prefix
+of a word, and search.js, which every page loads, fetches only the shards a
+query needs.
+"""
+
+import glob
+import json
+import logging
+import os
+from collections import defaultdict
+from typing import Any
+
+from pydoc_fork import output_files, settings
+from pydoc_fork.inspector.model import ClassDoc, DataDoc, ModuleDoc, RoutineDoc
+
+LOGGER = logging.getLogger(__name__)
+
+SEARCH_FOLDER = "search"
+"""Where the shards go, inside the output folder"""
+
+PREFIX_LENGTH = 2
+"""Words starting with the same this many letters share a shard"""
+
+Entry = list[str]
+"""Name, kind, url and summary of something that can be found"""
+
+INDEX: "SearchIndex | None" = None
+"""Index for the current run, None when neither search nor objects.inv is wanted."""
+
+
+def summary(doc: str) -> str:
+    """First line of a doc string."""
+    for line in doc.splitlines():
+        line = line.strip()
+        if line:
+            return line
+    return ""
+
+
+def terms(name: str) -> list[str]:
+    """Words a dotted name can be found by, lower case."""
+    short = name.rsplit(".", 1)[-1].lower()
+    return sorted({name.lower(), short} | {word for word in short.split("_") if word})
+
+
+def entries(url: str, doc: ModuleDoc) -> list[Entry]:
+    """Everything on a module's page worth finding."""
+    found = [[doc.name, "module", url, summary(doc.doc)]]
+    for cls in doc.classes:
+        if not isinstance(cls, ClassDoc):
+            continue
+        found.append([f"{doc.name}.{cls.name}", "class", f"{url}#{cls.name}", summary(cls.doc)])
+        for section in cls.sections:
+            # inherited members are found under the class that defines them
+            if section.defined_by is not None:
+                continue
+            for member in section.members:
+                if isinstance(member, RoutineDoc):
+                    name = f"{doc.name}.{cls.name}.{member.name}"
+                    found.append([name, "method", f"{url}#{member.anchor}", summary(member.doc)])
+    for function in doc.functions:
+        if isinstance(function, RoutineDoc):
+            found.append([f"{doc.name}.{function.name}", "function", f"{url}#{function.anchor}", summary(function.doc)])
+    for data in doc.data:
+        if isinstance(data, DataDoc):
+            found.append([f"{doc.name}.{data.name}", "data", url, summary(data.doc)])
+    return found
+
+
+class SearchIndex:
+    """Entries of the pages written this run, by page file name."""
+
+    def __init__(self) -> None:
+        """Nothing indexed yet."""
+        self.pages: dict[str, list[Entry]] = {}
+
+    def add(self, url: str, found: list[Entry]) -> None:
+        """A page got written."""
+        self.pages[url] = found
+
+    def merge_previous(self, folder: str, output_folder: str) -> None:
+        """Keep what an earlier run indexed for pages that are still there but weren't written this time."""
+        previous: dict[str, set[tuple[str, ...]]] = defaultdict(set)
+        for path in sorted(glob.glob(os.path.join(folder, "*.json"))):
+            if os.path.basename(path) == "index.json":
+                continue
+            try:
+                with open(path, encoding="utf-8") as file:
+                    old_entries = json.load(file)["entries"]
+            except (OSError, ValueError, KeyError, TypeError):
+                LOGGER.warning("Ignoring unreadable search shard %s", path)
+                continue
+            for entry in old_entries:
+                url = entry[2].split("#", 1)[0]
+                if url not in self.pages and os.path.exists(os.path.join(output_folder, url)):
+                    previous[url].add(tuple(entry))
+        for url, found in previous.items():
+            self.pages[url] = [list(entry) for entry in found]
+
+    def shards(self) -> dict[str, dict[str, Any]]:
+        """Entries and an inverted index of their words, per prefix."""
+        by_prefix: dict[str, dict[str, list[Entry]]] = defaultdict(lambda: defaultdict(list))
+        for url in sorted(self.pages):
+            for entry in sorted(self.pages[url]):
+                for term in terms(entry[0]):
+                    by_prefix[term[:PREFIX_LENGTH]][term].append(entry)
+        result = {}
+        for prefix, by_term in sorted(by_prefix.items()):
+            shard_entries: list[Entry] = []
+            positions: dict[str, int] = {}
+            inverted = []
+            for term, term_entries in sorted(by_term.items()):
+                indexes = []
+                for entry in term_entries:
+                    key = json.dumps(entry)
+                    if key not in positions:
+                        positions[key] = len(shard_entries)
+                        shard_entries.append(entry)
+                    indexes.append(positions[key])
+                inverted.append([term, indexes])
+            result[prefix] = {"entries": shard_entries, "terms": inverted}
+        return result
+
+    def write(self, output_folder: str) -> list[str]:
+        """Write the shards and the list of them, remove shards nothing uses anymore."""
+        folder = os.path.join(output_folder, SEARCH_FOLDER)
+        if not output_files.archiving():
+            self.merge_previous(folder, output_folder)
+        shards = self.shards()
+        output_files.make_folder(folder)
+        written = []
+        for prefix, shard in shards.items():
+            written.append(_write_json(os.path.join(folder, f"{prefix}.json"), shard))
+        count = sum(len(found) for found in self.pages.values())
+        written.append(_write_json(os.path.join(folder, "index.json"), {"shards": sorted(shards), "entries": count}))
+        for path in [] if output_files.archiving() else glob.glob(os.path.join(folder, "*.json")):
+            if path not in written:
+                output_files.remove(path)
+        LOGGER.info("wrote search index, %s entries in %s shards", count, len(shards))
+        return written
+
+
+def _write_json(path: str, data: Any) -> str:
+    """Compact json, the browser downloads it."""
+    output_files.write_text(path, [json.dumps(data, separators=(",", ":"), ensure_ascii=False)])
+    return path
+
+
+def start() -> SearchIndex | None:
+    """Start indexing this run, the inventory is made from the index too."""
+    global INDEX  # pylint: disable=global-statement
+    INDEX = SearchIndex() if settings.SEARCH or settings.INVENTORY else None
+    return INDEX
+
+
+def finish(output_folder: str) -> list[str]:
+    """Write the index, if search is on, and forget about it."""
+    global INDEX  # pylint: disable=global-statement
+    written = INDEX.write(output_folder) if INDEX is not None and settings.SEARCH else []
+    INDEX = None
+    return written
+
+
+def discard() -> None:
+    """Forget about the index without writing it, after a failed run."""
+    global INDEX  # pylint: disable=global-statement
+    INDEX = None
@@ -0,0 +1,214 @@
+"""
+Serve documentation on demand instead of writing it all up front.
+
+Pages are rendered the first time they are asked for and kept in a least
+recently used cache, until the module's source file changes. Inspecting and
+rendering share global state, so one page is rendered at a time, a request
+for a page that is being rendered waits for it instead of rendering it
+again. Cached pages are served concurrently and carry an ETag, so browsers
+revalidate instead of downloading them again.
+"""
+
+import hashlib
+import logging
+import os
+import pkgutil
+import threading
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from pydoc_fork import assets, inventory, settings
+from pydoc_fork.inspector import lookups
+from pydoc_fork.inspector.module_utils import find_spec_quietly
+from pydoc_fork.inspector.path_utils import _adjust_cli_sys_path
+
+LOGGER = logging.getLogger(__name__)
+
+
+def source_mtime(name: str) -> float | None:
+    """When the module's source last changed, None if it has no file."""
+    spec = find_spec_quietly(name)
+    if spec is None or not spec.has_location or not spec.origin:
+        return None
+    try:
+        return os.stat(spec.origin).st_mtime
+    except OSError:
+        return None
+
+
+class RenderedPage:
+    """A page as served, and the source it was rendered from."""
+
+    __slots__ = ("body", "etag", "mtime")
+
+    def __init__(self, body: bytes, mtime: float | None) -> None:
+        """The ETag is a hash of the body."""
+        self.body = body
+        self.etag = f'"{hashlib.sha256(body).hexdigest()[:32]}"'
+        self.mtime = mtime
+
+
+class PageCache:
+    """Rendered pages by module name, least recently used go first."""
+
+    def __init__(self, max_pages: int) -> None:
+        """Empty"""
+        self.max_pages = max_pages
+        self.pages: OrderedDict[str, RenderedPage] = OrderedDict()
+        # kept when a page is evicted, the module stays imported
+        self.imported: dict[str, float | None] = {}
+        self.hits = 0
+        self.renders = 0
+        self._lock = threading.Lock()
+        self._render_lock = threading.Lock()
+
+    def _fresh(self, name: str, mtime: float | None) -> RenderedPage | None:
+        """The cached page, if its source didn't change since."""
+        with self._lock:
+            page = self.pages.get(name)
+            if page is None or page.mtime != mtime:
+                return None
+            self.pages.move_to_end(name)
+            return page
+
+    def get(self, name: str) -> RenderedPage | None:
+        """Cached or freshly rendered page, None if there is no such module."""
+        mtime = source_mtime(name)
+        page = self._fresh(name, mtime)
+        if page is not None:
+            self.hits += 1
+            return page
+        with self._render_lock:
+            # someone else may have rendered it while this one waited
+            page = self._fresh(name, mtime)
+            if page is not None:
+                self.hits += 1
+                return page
+            stale = name in self.imported and self.imported[name] != mtime
+            body = render_page(name, force_load=stale)
+            if body is None:
+                return None
+            self.imported[name] = mtime
+            self.renders += 1
+            page = RenderedPage(body, mtime)
+        with self._lock:
+            self.pages[name] = page
+            self.pages.move_to_end(name)
+            while len(self.pages) > self.max_pages:
+                evicted, _ = self.pages.popitem(last=False)
+                LOGGER.debug("Evicted %s from the page cache", evicted)
+        return page
+
+
+def render_page(name: str, force_load: bool = False) -> bytes | None:
+    """Import, inspect and render a module's page, force_load reimports it first."""
+    # circular ref
+    from pydoc_fork.commands import inspect_one
+    from pydoc_fork.reporter.format_page import render
+
+    inspected = inspect_one(name, force_load)
+    if inspected is None:
+        return None
+    name, title, doc, _, _ = inspected
+    body = render(title, doc, name).encode("utf-8")
+    # the server doesn't crawl, pages are rendered when a link is followed
+    settings.MENTIONED_MODULES.clear()
+    return body
+
+
+def render_index() -> bytes:
+    """Index of the top level modules on sys.path."""
+    # circular ref
+    from pydoc_fork.reporter.format_page import docindex, page
+
+    names = sorted({name for _, name, _ in pkgutil.iter_modules()})
+    modules = [{"name": name, "url": f"{name}.html"} for name in names]
+    return page("Index", docindex(modules)).encode("utf-8")
+
+
+class DocHandler(BaseHTTPRequestHandler):
+    """Pages at /<module>.html, the index at /, content hashed assets."""
+
+    cache: PageCache
+    assets: dict[str, bytes]
+
+    def do_GET(self) -> None:  # pylint: disable=invalid-name
+        """Serve a page, 304 if the browser's copy is still good."""
+        path = unquote(urlsplit(self.path).path).lstrip("/")
+        if path in ("", "index.html"):
+            self._send(HTTPStatus.OK, render_index())
+            return
+        if path in self.assets:
+            content_type = assets.CONTENT_TYPES[os.path.splitext(path)[1]]
+            # the name changes with the content
+            immutable = "public, max-age=31536000, immutable"
+            self._send(HTTPStatus.OK, self.assets[path], content_type, cache_control=immutable)
+            return
+        name = path[: -len(".html")] if path.endswith(".html") else ""
+        page = self.cache.get(name) if name and "/" not in name else None
+        if page is None:
+            self._send(HTTPStatus.NOT_FOUND, b"No Python documentation found for that.", "text/plain; charset=utf-8")
+            return
+        if page.etag in (tag.strip() for tag in self.headers.get("If-None-Match", "").split(",")):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", page.etag)
+            self.end_headers()
+            return
+        self._send(HTTPStatus.OK, page.body, etag=page.etag)
+
+    def _send(
+        self,
+        status: HTTPStatus,
+        body: bytes,
+        content_type: str = "text/html; charset=utf-8",
+        etag: str = "",
+        cache_control: str = "",
+    ) -> None:
+        """Write a whole response."""
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+            # always ask, the source may have changed
+            self.send_header("Cache-Control", "no-cache")
+        elif cache_control:
+            self.send_header("Cache-Control", cache_control)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: object) -> None:  # pylint: disable=redefined-builtin
+        """Requests go to the log, not stderr."""
+        LOGGER.info("%s " + format, self.address_string(), *args)
+
+
+def make_server(host: str, port: int) -> ThreadingHTTPServer:
+    """Set up a server, call serve_forever() on it to start serving."""
+    # circular ref
+    from pydoc_fork.reporter.jinja_code import refresh_loader
+
+    _adjust_cli_sys_path()
+    # there is no index to search, and nothing gets written
+    settings.SEARCH = False
+    settings.OUTPUT_FOLDER = os.getcwd()
+    lookups.start()
+    inventory.start()
+    refresh_loader()
+    bound = {"cache": PageCache(settings.SERVE_CACHE_PAGES), "assets": assets.files()}
+    handler = type("BoundDocHandler", (DocHandler,), bound)
+    return ThreadingHTTPServer((host, port), handler)
+
+
+def serve(host: str, port: int) -> None:
+    """Serve until interrupted."""
+    server = make_server(host, port)
+    LOGGER.info("Serving documentation at http://%s:%s/", *server.server_address[:2])
+    print(f"Serving documentation at http://{host}:{server.server_address[1]}/, Ctrl+C to stop")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
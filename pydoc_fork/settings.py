@@ -24,6 +24,30 @@ DOCUMENT_INTERNALS = False
 ONLY_NAMED_AND_SUBS = False
 GENERATE_INDEX = True
 PROJECT_NAME = "Python Project"
+JOBS = 1
+INCREMENTAL = False
+STATIC = False
+CACHE = True
+CACHE_DIR: str | None = None
+CACHE_MAX_MB = 256
+ISOLATE = False
+IMPORT_TIMEOUT = 60.0
+RECYCLE_AFTER = 100
+CRAWL_MAX_MODULES: int | None = 100
+CRAWL_MAX_BYTES: int | None = None
+CRAWL_MAX_SECONDS: float | None = None
+CRAWL_PRIORITY = "links"
+STDLIB_BUNDLE = True
+STDLIB_BUNDLE_DIR: str | None = None
+SEARCH = True
+INVENTORY = True
+INVENTORIES: list[str] = []
+SERVE_CACHE_PAGES = 256
+PROFILE: str | None = None
+PROFILE_TOP = 10
+PRECOMPRESS = False
+OUTPUT_ARCHIVE: str | None = None
+THEMES: list[str] = []
 
 OUTPUT_FOLDER = ""
 THEME = "classic"
@@ -51,6 +75,30 @@ def load_config(path: str | None):
     global CUSTOM_TEMPLATES
     global GENERATE_INDEX
     global PROJECT_NAME
+    global JOBS
+    global INCREMENTAL
+    global STATIC
+    global CACHE
+    global CACHE_DIR
+    global CACHE_MAX_MB
+    global ISOLATE
+    global IMPORT_TIMEOUT
+    global RECYCLE_AFTER
+    global CRAWL_MAX_MODULES
+    global CRAWL_MAX_BYTES
+    global CRAWL_MAX_SECONDS
+    global CRAWL_PRIORITY
+    global STDLIB_BUNDLE
+    global STDLIB_BUNDLE_DIR
+    global SEARCH
+    global INVENTORY
+    global INVENTORIES
+    global SERVE_CACHE_PAGES
+    global PROFILE
+    global PROFILE_TOP
+    global PRECOMPRESS
+    global OUTPUT_ARCHIVE
+    global THEMES
 
     pairs = parse_toml(path)
     if pairs:
@@ -63,11 +111,40 @@ def load_config(path: str | None):
     CUSTOM_TEMPLATES = pairs.get("CUSTOM_TEMPLATES", None)
     GENERATE_INDEX = pairs.get("GENERATE_INDEX", True)
     PROJECT_NAME = pairs.get("PROJECT_NAME", "Python Project")
+    JOBS = int(pairs.get("JOBS", 1))
+    INCREMENTAL = pairs.get("INCREMENTAL", False)
+    STATIC = pairs.get("STATIC", False)
+    CACHE = pairs.get("CACHE", True)
+    CACHE_DIR = pairs.get("CACHE_DIR", None)
+    CACHE_MAX_MB = int(pairs.get("CACHE_MAX_MB", 256))
+    ISOLATE = pairs.get("ISOLATE", False)
+    IMPORT_TIMEOUT = float(pairs.get("IMPORT_TIMEOUT", 60.0))
+    RECYCLE_AFTER = int(pairs.get("RECYCLE_AFTER", 100))
+    crawl_max_modules = pairs.get("CRAWL_MAX_MODULES", 100)
+    CRAWL_MAX_MODULES = None if crawl_max_modules is None else int(crawl_max_modules)
+    crawl_max_bytes = pairs.get("CRAWL_MAX_BYTES", None)
+    CRAWL_MAX_BYTES = None if crawl_max_bytes is None else int(crawl_max_bytes)
+    crawl_max_seconds = pairs.get("CRAWL_MAX_SECONDS", None)
+    CRAWL_MAX_SECONDS = None if crawl_max_seconds is None else float(crawl_max_seconds)
+    CRAWL_PRIORITY = pairs.get("CRAWL_PRIORITY", "links")
+    STDLIB_BUNDLE = pairs.get("STDLIB_BUNDLE", True)
+    STDLIB_BUNDLE_DIR = pairs.get("STDLIB_BUNDLE_DIR", None)
+    SEARCH = pairs.get("SEARCH", True)
+    INVENTORY = pairs.get("INVENTORY", True)
+    INVENTORIES = pairs.get("INVENTORIES", [])
+    SERVE_CACHE_PAGES = int(pairs.get("SERVE_CACHE_PAGES", 256))
+    PROFILE = pairs.get("PROFILE", None)
+    PROFILE_TOP = int(pairs.get("PROFILE_TOP", 10))
+    PRECOMPRESS = pairs.get("PRECOMPRESS", False)
+    OUTPUT_ARCHIVE = pairs.get("OUTPUT_ARCHIVE", None)
+    THEMES = pairs.get("THEMES", [])
+    if THEMES:
+        THEME = THEMES[0]
 
-    if CUSTOM_TEMPLATES:
-        from pydoc_fork.reporter.jinja_code import refresh_loader
+    # templates looked up under the old settings are stale now
+    from pydoc_fork.reporter.jinja_code import refresh_loader
 
-        refresh_loader()
+    refresh_loader()
 
 
 def parse_toml(path_string: str | None) -> dict[str, Any]:
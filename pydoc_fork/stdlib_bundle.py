@@ -0,0 +1,223 @@
+"""
+Standard library pages, rendered once and shared between projects.
+
+Pages mention standard library modules and those get documented along with
+everything else, the same pages for every project on the same Python. The
+first run renders them into a bundle folder next to the cache, keyed by the
+Python version, and later runs, for this project or any other, copy them
+from there instead of importing and rendering them again.
+
+The project name and the relative link to the module's source file are the
+only parts of a page that depend on the project, the bundle keeps
+placeholders for them that are filled in on the way out.
+"""
+
+import contextlib
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+from typing import Any, cast
+
+from pydoc_fork import assets, output_files, search_index, settings
+from pydoc_fork.__about__ import __version__
+from pydoc_fork.inspector.custom_types import TypeLike
+from pydoc_fork.inspector.model import Doc, ModuleDoc
+from pydoc_fork.inspector.module_utils import (
+    STDLIB_BASEDIR,
+    find_spec_quietly,
+    in_stdlib_folder,
+    is_stdlib,
+)
+
+LOGGER = logging.getLogger(__name__)
+
+BUNDLE: "StdlibBundle | None" = None
+"""Bundle for the current run, None when it is off."""
+
+PROJECT_NAME_SLOT = "\x00pydoc_fork_project_name\x00"
+"""Stands in for the project name in bundled pages"""
+
+PROCESS_STATE = frozenset({"os", "site", "sysconfig"})
+"""Modules with source whose pages show the process anyway, os.environ and the venv's paths"""
+
+_FILE_LINK = re.compile(r'<a href="file:([^"]*)">\1</a>')
+
+_RENDERED_FROM = os.path.normcase(os.path.abspath(STDLIB_BASEDIR))
+"""Bundled pages link to source files relative to Python's own folder"""
+
+
+def default_bundle_dir() -> str:
+    """Next to the model cache."""
+    # circular ref
+    from pydoc_fork.model_cache import default_cache_dir
+
+    return os.path.join(settings.CACHE_DIR or default_cache_dir(), "stdlib")
+
+
+def fingerprint() -> str:
+    """Everything besides the Python version that changes what a standard library page looks like."""
+    templates = os.path.join(os.path.dirname(__file__), "templates")
+    digest = hashlib.sha256()
+    for path in sorted(glob.glob(os.path.join(templates, "*.jinja2"))):
+        with open(path, "rb") as file:
+            digest.update(file.read())
+    relevant = [
+        __version__,
+        sys.version,
+        settings.DOCUMENT_INTERNALS,
+        settings.SKIP_MODULES,
+        settings.PREFER_DOCS_PYTHON_ORG,
+        settings.PYTHONDOCS,
+        settings.ONLY_NAMED_AND_SUBS,
+        settings.STATIC,
+        settings.SEARCH,
+        settings.INVENTORIES,
+        assets.names(),
+        digest.hexdigest(),
+    ]
+    return hashlib.sha256(json.dumps(relevant, default=str).encode()).hexdigest()
+
+
+def covers(name: str) -> bool:
+    """True for standard library modules with a source file.
+
+    Like the model cache, modules without one are left out, their pages show
+    the state of the process, e.g. sys.argv. So are the few with one whose
+    pages show it too, see PROCESS_STATE.
+    """
+    if name.split(".")[0] in PROCESS_STATE:
+        return False
+    module = sys.modules.get(name)
+    if module is not None and not is_stdlib(cast(TypeLike, module)):
+        return False
+    spec = find_spec_quietly(name)
+    if spec is None or not spec.has_location or not spec.origin:
+        return False
+    return spec.origin.endswith(".py") and in_stdlib_folder(spec.origin)
+
+
+class BundledPage:
+    """A standard library page with placeholders, and what it mentioned."""
+
+    __slots__ = ("entries", "linked", "mentioned", "path")
+
+    def __init__(
+        self,
+        path: str,
+        mentioned: list[tuple[str, str]],
+        linked: list[str],
+        entries: list[search_index.Entry],
+    ) -> None:
+        """Set up"""
+        self.path = path
+        self.mentioned = mentioned
+        self.linked = linked
+        self.entries = entries
+
+
+class StdlibBundle:
+    """A folder per Python version and fingerprint, an html and a json file per module."""
+
+    def __init__(self, root: str) -> None:
+        """Nothing is read until asked for."""
+        version = f"{sys.version_info[0]}.{sys.version_info[1]}"
+        self.folder = os.path.join(root, version, fingerprint()[:16])
+        self.hits = 0
+        self.stored = 0
+
+    def load(self, name: str) -> BundledPage | None:
+        """The bundled page, if it was rendered before."""
+        path = os.path.join(self.folder, f"{name}.html")
+        try:
+            with open(os.path.join(self.folder, f"{name}.json"), encoding="utf-8") as file:
+                data = json.load(file)
+            page = BundledPage(
+                path,
+                # json made the pairs lists
+                [(pair[0], pair[1]) for pair in data["mentioned"]],
+                list(data["linked"]),
+                data["entries"],
+            )
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            LOGGER.warning("Ignoring unreadable bundled page for %s in %s", name, self.folder)
+            return None
+        if not os.path.exists(path):
+            return None
+        self.hits += 1
+        return page
+
+    def store(
+        self,
+        name: str,
+        title: str,
+        doc: Doc,
+        mentioned: list[tuple[str, str]],
+        linked: list[str],
+    ) -> BundledPage | None:
+        """Render the page with placeholders into the bundle, None if it can't be written."""
+        # circular ref
+        from pydoc_fork.reporter.format_page import stream_render
+
+        path = os.path.join(self.folder, f"{name}.html")
+        data: dict[str, Any] = {
+            "mentioned": sorted(mentioned),
+            "linked": sorted(set(linked)),
+            "entries": search_index.entries(f"{name}.html", doc) if isinstance(doc, ModuleDoc) else [],
+        }
+        # projects share the folder, so never leave a half written file where a reader could find it
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        project_name, output_folder = settings.PROJECT_NAME, settings.OUTPUT_FOLDER
+        settings.PROJECT_NAME, settings.OUTPUT_FOLDER = PROJECT_NAME_SLOT, _RENDERED_FROM
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                file.writelines(stream_render(title, doc, name))
+            os.replace(temporary_path, path)
+            with open(temporary_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            os.replace(temporary_path, os.path.join(self.folder, f"{name}.json"))
+        except OSError as error:
+            LOGGER.warning("Can't bundle %s, got %s", name, error)
+            with contextlib.suppress(OSError):
+                os.remove(temporary_path)
+            return None
+        finally:
+            settings.PROJECT_NAME, settings.OUTPUT_FOLDER = project_name, output_folder
+        self.stored += 1
+        return BundledPage(path, data["mentioned"], data["linked"], data["entries"])
+
+    def copy(self, page: BundledPage, full_path: str, output_folder: str) -> bool:
+        """Write the bundled page for this project, True if it changed."""
+        to_python = os.path.relpath(_RENDERED_FROM, os.path.normcase(os.path.abspath(output_folder)))
+
+        def relink(match: re.Match[str]) -> str:
+            path = os.path.normpath(os.path.join(to_python, match.group(1))).replace("\\", "/")
+            return f'<a href="file:{path}">{path}</a>'
+
+        with open(page.path, encoding="utf-8") as file:
+            html = file.read()
+        html = _FILE_LINK.sub(relink, html.replace(PROJECT_NAME_SLOT, settings.PROJECT_NAME))
+        return output_files.write_text(full_path, [html])
+
+
+def start() -> StdlibBundle | None:
+    """Open the bundle for this run, unless it is off."""
+    global BUNDLE  # pylint: disable=global-statement
+    # custom templates can show anything about the project
+    enabled = settings.STDLIB_BUNDLE and settings.CACHE and not settings.CUSTOM_TEMPLATES
+    BUNDLE = StdlibBundle(settings.STDLIB_BUNDLE_DIR or default_bundle_dir()) if enabled else None
+    return BUNDLE
+
+
+def finish() -> None:
+    """Forget about the bundle."""
+    global BUNDLE  # pylint: disable=global-statement
+    if BUNDLE is not None:
+        LOGGER.info("Stdlib bundle: %s pages copied, %s rendered", BUNDLE.hits, BUNDLE.stored)
+        BUNDLE = None
@@ -0,0 +1,57 @@
+"""
+Several themes from one build.
+
+With more than one theme, each gets a folder of its own in the output folder,
+docs/classic, docs/light and so on. Modules are imported, inspected and
+rendered once, for the first theme, and every file written to its folder is
+copied to the other folders with the stylesheet link swapped, since that is
+all that differs between themes. Each folder is a whole site, with its own
+index, search and objects.inv.
+"""
+
+import os
+
+from pydoc_fork import assets, output_files, settings
+
+
+def several() -> bool:
+    """True if this build makes more than one theme."""
+    return len(set(settings.THEMES)) > 1
+
+
+def folder_of(output_folder: str, theme: str) -> str:
+    """Folder of a theme, the output folder itself unless there are several."""
+    return os.path.join(output_folder, theme) if several() else output_folder
+
+
+def mirror(first_folder: str) -> None:
+    """Copy what is written to the first theme's folder to the other themes' folders."""
+    output_files.MIRRORS = []
+    if not several():
+        return
+    first = settings.THEMES[0]
+    others = [theme for theme in dict.fromkeys(settings.THEMES) if theme != first]
+    parent = os.path.dirname(first_folder)
+    first_style = assets.url("style.css", first).encode("utf-8")
+    # every theme writes its own stylesheet and script
+    skip = {hashed for theme in settings.THEMES for hashed, _ in assets.wanted(theme).values()}
+    for theme in others:
+        replacements = [(first_style, assets.url("style.css", theme).encode("utf-8"))]
+        output_files.MIRRORS.append(output_files.Mirror(first_folder, os.path.join(parent, theme), replacements, skip))
+
+
+def start(output_folder: str) -> str:
+    """Make the theme folders and their assets, returns the folder pages are written to."""
+    if several():
+        settings.THEME = settings.THEMES[0]
+    for theme in settings.THEMES if several() else [settings.THEME]:
+        output_files.make_folder(folder_of(output_folder, theme))
+        assets.write(folder_of(output_folder, theme), theme)
+    first_folder = folder_of(output_folder, settings.THEME)
+    mirror(first_folder)
+    return first_folder
+
+
+def finish() -> None:
+    """Stop copying."""
+    output_files.MIRRORS = []
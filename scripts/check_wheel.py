@@ -0,0 +1,31 @@
+"""Fail unless the newest wheel in dist/ ships the precompiled templates."""
+
+import glob
+import json
+import os
+import sys
+import zipfile
+
+from jinja2 import ModuleLoader
+
+FOLDER = "pydoc_fork/compiled_templates/"
+
+
+def run(dist: str = "dist") -> None:
+    wheels = glob.glob(os.path.join(dist, "*.whl"))
+    if not wheels:
+        sys.exit(f"No wheel in {dist}/, run uv build first")
+    wheel = max(wheels, key=os.path.getmtime)
+    with zipfile.ZipFile(wheel) as opened:
+        names = set(opened.namelist())
+        if FOLDER + "checksums.json" not in names:
+            sys.exit(f"{wheel} has no compiled templates, is artifacts in [tool.hatch.build.targets.wheel] gone?")
+        checksums = json.loads(opened.read(FOLDER + "checksums.json"))
+    missing = [name for name in checksums if FOLDER + ModuleLoader.get_module_filename(name) not in names]
+    if missing:
+        sys.exit(f"{wheel} is missing compiled templates for {', '.join(sorted(missing))}")
+    print(f"{wheel} ships {len(checksums)} compiled templates")
+
+
+if __name__ == "__main__":
+    run(*sys.argv[1:])
@@ -0,0 +1,64 @@
+import os
+import re
+import sys
+
+import pytest
+
+from pydoc_fork import assets, process_path_or_dot_name, settings
+
+
+@pytest.fixture
+def sample_module(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "styled_mod.py").write_text('"""Styled."""\n', encoding="utf-8")
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 0)
+    monkeypatch.setattr(settings, "THEME", "classic")
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    yield base
+    sys.modules.pop("styled_mod", None)
+
+
+def test_names_follow_the_content(monkeypatch):
+    assert re.fullmatch(r"style\.[0-9a-f]{12}\.css", assets.url("style.css"))
+    assert assets.hashed_name("a.css", b"x") == assets.hashed_name("a.css", b"x") != assets.hashed_name("a.css", b"y")
+    monkeypatch.setattr(settings, "THEME", "light")
+    light = assets.url("style.css")
+    monkeypatch.setattr(settings, "THEME", "dark")
+    assert assets.url("style.css") != light
+    assert "search.js" in assets.names()
+    monkeypatch.setattr(settings, "SEARCH", False)
+    assert list(assets.names()) == ["style.css"]
+
+
+def test_pages_link_to_hashed_assets(sample_module, tmp_path):
+    output = tmp_path / "out"
+    process_path_or_dot_name(["styled_mod"], output_folder=str(output), overwrite_existing=True)
+    style = output / assets.url("style.css")
+    assert style.read_text(encoding="utf-8") == assets.themed_style()
+    page = (output / "styled_mod.html").read_text(encoding="utf-8")
+    assert f'href="{style.name}"' in page
+    assert f'src="{assets.url("search.js")}"' in page
+    assert not (output / "style.css").exists()
+
+
+def test_rebuilds_leave_assets_alone(sample_module, tmp_path, monkeypatch):
+    output = tmp_path / "out"
+    process_path_or_dot_name(["styled_mod"], output_folder=str(output), overwrite_existing=True)
+    classic = output / assets.url("style.css")
+    stat = classic.stat()
+    os.utime(classic, ns=(stat.st_atime_ns, stat.st_mtime_ns - 10_000_000_000))
+    before = classic.stat().st_mtime_ns
+    process_path_or_dot_name(["styled_mod"], output_folder=str(output), overwrite_existing=True)
+    assert classic.stat().st_mtime_ns == before
+
+    monkeypatch.setattr(settings, "THEME", "dark")
+    process_path_or_dot_name(["styled_mod"], output_folder=str(output), overwrite_existing=True)
+    dark = output / assets.url("style.css")
+    assert dark != classic and dark.exists()
+    # pages cached elsewhere may still link to the old one
+    assert classic.stat().st_mtime_ns == before
+    assert f'href="{dark.name}"' in (output / "styled_mod.html").read_text(encoding="utf-8")
@@ -0,0 +1,72 @@
+import sys
+import types
+
+import pytest
+
+from pydoc_fork import settings
+from pydoc_fork.inspector.builder import build_class
+from pydoc_fork.reporter import format_class, jinja_code
+from pydoc_fork.reporter.format_class import render_class
+
+
+def _hierarchy():
+    """A rich base with an alias and links between methods, and a few subclasses."""
+    module = types.ModuleType("fragment_errors")
+    body = {"__module__": module.__name__, "__doc__": "Base error."}
+    exec(
+        "def describe(self, value):\n"
+        "    '''Like self.explain(value), see Base and RFC 2616.'''\n"
+        "def explain(self, value):\n"
+        "    '''Calls describe(value).'''\n"
+        "shout = explain\n"
+        "LEVEL = 'loud'\n",
+        body,
+    )
+    module.Base = type("Base", (Exception,), body)
+    for index in range(3):
+        cls = type(f"Error{index}", (module.Base,), {"__module__": module.__name__, "__doc__": f"Error {index}."})
+        setattr(module, cls.__name__, cls)
+    return module
+
+
+@pytest.fixture
+def errors(monkeypatch):
+    module = _hierarchy()
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    format_class._FRAGMENTS.clear()
+    yield module
+    monkeypatch.undo()
+    jinja_code.refresh_loader()
+
+
+def _render(cls, module, fresh=False):
+    if fresh:
+        format_class._FRAGMENTS.clear()
+    links = {"Base": "#Base", "describe": "#-describe"}
+    return render_class(build_class(cls, mod=module.__name__), {"describe": "#-describe"}, links)
+
+
+def test_reused_fragments_render_like_fresh_ones(errors):
+    expected = [_render(getattr(errors, f"Error{index}"), errors, fresh=True) for index in range(3)]
+
+    format_class._FRAGMENTS.clear()
+    assert [_render(getattr(errors, f"Error{index}"), errors) for index in range(3)] == expected
+    assert 'name="Error2-describe"' in expected[2]
+    assert 'href="#Error2-explain">explain' in expected[2]
+    assert "Error0" not in expected[2]
+
+
+def test_each_base_section_is_rendered_once(errors):
+    for index in range(3):
+        _render(getattr(errors, f"Error{index}"), errors)
+    sections = len(build_class(errors.Error0, mod=errors.__name__).sections)
+    assert len(format_class._FRAGMENTS) == sections
+
+
+def test_changed_templates_are_not_served_from_the_cache(errors, monkeypatch, tmp_path):
+    _render(errors.Error0, errors)
+    (tmp_path / "function.jinja2").write_text("custom {{ decl }}", encoding="utf-8")
+    monkeypatch.setattr(settings, "CUSTOM_TEMPLATES", str(tmp_path))
+    jinja_code.refresh_loader()
+
+    assert "custom " in _render(errors.Error1, errors)
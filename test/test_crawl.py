@@ -0,0 +1,122 @@
+import os
+import sys
+
+import pytest
+
+from pydoc_fork import crawl, process_path_or_dot_name, settings
+
+
+def _frontier(priority):
+    frontier = crawl.CrawlFrontier(["mine.sub"], priority)
+    frontier.record(
+        "mine.sub", [("popular", "popular"), ("hub", "hub"), ("mine.other", "mine.other"), ("near", "near")]
+    )
+    frontier.record("popular", [("far", "far")])
+    frontier.record("hub", [("far", "far"), ("far", "far.alias"), ("mine.sub", "mine.sub")])
+    frontier.record("hub", [("near", "near")])
+    return frontier
+
+
+@pytest.mark.parametrize(
+    "priority, expected",
+    [
+        ("links", ["far", "mine.other", "near"]),
+        ("depth", ["mine.other", "near", "far"]),
+        ("owned", ["mine.other", "far", "near"]),
+    ],
+)
+def test_priority_order(priority, expected, monkeypatch):
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    assert [name for name, _, _ in _frontier(priority).pending()] == expected
+
+
+def test_order_does_not_depend_on_the_set(monkeypatch):
+    names = [f"mod_{index}" for index in range(50)]
+    orders = []
+    for reverse in (False, True):
+        monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+        frontier = crawl.CrawlFrontier([])
+        frontier.record("page", [(name, name) for name in sorted(names, reverse=reverse)])
+        orders.append([name for name, _, _ in frontier.pending()])
+    assert orders[0] == orders[1] == sorted(names)
+
+
+def test_live_modules_are_documented_as_they_are(monkeypatch):
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", {(os, "os"), ("os", "os")})
+    frontier = crawl.CrawlFrontier([])
+    assert frontier.pending() == [(os.__name__, os, "os")]
+    assert not settings.MENTIONED_MODULES
+
+
+def test_unknown_priority():
+    with pytest.raises(ValueError, match="links, depth, owned"):
+        crawl.CrawlFrontier([], "alphabetical")
+
+
+def test_budget(tmp_path):
+    page = tmp_path / "page.html"
+    page.write_text("x" * 10, encoding="utf-8")
+    assert crawl.CrawlBudget(2, None, None).modules_left() == 2
+    budget = crawl.CrawlBudget(None, 15, None)
+    budget.spend(1, [str(page)])
+    assert budget.exhausted() is None and budget.modules_left() is None
+    budget.spend(2, [str(page), str(tmp_path / "gone.html")])
+    assert budget.exhausted() == "15 bytes"
+    assert crawl.CrawlBudget(None, None, 0).exhausted() == "0 seconds"
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_module_budget_stops_the_crawl(jobs, tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "crawl_me.py").write_text(
+        '"""Mentions a few modules."""\nimport json, csv, string, textwrap\n', encoding="utf-8"
+    )
+    monkeypatch.setattr(settings, "JOBS", jobs)
+    monkeypatch.setattr(settings, "GENERATE_INDEX", False)
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 2)
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.chdir(base)
+    sys.path.insert(0, str(base))
+    try:
+        written = process_path_or_dot_name(["crawl_me"], output_folder=str(tmp_path / "out"))
+    finally:
+        sys.path.remove(str(base))
+        sys.modules.pop("crawl_me", None)
+
+    # the page itself and two of the modules it mentions, first by name as they tie
+    assert sorted({os.path.basename(path) for path in written}) == ["crawl_me.html", "csv.html", "json.html"]
+    assert crawl.FRONTIER is None
+
+
+def test_jobs_crawl_the_same_modules(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    base.mkdir()
+    sources = {
+        "ranked_root": "from ranked_a import A\nfrom ranked_b import B\nfrom ranked_c import C\n",
+        # documenting ranked_a first would make ranked_c the most linked
+        "ranked_a": "from ranked_c import C\nclass A:\n    pass\n",
+        "ranked_b": "class B:\n    pass\n",
+        "ranked_c": "class C:\n    pass\n",
+    }
+    for name, source in sources.items():
+        (base / f"{name}.py").write_text(f'"""{name}."""\n{source}', encoding="utf-8")
+    monkeypatch.setattr(settings, "GENERATE_INDEX", False)
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 2)
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    written = {}
+    try:
+        for jobs in (1, 2):
+            monkeypatch.setattr(settings, "JOBS", jobs)
+            monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+            output = tmp_path / f"out_{jobs}"
+            process_path_or_dot_name(["ranked_root"], output_folder=str(output))
+            written[jobs] = sorted(path.name for path in output.glob("*.html"))
+            for name in sources:
+                sys.modules.pop(name, None)
+    finally:
+        for name in sources:
+            sys.modules.pop(name, None)
+    assert written[1] == written[2] == ["ranked_a.html", "ranked_b.html", "ranked_root.html"]
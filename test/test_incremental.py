@@ -0,0 +1,100 @@
+import os
+import sys
+
+import pytest
+
+from pydoc_fork import commands, incremental, process_path_or_dot_name, settings
+
+
+@pytest.fixture
+def sample_project(tmp_path):
+    """Two modules, one subclassing a class from the other."""
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "inc_base.py").write_text(
+        '"""Base module."""\nclass Base:\n    """Base."""\n    def hello(self):\n        """Hi."""\n',
+        encoding="utf-8",
+    )
+    (base / "inc_child.py").write_text(
+        '"""Child module."""\nfrom inc_base import Base\nclass Child(Base):\n    """Child."""\n',
+        encoding="utf-8",
+    )
+    (base / "inc_alone.py").write_text('"""Alone."""\ndef alone():\n    """Alone."""\n', encoding="utf-8")
+    return base
+
+
+@pytest.fixture
+def rendered(monkeypatch):
+    """Names of the modules actually rendered."""
+    names = []
+    original = commands.stream_render
+
+    def spy(title, the_object, name):
+        names.append(name)
+        return original(title, the_object, name)
+
+    monkeypatch.setattr(commands, "stream_render", spy)
+    monkeypatch.setattr(settings, "INCREMENTAL", True)
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    return names
+
+
+def _generate(base, output, monkeypatch):
+    monkeypatch.chdir(base)
+    sys.path.insert(0, str(base))
+    try:
+        return process_path_or_dot_name(["inc_base", "inc_child", "inc_alone"], output_folder=str(output))
+    finally:
+        sys.path.remove(str(base))
+        for name in [name for name in sys.modules if name.startswith("inc_")]:
+            del sys.modules[name]
+
+
+def test_unchanged_modules_are_not_rendered_again(sample_project, tmp_path, rendered, monkeypatch):
+    output = tmp_path / "output"
+    first = _generate(sample_project, output, monkeypatch)
+    assert os.path.exists(output / incremental.MANIFEST_NAME)
+    assert {"inc_base", "inc_child", "inc_alone"} <= set(rendered)
+
+    rendered.clear()
+    second = _generate(sample_project, output, monkeypatch)
+
+    assert rendered == []
+    assert sorted(second) == sorted(first)
+
+
+def test_changed_dependency_re_renders_dependents(sample_project, tmp_path, rendered, monkeypatch):
+    output = tmp_path / "output"
+    _generate(sample_project, output, monkeypatch)
+    (sample_project / "inc_base.py").write_text(
+        '"""Base module."""\nclass Base:\n    """Base."""\n    def goodbye(self):\n        """Bye."""\n',
+        encoding="utf-8",
+    )
+
+    rendered.clear()
+    _generate(sample_project, output, monkeypatch)
+
+    assert sorted(rendered) == ["inc_base", "inc_child"]
+    assert "goodbye" in (output / "inc_child.html").read_text(encoding="utf-8")
+
+
+def test_deleted_page_is_rendered_again(sample_project, tmp_path, rendered, monkeypatch):
+    output = tmp_path / "output"
+    _generate(sample_project, output, monkeypatch)
+    os.remove(output / "inc_alone.html")
+
+    rendered.clear()
+    _generate(sample_project, output, monkeypatch)
+
+    assert rendered == ["inc_alone"]
+
+
+def test_switching_static_renders_everything_again(sample_project, tmp_path, rendered, monkeypatch):
+    output = tmp_path / "output"
+    _generate(sample_project, output, monkeypatch)
+
+    rendered.clear()
+    monkeypatch.setattr(settings, "STATIC", True)
+    _generate(sample_project, output, monkeypatch)
+
+    assert {"inc_base", "inc_child", "inc_alone"} <= set(rendered)
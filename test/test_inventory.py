@@ -0,0 +1,85 @@
+import logging
+import sys
+import zlib
+
+import pytest
+
+from pydoc_fork import inventory, process_path_or_dot_name, settings
+
+
+@pytest.fixture
+def sample_module(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "linked_mod.py").write_text(
+        '"""Uses json."""\n'
+        "import json\n"
+        "from json.decoder import JSONDecoder\n"
+        "class StrictDecoder(JSONDecoder):\n"
+        '    """Stricter."""\n'
+        "    def decode(self, text):\n"
+        '        """Decode."""\n'
+        "def load_strictly(text):\n"
+        '    """Load."""\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.setattr(settings, "GENERATE_INDEX", False)
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    yield base
+    sys.modules.pop("linked_mod", None)
+    inventory.EXTERNAL = {}
+
+
+def test_round_trip():
+    lines = [("json", "py:module", "0", "library/json.html#module-$", "-"), ("a b", "std:term", "-1", "g.html", "A b")]
+    data = inventory.dump("Project", lines)
+    assert data.startswith(b"# Sphinx inventory version 2\n# Project: Project\n")
+    assert inventory.parse(data) == [
+        ("json", "py:module", "0", "library/json.html#module-json", "-"),
+        ("a b", "std:term", "-1", "g.html", "A b"),
+    ]
+    with pytest.raises(ValueError):
+        inventory.parse(b"# Sphinx inventory version 1\n# Project: X\n# Version: 1\nx x.html\n")
+
+
+def test_documented_names_are_in_the_inventory(sample_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 0)
+    process_path_or_dot_name(["linked_mod"], output_folder=str(tmp_path / "out"))
+
+    lines = inventory.parse((tmp_path / "out" / "objects.inv").read_bytes())
+    assert ("linked_mod", "py:module", "1", "linked_mod.html", "-") in lines
+    assert ("linked_mod.StrictDecoder", "py:class", "1", "linked_mod.html#StrictDecoder", "-") in lines
+    assert ("linked_mod.StrictDecoder.decode", "py:method", "1", "linked_mod.html#StrictDecoder-decode", "-") in lines
+    assert ("linked_mod.load_strictly", "py:function", "1", "linked_mod.html#-load_strictly", "-") in lines
+
+
+def test_other_projects_are_linked_not_documented(sample_module, tmp_path, monkeypatch):
+    other = tmp_path / "other.inv"
+    other.write_bytes(
+        inventory.dump(
+            "Python",
+            [
+                ("json", "py:module", "0", "library/json.html#module-$", "-"),
+                ("json.decoder.JSONDecoder", "py:class", "1", "library/json.html#$", "-"),
+            ],
+        )
+    )
+    monkeypatch.setattr(settings, "INVENTORIES", [f"https://docs.example.org/3={other}"])
+    output = tmp_path / "out"
+    process_path_or_dot_name(["linked_mod"], output_folder=str(output))
+
+    page = (output / "linked_mod.html").read_text(encoding="utf-8")
+    assert 'href="https://docs.example.org/3/library/json.html#module-json"' in page
+    assert 'href="https://docs.example.org/3/library/json.html#json.decoder.JSONDecoder"' in page
+    assert not (output / "json.html").exists()
+
+
+def test_unreadable_inventories_are_skipped(tmp_path, monkeypatch, caplog):
+    (tmp_path / "broken.inv").write_bytes(b"# Sphinx inventory version 2\n# P\n# V\n# z\n" + zlib.compress(b"x")[:3])
+    monkeypatch.setattr(settings, "INVENTORIES", [f"https://x.org={tmp_path / 'broken.inv'}", str(tmp_path / "none")])
+    with caplog.at_level(logging.WARNING, logger="pydoc_fork.inventory"):
+        assert inventory.start() == {}
+    assert caplog.text.count("Can't read inventory") == 2
@@ -0,0 +1,78 @@
+import sys
+
+import pytest
+
+from pydoc_fork import isolation, process_path_or_dot_name, settings
+
+
+@pytest.fixture
+def troubled_project(tmp_path):
+    """One good module, one that never finishes importing, one that kills the interpreter."""
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "iso_good.py").write_text('"""Good."""\ndef fine():\n    """Fine."""\n', encoding="utf-8")
+    (base / "iso_hangs.py").write_text('"""Hangs."""\nimport time\ntime.sleep(60)\n', encoding="utf-8")
+    (base / "iso_crashes.py").write_text('"""Crashes."""\nimport os\nos._exit(3)\n', encoding="utf-8")
+    return base
+
+
+@pytest.fixture
+def isolated(monkeypatch):
+    monkeypatch.setattr(settings, "ISOLATE", True)
+    monkeypatch.setattr(settings, "IMPORT_TIMEOUT", 3.0)
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    yield
+    isolation.shutdown_worker()
+
+
+def _generate(base, output, names, monkeypatch):
+    monkeypatch.chdir(base)
+    sys.path.insert(0, str(base))
+    try:
+        return process_path_or_dot_name(names, output_folder=str(output))
+    finally:
+        sys.path.remove(str(base))
+
+
+def test_hanging_and_crashing_modules_are_skipped(troubled_project, tmp_path, isolated, monkeypatch):
+    output = tmp_path / "output"
+    written = _generate(troubled_project, output, ["iso_hangs", "iso_crashes", "iso_good"], monkeypatch)
+
+    assert (output / "iso_good.html").exists()
+    assert not (output / "iso_hangs.html").exists()
+    assert not (output / "iso_crashes.html").exists()
+    assert str(output / "iso_good.html") in written
+    # nothing got imported by the parent
+    assert not [name for name in sys.modules if name.startswith("iso_")]
+
+
+def test_worker_is_recycled(tmp_path, isolated, monkeypatch):
+    monkeypatch.setattr(settings, "RECYCLE_AFTER", 2)
+    pids = []
+    for name in ["json", "json.decoder", "json.encoder", "json.scanner"]:
+        assert isolation.inspect_isolated(name) is not None
+        pids.append(isolation._WORKER.process.pid if isolation._WORKER else None)
+
+    # recycled after every second module
+    assert pids[1] is None and pids[3] is None
+    assert pids[0] != pids[2]
+
+
+def test_isolated_workers_in_a_pool(tmp_path, isolated, monkeypatch):
+    base = tmp_path / "src"
+    base.mkdir()
+    names = [f"iso_pooled_{index}" for index in range(6)]
+    for name in names:
+        (base / f"{name}.py").write_text(f'"""Doc of {name}."""\ndef fine():\n    """Fine."""\n', encoding="utf-8")
+    monkeypatch.setattr(settings, "JOBS", 2)
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 0)
+    # pool workers fork after the parent has an isolation worker of its own
+    assert isolation.inspect_isolated("json") is not None
+    output = tmp_path / "output"
+    written = _generate(base, output, names, monkeypatch)
+
+    assert sorted(written) == sorted([str(output / "index.html"), *(str(output / f"{name}.html") for name in names)])
+    for name in names:
+        assert f"Doc&nbsp;of&nbsp;{name}." in (output / f"{name}.html").read_text(encoding="utf-8")
+    assert not [name for name in sys.modules if name.startswith("iso_")]
@@ -0,0 +1,61 @@
+import gc
+import logging
+import sys
+import types
+
+import pytest
+
+from pydoc_fork.inspector import lookups
+from pydoc_fork.inspector.builder import class_ref
+
+
+@pytest.fixture
+def cache():
+    yield lookups.start()
+    lookups.start()
+
+
+def test_lookups_are_counted(cache):
+    assert lookups.getmodule(ValueError) is lookups.getmodule(ValueError) is sys.modules["builtins"]
+    assert lookups.getmro(ValueError) == ValueError.__mro__
+    assert cache.hits["getmodule"] == 1 and cache.misses["getmodule"] == 1
+    assert "getmodule 1 hits 1 misses (50%)" in cache.report()
+
+
+def test_entries_go_away_with_their_object(cache):
+    cls = type("Temporary", (), {})
+    lookups.getmro(cls)
+    assert len(cache._entries) == 1
+
+    del cls
+    gc.collect()
+    assert not cache._entries
+
+
+def test_objects_without_weakrefs_are_kept_alive(cache):
+    key = ("not", "weakly", "referable")
+    cache.get("example", key, lambda: "value")
+    assert cache._holds[id(key)] is key
+
+
+def test_nothing_found_is_asked_again(cache):
+    lookups.getmodule(42)
+    lookups.getmodule(42)
+    assert cache.misses["getmodule"] == 2
+
+
+def test_class_gets_a_link_once_its_module_is_imported(cache, monkeypatch):
+    cls = type("Late", (), {"__module__": "late_module"})
+    assert class_ref(cls, "somewhere").url is None
+
+    module = types.ModuleType("late_module")
+    module.Late = cls
+    monkeypatch.setitem(sys.modules, "late_module", module)
+    assert class_ref(cls, "somewhere").url == "late_module.html#Late"
+
+
+def test_hit_rate_is_logged(cache, caplog):
+    lookups.getmodule(ValueError)
+    with caplog.at_level(logging.INFO, logger="pydoc_fork.inspector.lookups"):
+        lookups.finish()
+    assert "getmodule 0 hits 1 misses" in caplog.text
@@ -1,6 +1,8 @@
 import logging
 from unittest.mock import patch
 
+import pytest
+
 import pydoc_fork.__main__ as main_module
 from pydoc_fork import settings
 
@@ -58,3 +60,35 @@ def test_process_docopts_applies_optional_cli_settings(tmp_path, monkeypatch):
     assert settings.PROJECT_NAME == "Example Project"
     assert settings.GENERATE_INDEX is False
     assert [logger.name for logger in main_module.LOGGERS] == ["pydoc_fork", "__main__"]
+
+
+def test_a_package_named_serve_is_documented(monkeypatch):
+    processed = []
+    served = []
+    monkeypatch.setattr(
+        main_module.commands,
+        "process_path_or_dot_name",
+        lambda package, output_folder: processed.append(package),
+    )
+    monkeypatch.setattr("pydoc_fork.server.serve", lambda host, port: served.append((host, port)))
+    monkeypatch.setattr(main_module.output_files, "LAST", None)
+    monkeypatch.setattr("sys.argv", ["pydoc_fork", "serve", "--quiet"])
+    assert main_module.main() == 0
+    assert processed == [["serve"]] and not served
+
+    monkeypatch.setattr("sys.argv", ["pydoc_fork", "--serve", "--port", "9000"])
+    assert main_module.main() == 0
+    assert served == [("localhost", 9000)] and processed == [["serve"]]
+
+
+def test_an_unknown_crawl_priority_stops_before_the_run(monkeypatch):
+    processed = []
+    monkeypatch.setattr(
+        main_module.commands,
+        "process_path_or_dot_name",
+        lambda package, output_folder: processed.append(package),
+    )
+    monkeypatch.setattr("sys.argv", ["pydoc_fork", "example_pkg", "--crawl-priority", "size"])
+    with pytest.raises(SystemExit, match="links, depth, owned"):
+        main_module.main()
+    assert not processed
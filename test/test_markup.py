@@ -0,0 +1,86 @@
+import re
+import time
+
+import pytest
+
+from pydoc_fork.reporter.formatter_html import markup, namelink, preformat
+from test import pydoc_mod, pydocfodder
+
+
+def _token_by_token(text, funcs, classes, methods):
+    """How markup() used to do it, one regex search and one preformat per gap."""
+    results = []
+    here = 0
+    pattern = re.compile(r"\b((http|https|ftp)://\S+[\w/]|RFC[- ]?(\d+)|PEP[- ]?(\d+)|(self\.)?(\w+))")
+    while True:
+        match = pattern.search(text, here)
+        if not match:
+            break
+        start, end = match.span()
+        results.append(preformat(text[here:start]))
+        the_all, scheme, rfc, pep, self_dot, name = match.groups()
+        if scheme:
+            url = preformat(the_all).replace('"', "&quot;")
+            results.append(f'<a href="{url}">{url}</a>')
+        elif rfc:
+            url = f"https://www.rfc-editor.org/rfc/rfc{int(rfc)}.txt"
+            results.append(f'<a href="{url}">{preformat(the_all)}</a>')
+        elif pep:
+            url = f"https://www.python.org/dev/peps/pep-{int(pep):04d}/"
+            results.append(f'<a href="{url}">{preformat(the_all)}</a>')
+        elif self_dot:
+            if text[end : end + 1] == "(":
+                results.append("self." + namelink(name, methods))
+            else:
+                results.append(f"self.<strong>{name}</strong>")
+        elif text[end : end + 1] == "(":
+            results.append(namelink(name, methods, funcs, classes))
+        else:
+            results.append(namelink(name, classes))
+        here = end
+    results.append(preformat(text[here:]))
+    return "".join(results)
+
+
+FUNCS = {"helper": "#-helper", "Shared": "#-Shared"}
+CLASSES = {"Shared": "#Shared", "Widget": "#Widget", "helper": "#helper-class"}
+METHODS = {"spin": "#Widget-spin", "helper": "#Widget-helper"}
+
+DOC = """Widget(size) calls helper(x) and self.spin() &amp; self.size, see
+http://example.com/a?b=c&d="e" and RFC 2616, PEP 8 or Shared() vs Shared.
+
+\tIndented <b>text</b>  with  spaces & tabs.
+"""
+
+
+@pytest.mark.parametrize(
+    "text",
+    [DOC, "", "no links here", "helper()", pydocfodder.__doc__ or "", pydoc_mod.__doc__ or ""]
+    + [function.__doc__ for function in vars(pydocfodder.A_new).values() if getattr(function, "__doc__", None)],
+)
+@pytest.mark.parametrize("links", [(FUNCS, CLASSES, METHODS), ({}, CLASSES, {}), (FUNCS, {}, METHODS), ({}, {}, {})])
+def test_same_html_as_token_by_token(text, links):
+    assert markup(text, *links) == _token_by_token(text, *links)
+
+
+def test_precedence_of_links():
+    assert markup("helper()", FUNCS, CLASSES, METHODS) == '<a href="#Widget-helper">helper</a>()'
+    assert markup("Shared()", FUNCS, CLASSES) == '<a href="#-Shared">Shared</a>()'
+    assert markup("Shared", FUNCS, CLASSES) == '<a href="#Shared">Shared</a>'
+
+
+@pytest.mark.slow
+def test_large_doc_strings_are_faster():
+    words = ["helper(x)", "Widget", "self.spin()", "plain", "text,", "RFC 2616", "and", "Shared."]
+    text = "\n".join(" ".join(words[(line + index) % len(words)] for index in range(12)) for line in range(2000))
+
+    def best_of(function):
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            function(text, FUNCS, CLASSES, METHODS)
+            timings.append(time.perf_counter() - start)
+        return min(timings)
+
+    # about twice as fast here, leave room for noisy machines
+    assert best_of(markup) * 1.5 < best_of(_token_by_token)
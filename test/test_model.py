@@ -0,0 +1,80 @@
+import inspect
+
+from pydoc_fork.inspector.builder import build, build_module, build_routine
+from pydoc_fork.inspector.model import ClassDoc, DataDoc, ModuleDoc, RoutineDoc
+from pydoc_fork.reporter.format_module import docmodule, render_module
+from pydoc_fork.reporter.format_routine import render_routine
+from test import pydoc_mod
+
+
+def test_module_model_holds_no_live_objects():
+    doc = build_module(pydoc_mod)
+
+    assert isinstance(doc, ModuleDoc)
+    assert doc.name == "test.pydoc_mod"
+    assert doc.version == "1.2.3.4"
+    assert [class_doc.name for class_doc in doc.classes] == ["A", "B", "C"]
+    assert all(isinstance(class_doc, ClassDoc) for class_doc in doc.classes)
+    assert all(isinstance(routine, RoutineDoc) for routine in doc.functions)
+    assert doc.function_links["doc_func"] == "#-doc_func"
+    assert all(isinstance(key, str) for key in doc.class_links)
+
+    def live(node):
+        if isinstance(node, (str, int, float, bool, type(None))):
+            return False
+        if isinstance(node, dict):
+            return any(live(key) or live(value) for key, value in node.items())
+        if isinstance(node, list):
+            return any(live(item) for item in node)
+        if hasattr(node, "__slots__"):
+            return any(live(getattr(node, slot)) for slot in node.__slots__)
+        return True
+
+    assert not live(doc)
+
+
+def test_same_object_builds_equal_models():
+    assert build_module(pydoc_mod) == build_module(pydoc_mod)
+
+
+def test_render_from_model_matches_docmodule():
+    doc = build_module(pydoc_mod)
+    assert render_module(doc) == render_module(doc) == docmodule(pydoc_mod)
+
+
+def test_class_sections_group_attributes_by_kind():
+    class Base:
+        def inherited(self):
+            """From base."""
+
+    class Child(Base):
+        """A child."""
+
+        limit = 3
+
+        def method(self):
+            """Mine."""
+
+        @property
+        def size(self):
+            """How big."""
+
+    doc = build(Child, "Child", __name__)
+    kinds = [(section.kind, section.defined_by and section.defined_by.name) for section in doc.sections]
+    assert kinds == [
+        ("method", None),
+        ("readonly property", None),
+        ("data", None),
+        ("method", "Base"),
+    ]
+    assert doc.sections[2].members == [DataDoc("limit", "", "3")]
+
+
+def test_routine_survives_runtime_error_from_signature(monkeypatch):
+    def broken(*args, **kwargs):
+        raise RuntimeError("no signature for you")
+
+    monkeypatch.setattr(inspect, "signature", broken)
+    doc = build_routine(len, "len")
+    assert doc.signature is None
+    assert "(...)" in render_routine(doc)
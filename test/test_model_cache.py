@@ -0,0 +1,96 @@
+import os
+import sys
+
+import pytest
+
+from pydoc_fork import model_cache, process_path_or_dot_name, settings
+from pydoc_fork.inspector.builder import build_module
+from pydoc_fork.inspector.model import from_data, to_data
+from test import pydoc_mod
+
+
+@pytest.fixture
+def sample_project(tmp_path):
+    """A module subclassing a class from another module."""
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "cache_base.py").write_text(
+        '"""Base module."""\nclass Base:\n    """Base."""\n    def hello(self):\n        """Hi."""\n',
+        encoding="utf-8",
+    )
+    (base / "cache_child.py").write_text(
+        '"""Child module."""\nfrom cache_base import Base\nclass Child(Base):\n    """Child."""\n',
+        encoding="utf-8",
+    )
+    return base
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    folder = tmp_path / "cache"
+    monkeypatch.setattr(settings, "CACHE", True)
+    monkeypatch.setattr(settings, "CACHE_DIR", str(folder))
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    return folder
+
+
+def _generate(base, output, monkeypatch):
+    monkeypatch.chdir(base)
+    sys.path.insert(0, str(base))
+    try:
+        process_path_or_dot_name(["cache_child"], output_folder=str(output))
+        return sorted(name for name in sys.modules if name.startswith("cache_"))
+    finally:
+        sys.path.remove(str(base))
+        for name in [name for name in sys.modules if name.startswith("cache_")]:
+            del sys.modules[name]
+
+
+def test_model_survives_a_round_trip_through_json():
+    doc = build_module(pydoc_mod)
+    assert from_data(to_data(doc)) == doc
+
+
+def test_second_run_renders_without_importing(sample_project, tmp_path, cache_dir, monkeypatch):
+    first = tmp_path / "first"
+    imported = _generate(sample_project, first, monkeypatch)
+    assert imported == ["cache_base", "cache_child"]
+    assert len(list(cache_dir.glob("*.json"))) == 2
+
+    second = tmp_path / "second"
+    imported = _generate(sample_project, second, monkeypatch)
+
+    assert imported == []
+    for name in ("cache_base.html", "cache_child.html"):
+        assert (second / name).read_bytes() == (first / name).read_bytes()
+
+
+def test_changed_base_class_module_invalidates_subclass(sample_project, tmp_path, cache_dir, monkeypatch):
+    _generate(sample_project, tmp_path / "first", monkeypatch)
+    (sample_project / "cache_base.py").write_text(
+        '"""Base module."""\nclass Base:\n    """Base."""\n    def goodbye(self):\n        """Bye."""\n',
+        encoding="utf-8",
+    )
+
+    imported = _generate(sample_project, tmp_path / "second", monkeypatch)
+
+    assert imported == ["cache_base", "cache_child"]
+    assert "goodbye" in (tmp_path / "second" / "cache_child.html").read_text(encoding="utf-8")
+
+
+def test_no_cache_leaves_no_trace(sample_project, tmp_path, cache_dir, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE", False)
+    _generate(sample_project, tmp_path / "first", monkeypatch)
+    assert not os.path.exists(cache_dir)
+
+
+def test_prune_evicts_least_recently_used(tmp_path):
+    cache = model_cache.ModelCache(str(tmp_path), max_bytes=250)
+    for age, name in enumerate(["newest", "middle", "oldest"]):
+        path = tmp_path / f"{name}.json"
+        path.write_text("x" * 100, encoding="utf-8")
+        os.utime(path, (1_000_000 - age, 1_000_000 - age))
+
+    cache.prune()
+
+    assert sorted(os.listdir(tmp_path)) == ["middle.json", "newest.json"]
@@ -0,0 +1,140 @@
+import gzip
+import logging
+import sys
+import tarfile
+import zipfile
+
+import pytest
+
+from pydoc_fork import assets, commands, output_archive, output_files, process_path_or_dot_name, settings
+
+
+@pytest.fixture
+def sample_module(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "packed_mod.py").write_text('"""Packed."""\ndef f():\n    """F."""\n', encoding="utf-8")
+    (base / "packed_other.py").write_text('"""Other."""\n', encoding="utf-8")
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 0)
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    yield base
+    sys.modules.pop("packed_mod", None)
+    sys.modules.pop("packed_other", None)
+
+
+def _build(tmp_path, monkeypatch, archive, modules=("packed_mod",)):
+    monkeypatch.setattr(settings, "OUTPUT_ARCHIVE", str(archive))
+    output = tmp_path / "out"
+    process_path_or_dot_name(list(modules), output_folder=str(output), overwrite_existing=True)
+    assert not output.exists()
+    return archive.read_bytes()
+
+
+def test_zip(sample_module, tmp_path, monkeypatch):
+    archive = tmp_path / "docs.zip"
+    first = _build(tmp_path, monkeypatch, archive)
+    with zipfile.ZipFile(archive) as opened:
+        names = opened.namelist()
+        expected = {"packed_mod.html", "index.html", "objects.inv", "search/index.json", *assets.names().values()}
+        assert expected <= set(names)
+        assert len(names) == len(set(names))
+        assert {info.date_time for info in opened.infolist()} == {output_archive.FIXED_DATE}
+        assert b"Packed." in opened.read("packed_mod.html")
+    assert not list(tmp_path.glob("*.tmp"))
+    assert _build(tmp_path, monkeypatch, archive) == first
+
+
+def test_tar_gz(sample_module, tmp_path, monkeypatch):
+    archive = tmp_path / "docs.tar.gz"
+    first = _build(tmp_path, monkeypatch, archive)
+    assert gzip.decompress(first)
+    with tarfile.open(archive) as opened:
+        members = opened.getmembers()
+        assert "packed_mod.html" in [member.name for member in members]
+        assert {(member.mtime, member.mode, member.uid, member.uname) for member in members} == {(0, 0o644, 0, "")}
+    assert _build(tmp_path, monkeypatch, archive) == first
+
+
+def test_workers_send_files_to_the_archive(sample_module, tmp_path, monkeypatch):
+    serial = tmp_path / "serial.zip"
+    _build(tmp_path, monkeypatch, serial, ("packed_mod", "packed_other"))
+    monkeypatch.setattr(settings, "JOBS", 2)
+    parallel = tmp_path / "parallel.zip"
+    _build(tmp_path, monkeypatch, parallel, ("packed_mod", "packed_other"))
+    with zipfile.ZipFile(serial) as left, zipfile.ZipFile(parallel) as right:
+        assert left.namelist() == right.namelist()
+        for name in left.namelist():
+            assert left.read(name) == right.read(name), name
+
+
+@pytest.mark.parametrize("suffix", [".zip", ".tar", ".tar.gz"])
+def test_workers_leave_the_parents_archive_alone(sample_module, tmp_path, monkeypatch, suffix):
+    modules = ("packed_mod", "packed_other")
+    serial = _build(tmp_path, monkeypatch, tmp_path / f"serial{suffix}", modules)
+    monkeypatch.setattr(settings, "JOBS", 2)
+    archive = tmp_path / f"parallel{suffix}"
+    assert _build(tmp_path, monkeypatch, archive, modules) == serial
+    if suffix == ".zip":
+        with zipfile.ZipFile(archive) as opened:
+            assert opened.testzip() is None
+            names = opened.namelist()
+    else:
+        with tarfile.open(archive) as opened:
+            names = opened.getnames()
+            for member in opened.getmembers():
+                assert len(opened.extractfile(member).read()) == member.size
+    assert {"packed_mod.html", "packed_other.html", *assets.names().values()} <= set(names)
+    assert len(names) == len(set(names))
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_incremental_is_ignored(sample_module, tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "INCREMENTAL", True)
+    with caplog.at_level(logging.WARNING):
+        _build(tmp_path, monkeypatch, tmp_path / "docs.zip")
+    assert "ignored with an output archive" in caplog.text
+
+
+def test_same_file_twice_is_one_entry(tmp_path):
+    output_files.start(str(tmp_path / "out"), str(tmp_path / "docs.tar"))
+    try:
+        assert output_files.write_text(str(tmp_path / "out" / "a.html"), ["same"])
+        assert not output_files.write_text(str(tmp_path / "out" / "a.html"), ["same"])
+        assert output_files.exists(str(tmp_path / "out" / "a.html"))
+        assert output_files.size_of(str(tmp_path / "out" / "a.html")) == 4
+        with pytest.raises(ValueError, match="outside"):
+            output_files.write_text(str(tmp_path / "elsewhere.html"), ["x"])
+    finally:
+        output_files.finish()
+    with tarfile.open(tmp_path / "docs.tar") as opened:
+        assert opened.getnames() == ["a.html"]
+
+
+def test_unknown_kind_of_archive(tmp_path):
+    with pytest.raises(ValueError, match=r"\.zip, \.tar"):
+        output_archive.open_archive(str(tmp_path / "docs.rar"), str(tmp_path))
+
+
+def test_failed_run_leaves_no_archive(sample_module, tmp_path, monkeypatch):
+    archive = tmp_path / "docs.zip"
+    _build(tmp_path, monkeypatch, archive)
+    before = archive.read_bytes()
+
+    def fail(*args, **kwargs):
+        raise RuntimeError("render failed")
+
+    monkeypatch.setattr(commands, "write_docs_per_module", fail)
+    with pytest.raises(RuntimeError):
+        process_path_or_dot_name(["packed_mod"], output_folder=str(tmp_path / "out"), overwrite_existing=True)
+    assert output_files.SINK is None
+    assert archive.read_bytes() == before
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["docs.zip", "src"]
+
+    archive.unlink()
+    with pytest.raises(RuntimeError):
+        process_path_or_dot_name(["packed_mod"], output_folder=str(tmp_path / "out"), overwrite_existing=True)
+    assert not archive.exists()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["src"]
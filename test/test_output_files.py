@@ -0,0 +1,143 @@
+import os
+import sys
+
+import pytest
+
+from pydoc_fork import assets, output_files, process_path_or_dot_name, settings
+
+
+@pytest.fixture
+def tally():
+    yield output_files.start()
+    output_files.finish()
+
+
+def test_unchanged_file_is_left_alone(tmp_path, tally):
+    path = tmp_path / "page.html"
+    assert output_files.write_text(str(path), ["<p>", "same</p>\n"])
+    before = os.stat(path)
+    os.utime(path, ns=(before.st_atime_ns, before.st_mtime_ns - 10_000_000_000))
+    before = os.stat(path)
+    assert not output_files.write_text(str(path), ["<p>same", "</p>\n"])
+    after = os.stat(path)
+    assert (after.st_ino, after.st_mtime_ns) == (before.st_ino, before.st_mtime_ns)
+    assert tally.written == [str(path)] and tally.unchanged == [str(path)]
+    assert os.listdir(tmp_path) == ["page.html"]
+
+
+def test_changed_file_is_replaced(tmp_path, tally):
+    path = tmp_path / "data.bin"
+    path.write_bytes(b"old")
+    assert output_files.write_bytes(str(path), [b"new", b"er"])
+    assert path.read_bytes() == b"newer"
+    # same size, different content
+    assert output_files.write_bytes(str(path), [b"older"])
+    assert path.read_bytes() == b"older"
+    assert len(tally.written) == 2
+
+
+def test_failed_write_keeps_the_old_file(tmp_path, tally):
+    path = tmp_path / "page.html"
+    path.write_text("old", encoding="utf-8")
+
+    def pieces():
+        yield "half a page"
+        raise RuntimeError("render failed")
+
+    with pytest.raises(RuntimeError):
+        output_files.write_text(str(path), pieces())
+    assert path.read_text(encoding="utf-8") == "old"
+    assert os.listdir(tmp_path) == ["page.html"]
+    assert not tally.written and not tally.unchanged
+
+
+def test_remove(tmp_path, tally):
+    path = tmp_path / "stale.json"
+    path.write_text("{}", encoding="utf-8")
+    assert output_files.remove(str(path))
+    assert not output_files.remove(str(path))
+    assert tally.removed == [str(path)]
+
+
+def test_second_run_writes_nothing(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "steady_mod.py").write_text('"""Steady."""\ndef f():\n    """F."""\n', encoding="utf-8")
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 0)
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    output = tmp_path / "out"
+    try:
+        process_path_or_dot_name(["steady_mod"], output_folder=str(output), overwrite_existing=True)
+        first = output_files.LAST
+        assert str(output / "steady_mod.html") in first.written
+        assert str(output / assets.url("style.css")) in first.written
+        mtimes = {path.name: path.stat().st_mtime_ns for path in output.rglob("*") if path.is_file()}
+
+        process_path_or_dot_name(["steady_mod"], output_folder=str(output), overwrite_existing=True)
+        second = output_files.LAST
+        assert not second.written and not second.removed
+        assert str(output / "index.html") in second.unchanged
+        assert {path.name: path.stat().st_mtime_ns for path in output.rglob("*") if path.is_file()} == mtimes
+        assert second.summary() == f"0 files written, {len(second.unchanged)} unchanged, 0 removed"
+    finally:
+        sys.modules.pop("steady_mod", None)
+
+
+def test_fresh_package_build_has_nothing_unchanged(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    (base / "fresh_pkg").mkdir(parents=True)
+    (base / "fresh_pkg" / "__init__.py").write_text('"""Fresh."""\n', encoding="utf-8")
+    (base / "fresh_pkg" / "leaf.py").write_text('"""Leaf."""\n', encoding="utf-8")
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 0)
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    output = tmp_path / "out"
+    try:
+        written = process_path_or_dot_name(["fresh_pkg"], output_folder=str(output), overwrite_existing=True)
+        assert written.count(str(output / "fresh_pkg.html")) == 1
+        assert output_files.LAST.unchanged == []
+    finally:
+        for name in [name for name in sys.modules if name.startswith("fresh_pkg")]:
+            del sys.modules[name]
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_pages_of_deleted_modules_are_removed(tmp_path, monkeypatch, incremental):
+    base = tmp_path / "src"
+    (base / "pruned_pkg").mkdir(parents=True)
+    (base / "pruned_pkg" / "__init__.py").write_text('"""Pruned."""\n', encoding="utf-8")
+    (base / "pruned_pkg" / "kept.py").write_text('"""Kept."""\n', encoding="utf-8")
+    (base / "pruned_pkg" / "gone.py").write_text('"""Gone."""\n', encoding="utf-8")
+    (base / "pruned_other.py").write_text('"""Other."""\n', encoding="utf-8")
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.setattr(settings, "INCREMENTAL", incremental)
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 0)
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    output = tmp_path / "out"
+    try:
+        process_path_or_dot_name(["pruned_pkg"], output_folder=str(output))
+        # another project documented into the same folder
+        process_path_or_dot_name(["pruned_other"], output_folder=str(output))
+        (base / "pruned_pkg" / "gone.py").unlink()
+        sys.modules.pop("pruned_pkg.gone", None)
+
+        process_path_or_dot_name(["pruned_pkg"], output_folder=str(output))
+
+        assert output_files.LAST.removed == [str(output / "pruned_pkg.gone.html")]
+        assert output_files.LAST.summary().endswith(", 1 removed")
+        assert {path.name for path in output.glob("*.html")} == {
+            "index.html",
+            "pruned_other.html",
+            "pruned_pkg.html",
+            "pruned_pkg.kept.html",
+        }
+    finally:
+        for name in [name for name in sys.modules if name.startswith("pruned_")]:
+            del sys.modules[name]
@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+
+from pydoc_fork import process_path_or_dot_name, settings
+
+
+@pytest.fixture
+def sample_package(tmp_path):
+    """A small package with a few submodules worth splitting across workers."""
+    base = tmp_path / "src"
+    pkg = base / "par_pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text('"""Parallel package."""\n', encoding="utf-8")
+    for index in range(4):
+        (pkg / f"mod_{index}.py").write_text(
+            f'"""Module {index}."""\n'
+            f"class Thing{index}:\n"
+            '    """A thing."""\n'
+            "    def method(self):\n"
+            '        """A method."""\n'
+            f"def func_{index}(value):\n"
+            '    """Uses Thing{index}()."""\n'
+            "    return value\n",
+            encoding="utf-8",
+        )
+    return base
+
+
+def _generate(base, output, jobs, monkeypatch):
+    monkeypatch.setattr(settings, "JOBS", jobs)
+    # other tests leave behind mentions, which would get crawled too
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.chdir(base)
+    sys.path.insert(0, str(base))
+    try:
+        return process_path_or_dot_name(["par_pkg"], output_folder=str(output))
+    finally:
+        sys.path.remove(str(base))
+        for name in [name for name in sys.modules if name.startswith("par_pkg")]:
+            del sys.modules[name]
+
+
+def test_parallel_output_is_byte_identical_to_serial(sample_package, tmp_path, monkeypatch):
+    serial = _generate(sample_package, tmp_path / "serial", 1, monkeypatch)
+    parallel = _generate(sample_package, tmp_path / "parallel", 2, monkeypatch)
+
+    assert sorted(os.path.basename(path) for path in parallel) == sorted(os.path.basename(path) for path in serial)
+    assert "par_pkg.mod_3.html" in os.listdir(tmp_path / "parallel")
+    serial_files = sorted(path.relative_to(tmp_path / "serial") for path in (tmp_path / "serial").rglob("*"))
+    parallel_files = sorted(path.relative_to(tmp_path / "parallel") for path in (tmp_path / "parallel").rglob("*"))
+    assert parallel_files == serial_files
+    for file_name in serial_files:
+        if (tmp_path / "serial" / file_name).is_dir():
+            continue
+        serial_bytes = (tmp_path / "serial" / file_name).read_bytes()
+        assert (tmp_path / "parallel" / file_name).read_bytes() == serial_bytes, file_name
+
+
+def test_second_run_with_a_warm_cache_writes_the_same_pages(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    (base / "uses_helpers").mkdir(parents=True)
+    (base / "uses_helpers" / "__init__.py").write_text(
+        '"""Uses helpers."""\nfrom helper_a import HelperA\nfrom helper_b import HelperB\n', encoding="utf-8"
+    )
+    # a wave of two mentioned packages goes to the workers, their pages mention submodules
+    for package in ("helper_a", "helper_b"):
+        (base / package).mkdir()
+        (base / package / "__init__.py").write_text(
+            f'"""Helpers."""\nclass Helper{package[-1].upper()}:\n    """Helps."""\n', encoding="utf-8"
+        )
+        (base / package / "inner.py").write_text('"""Inner."""\n', encoding="utf-8")
+    monkeypatch.setattr(settings, "JOBS", 2)
+    monkeypatch.setattr(settings, "CACHE", True)
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "STDLIB_BUNDLE", False)
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    written = []
+    try:
+        for output in ("cold", "warm"):
+            monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+            process_path_or_dot_name(["uses_helpers"], output_folder=str(tmp_path / output))
+            written.append(sorted(path.name for path in (tmp_path / output).glob("*.html")))
+    finally:
+        for name in [name for name in sys.modules if name.startswith(("uses_helpers", "helper_"))]:
+            del sys.modules[name]
+    assert {"helper_a.inner.html", "helper_b.inner.html"} <= set(written[0])
+    assert written[1] == written[0]
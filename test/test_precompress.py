@@ -0,0 +1,170 @@
+import gzip
+import sys
+import zlib
+
+import pytest
+
+from pydoc_fork import assets, output_files, precompress, process_path_or_dot_name, settings
+
+
+class FakeBrotli:
+    """Stands in for the optional brotli package."""
+
+    @staticmethod
+    def compress(data):
+        return b"br" + zlib.compress(data)
+
+    class Compressor:
+        def __init__(self):
+            self.compressor = zlib.compressobj()
+            self.started = False
+
+        def process(self, data):
+            prefix = b"" if self.started else b"br"
+            self.started = True
+            return prefix + self.compressor.compress(data)
+
+        def finish(self):
+            return (b"" if self.started else b"br") + self.compressor.flush()
+
+
+@pytest.fixture
+def sample_module(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "squeezed_mod.py").write_text('"""Squeezed."""\ndef f():\n    """F."""\n', encoding="utf-8")
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 0)
+    monkeypatch.setattr(settings, "PRECOMPRESS", True)
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    yield base
+    sys.modules.pop("squeezed_mod", None)
+
+
+def test_sidecars_match_the_pages(sample_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(precompress, "load_brotli", lambda: FakeBrotli)
+    output = tmp_path / "out"
+    process_path_or_dot_name(["squeezed_mod"], output_folder=str(output), overwrite_existing=True)
+    names = ("squeezed_mod.html", "index.html", assets.url("style.css"), assets.url("search.js"), "search/index.json")
+    for name in names:
+        page = (output / name).read_bytes()
+        assert gzip.decompress((output / f"{name}.gz").read_bytes()) == page
+        assert (output / f"{name}.br").read_bytes() == FakeBrotli.compress(page)
+    assert not (output / "objects.inv.gz").exists()
+    assert precompress.COMPRESSOR is None
+
+
+def test_unchanged_pages_keep_their_sidecars(sample_module, tmp_path):
+    output = tmp_path / "out"
+    process_path_or_dot_name(["squeezed_mod"], output_folder=str(output), overwrite_existing=True)
+    assert str(output / "squeezed_mod.html.gz") in output_files.LAST.written
+    process_path_or_dot_name(["squeezed_mod"], output_folder=str(output), overwrite_existing=True)
+    assert output_files.LAST.written == []
+
+
+def test_off_by_default(sample_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PRECOMPRESS", False)
+    output = tmp_path / "out"
+    process_path_or_dot_name(["squeezed_mod"], output_folder=str(output), overwrite_existing=True)
+    assert not list(output.rglob("*.gz"))
+
+
+def test_workers_finish_their_sidecars(sample_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "JOBS", 2)
+    monkeypatch.setattr(settings, "SEARCH", False)
+    output = tmp_path / "out"
+    process_path_or_dot_name(["squeezed_mod", "json"], output_folder=str(output), overwrite_existing=True)
+    for name in ("squeezed_mod.html", "json.html"):
+        assert gzip.decompress((output / f"{name}.gz").read_bytes()) == (output / name).read_bytes()
+
+
+def test_removed_files_take_their_sidecars(tmp_path):
+    path = tmp_path / "ab.json"
+    for name in ("ab.json", "ab.json.gz", "ab.json.br"):
+        (tmp_path / name).write_bytes(b"{}")
+    tally = output_files.start()
+    try:
+        assert output_files.remove(str(path))
+    finally:
+        output_files.finish()
+    assert not list(tmp_path.iterdir())
+    assert len(tally.removed) == 3
+
+
+def test_pending_files_are_bounded(tmp_path):
+    compressor = precompress.Precompressor(1, None)
+    try:
+        for index in range(10):
+            compressor.submit(str(tmp_path / f"{index}.html"), b"x" * 1000, changed=True)
+            assert len(compressor.pending) <= compressor.limit
+    finally:
+        compressor.close()
+    assert len(list(tmp_path.glob("*.html.gz"))) == 10
+
+
+def test_sidecars_are_compressed_from_the_written_chunks(tmp_path, monkeypatch):
+    read = []
+    read_chunks = precompress._read_chunks
+    processed = []
+
+    class CountingBrotli(FakeBrotli):
+        class Compressor(FakeBrotli.Compressor):
+            def process(self, data):
+                processed.append(len(data))
+                return super().process(data)
+
+    def counting(path):
+        for chunk in read_chunks(path):
+            read.append(len(chunk))
+            yield chunk
+
+    monkeypatch.setattr(precompress, "_CHUNK", 1000)
+    monkeypatch.setattr(precompress, "_read_chunks", counting)
+    page = tmp_path / "big.html"
+    pieces = [f"<p>{index}</p>\n".encode() * 50 for index in range(100)]
+    compressor = precompress.Precompressor(1, CountingBrotli)
+    monkeypatch.setattr(precompress, "COMPRESSOR", compressor)
+    try:
+        output_files.write_bytes(str(page), iter(pieces))
+        compressor.wait()
+        # written pages aren't read back
+        assert not read
+        assert len(processed) > 1 and sum(processed) == page.stat().st_size
+        data = b"".join(pieces)
+        assert gzip.decompress((tmp_path / "big.html.gz").read_bytes()) == data
+        assert (tmp_path / "big.html.br").read_bytes() == FakeBrotli.compress(data)
+        # the same sidecar as from the whole page at once
+        whole = tmp_path / "whole"
+        whole.mkdir()
+        precompress.Precompressor(1, FakeBrotli, inline=True).submit(str(whole / "big.html"), data, changed=True)
+        assert (whole / "big.html.gz").read_bytes() == (tmp_path / "big.html.gz").read_bytes()
+
+        # with its sidecars there, a page is only compressed again if it changed, from the file
+        output_files.write_bytes(str(page), iter(pieces))
+        compressor.wait()
+        assert not read
+        output_files.write_bytes(str(page), [b"changed"])
+        compressor.wait()
+        assert read == [7]
+        assert gzip.decompress((tmp_path / "big.html.gz").read_bytes()) == b"changed"
+    finally:
+        compressor.close()
+
+
+def test_failed_write_gets_no_sidecars(tmp_path, monkeypatch):
+    compressor = precompress.Precompressor(1, None)
+    monkeypatch.setattr(precompress, "COMPRESSOR", compressor)
+
+    def failing():
+        yield b"<p>half</p>"
+        raise RuntimeError("render failed")
+
+    try:
+        with pytest.raises(RuntimeError):
+            output_files.write_bytes(str(tmp_path / "half.html"), failing())
+        compressor.wait()
+    finally:
+        compressor.close()
+    assert not list(tmp_path.iterdir())
@@ -0,0 +1,117 @@
+import json
+import sys
+import tracemalloc
+
+import pytest
+
+from pydoc_fork import (
+    commands,
+    crawl,
+    incremental,
+    model_cache,
+    output_files,
+    precompress,
+    process_path_or_dot_name,
+    profiling,
+    search_index,
+    settings,
+    stdlib_bundle,
+)
+
+
+@pytest.fixture
+def sample_module(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "profiled_mod.py").write_text(
+        '"""Uses json."""\nimport json\ndef parse(text):\n    """Parse."""\n    return json.loads(text)\n',
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.setattr(settings, "GENERATE_INDEX", False)
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 2)
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    yield base
+    sys.modules.pop("profiled_mod", None)
+
+
+def test_report(sample_module, tmp_path, monkeypatch, capsys):
+    report_path = tmp_path / "reports" / "profile.json"
+    monkeypatch.setattr(settings, "PROFILE", str(report_path))
+    monkeypatch.setattr(settings, "PROFILE_TOP", 1)
+    output = tmp_path / "out"
+    process_path_or_dot_name(["profiled_mod"], output_folder=str(output))
+
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    by_name = {module["name"]: module for module in report["modules"]}
+    assert "profiled_mod" in by_name and "json" in by_name
+    assert report["totals"]["modules"] == len(report["modules"])
+    totals = [module["total_seconds"] for module in report["modules"]]
+    assert totals == sorted(totals, reverse=True)
+    mine = by_name["profiled_mod"]
+    assert mine["source"] == "imported"
+    assert mine["bytes"] == (output / "profiled_mod.html").stat().st_size
+    assert mine["peak_memory"] > 0
+    for phase in profiling.PHASES:
+        assert mine[f"{phase}_seconds"] >= 0
+    assert mine["render_seconds"] > 0
+
+    printed = capsys.readouterr().out
+    assert f"Slowest 1 of {len(report['modules'])} modules" in printed
+    assert report["modules"][0]["name"] in printed
+    assert profiling.PROFILE is None
+    assert not tracemalloc.is_tracing()
+
+
+def test_off_costs_nothing(sample_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "PROFILE", None)
+    started = []
+    monkeypatch.setattr(profiling, "BuildProfile", lambda: started.append(True))
+    process_path_or_dot_name(["profiled_mod"], output_folder=str(tmp_path / "out"))
+    assert not started
+    assert not tracemalloc.is_tracing()
+
+
+def test_failed_module_is_reported(sample_module, tmp_path, monkeypatch):
+    report_path = tmp_path / "profile.json"
+    monkeypatch.setattr(settings, "PROFILE", str(report_path))
+    process_path_or_dot_name(["no_such_module_at_all"], output_folder=str(tmp_path / "out"))
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert [(module["name"], module["source"]) for module in report["modules"]] == [("no_such_module_at_all", "failed")]
+
+
+def test_timed_counts_rendering():
+    record = profiling.ModuleProfile("page")
+    assert "".join(profiling.timed(iter(["a", "b"]), record)) == "ab"
+    assert record.seconds["render"] > 0
+    assert record.seconds["write"] == 0
+
+
+def test_workers_send_their_profiles_back(sample_module, tmp_path, monkeypatch):
+    report_path = tmp_path / "profile.json"
+    monkeypatch.setattr(settings, "PROFILE", str(report_path))
+    monkeypatch.setattr(settings, "JOBS", 2)
+    process_path_or_dot_name(["profiled_mod", "json"], output_folder=str(tmp_path / "out"))
+    names = {module["name"] for module in json.loads(report_path.read_text(encoding="utf-8"))["modules"]}
+    assert {"profiled_mod", "json"} <= names
+
+
+def test_failed_run_leaves_nothing_behind(sample_module, tmp_path, monkeypatch):
+    def fail(*args, **kwargs):
+        raise RuntimeError("render failed")
+
+    monkeypatch.setattr(settings, "PROFILE", str(tmp_path / "profile.json"))
+    monkeypatch.setattr(settings, "INCREMENTAL", True)
+    monkeypatch.setattr(settings, "CACHE", True)
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "PRECOMPRESS", True)
+    monkeypatch.setattr(settings, "THEMES", ["classic", "dark"])
+    monkeypatch.setattr(commands, "write_docs_per_module", fail)
+    with pytest.raises(RuntimeError):
+        process_path_or_dot_name(["profiled_mod"], output_folder=str(tmp_path / "out"))
+    assert search_index.INDEX is None and incremental.MANIFEST is None and model_cache.CACHE is None
+    assert crawl.FRONTIER is None and stdlib_bundle.BUNDLE is None and profiling.PROFILE is None
+    assert precompress.COMPRESSOR is None and not output_files.MIRRORS and output_files.TALLY is None
+    assert not (tmp_path / "profile.json").exists()
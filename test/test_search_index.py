@@ -0,0 +1,106 @@
+import json
+import sys
+
+import pytest
+
+from pydoc_fork import assets, process_path_or_dot_name, search_index, settings
+from pydoc_fork.inspector.builder import build
+from test import pydoc_mod, pydocfodder
+
+
+@pytest.fixture
+def sample_package(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    pkg = base / "find_pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text('"""Things to find."""\n', encoding="utf-8")
+    (pkg / "shapes.py").write_text(
+        '"""Shapes."""\n'
+        "class Circle:\n"
+        '    """A round shape.\n\n    More details."""\n'
+        "    def area(self):\n"
+        '        """How much room it takes."""\n'
+        "def make_circle(radius):\n"
+        '    """Make a Circle."""\n'
+        "UNIT_RADIUS = 1\n",
+        encoding="utf-8",
+    )
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 0)
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    yield pkg
+    for name in [name for name in sys.modules if name.startswith("find_pkg")]:
+        del sys.modules[name]
+
+
+def _lookup(output, word):
+    """What search.js would find for a word."""
+    folder = output / search_index.SEARCH_FOLDER
+    shards = json.loads((folder / "index.json").read_text(encoding="utf-8"))["shards"]
+    if word[:2] not in shards:
+        return []
+    shard = json.loads((folder / f"{word[:2]}.json").read_text(encoding="utf-8"))
+    return [shard["entries"][index] for term, indexes in shard["terms"] if term.startswith(word) for index in indexes]
+
+
+def test_entries_of_a_module():
+    found = search_index.entries("test.pydoc_mod.html", build(pydoc_mod, "test.pydoc_mod"))
+    assert {entry[1] for entry in found} == {"module", "class", "method", "function", "data"}
+    assert ["test.pydoc_mod.doc_func", "function", "test.pydoc_mod.html#-doc_func"] in [entry[:3] for entry in found]
+
+
+def test_inherited_methods_are_found_under_their_class():
+    found = search_index.entries("test.pydocfodder.html", build(pydocfodder, "test.pydocfodder"))
+    urls = [entry[2] for entry in found]
+    assert "test.pydocfodder.html#A_new-A_method" in urls
+    assert "test.pydocfodder.html#D_new-A_method" not in urls
+
+
+def test_terms():
+    assert search_index.terms("find_pkg.shapes.make_circle") == [
+        "circle",
+        "find_pkg.shapes.make_circle",
+        "make",
+        "make_circle",
+    ]
+
+
+def test_index_is_written_and_pages_load_it(sample_package, tmp_path):
+    output = tmp_path / "out"
+    process_path_or_dot_name(["find_pkg"], output_folder=str(output))
+
+    assert ["find_pkg.shapes.Circle.area", "method", "find_pkg.shapes.html#Circle-area", "How much room it takes."] in (
+        _lookup(output, "are")
+    )
+    assert [entry[0] for entry in _lookup(output, "circle")] == [
+        "find_pkg.shapes.Circle",
+        "find_pkg.shapes.make_circle",
+    ]
+    assert _lookup(output, "unit")[0][1:] == ["data", "find_pkg.shapes.html", ""]
+    assert (output / assets.url("search.js")).exists()
+    assert f'src="{assets.url("search.js")}"' in (output / "find_pkg.shapes.html").read_text(encoding="utf-8")
+
+
+def test_pages_not_written_again_stay_in_the_index(sample_package, tmp_path):
+    output = tmp_path / "out"
+    process_path_or_dot_name(["find_pkg"], output_folder=str(output))
+    before = sorted((output / "search").iterdir())
+
+    # skipped because it is already there
+    process_path_or_dot_name(["find_pkg.shapes"], output_folder=str(output))
+    assert sorted((output / "search").iterdir()) == before
+    assert _lookup(output, "area")
+
+    (output / "find_pkg.shapes.html").unlink()
+    process_path_or_dot_name(["find_pkg"], output_folder=str(output), overwrite_existing=True)
+    assert _lookup(output, "area")
+
+
+def test_no_search(sample_package, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH", False)
+    output = tmp_path / "out"
+    process_path_or_dot_name(["find_pkg"], output_folder=str(output))
+    assert not (output / "search").exists()
+    assert not list(output.glob("search.*.js"))
+    assert "search" not in (output / "find_pkg.shapes.html").read_text(encoding="utf-8")
@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from pydoc_fork import assets, server, settings
+
+
+@pytest.fixture
+def running(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "served_mod.py").write_text('"""First version."""\ndef first():\n    """One."""\n', encoding="utf-8")
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.setattr(settings, "SEARCH", settings.SEARCH)
+    monkeypatch.setattr(settings, "OUTPUT_FOLDER", settings.OUTPUT_FOLDER)
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    httpd = server.make_server("127.0.0.1", 0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield base, httpd, f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+    sys.modules.pop("served_mod", None)
+
+
+def get(url, etag=None):
+    request = urllib.request.Request(url, headers={"If-None-Match": etag} if etag else {})
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers, error.read()
+
+
+def test_page_etag_and_not_modified(running):
+    _, httpd, url = running
+    status, headers, body = get(f"{url}/served_mod.html")
+    assert status == 200
+    assert b"First&nbsp;version." in body
+    assert headers["ETag"]
+    assert headers["Cache-Control"] == "no-cache"
+    status, headers_again, body = get(f"{url}/served_mod.html", headers["ETag"])
+    assert status == 304
+    assert body == b""
+    assert headers_again["ETag"] == headers["ETag"]
+    assert httpd.RequestHandlerClass.cache.renders == 1
+
+
+def test_index_style_and_missing(running):
+    _, _, url = running
+    status, _, body = get(f"{url}/")
+    assert status == 200
+    assert b'href="served_mod.html"' in body
+    page = get(f"{url}/served_mod.html")[2].decode("utf-8")
+    style = assets.url("style.css")
+    assert f'href="{style}"' in page
+    status, headers, body = get(f"{url}/{style}")
+    assert status == 200
+    assert headers["Content-Type"].startswith("text/css")
+    assert "immutable" in headers["Cache-Control"]
+    assert get(f"{url}/style.css")[0] == 404
+    assert get(f"{url}/no_such_module_here.html")[0] == 404
+    assert get(f"{url}/served_mod.txt")[0] == 404
+
+
+def test_concurrent_requests_render_once(running):
+    _, httpd, url = running
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get(f"{url}/served_mod.html"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert [status for status, _, _ in results] == [200] * 4
+    assert len({body for _, _, body in results}) == 1
+    assert httpd.RequestHandlerClass.cache.renders == 1
+
+
+def test_changed_source_is_rendered_again(running):
+    base, httpd, url = running
+    _, headers, _ = get(f"{url}/served_mod.html")
+    source = base / "served_mod.py"
+    source.write_text('"""Second version."""\n', encoding="utf-8")
+    stat = source.stat()
+    os.utime(source, (stat.st_atime, stat.st_mtime + 10))
+    status, headers_again, body = get(f"{url}/served_mod.html", headers["ETag"])
+    assert status == 200
+    assert b"Second&nbsp;version." in body
+    assert headers_again["ETag"] != headers["ETag"]
+    assert httpd.RequestHandlerClass.cache.renders == 2
+
+
+def test_least_recently_used_page_goes_first(monkeypatch):
+    rendered = []
+    monkeypatch.setattr(server, "render_page", lambda name, force_load=False: rendered.append(name) or name.encode())
+    monkeypatch.setattr(server, "source_mtime", lambda name: 1.0)
+    cache = server.PageCache(2)
+    cache.get("a")
+    cache.get("b")
+    cache.get("a")
+    cache.get("c")
+    assert list(cache.pages) == ["a", "c"]
+    cache.get("b")
+    assert rendered == ["a", "b", "c", "b"]
+    assert cache.hits == 1
+
+
+def test_changed_source_of_an_evicted_page_is_imported_again(running, monkeypatch):
+    base, httpd, url = running
+    (base / "served_other.py").write_text('"""Other."""\n', encoding="utf-8")
+    monkeypatch.setattr(httpd.RequestHandlerClass.cache, "max_pages", 1)
+    try:
+        assert b"first" in get(f"{url}/served_mod.html")[2]
+        get(f"{url}/served_other.html")
+        assert list(httpd.RequestHandlerClass.cache.pages) == ["served_other"]
+        source = base / "served_mod.py"
+        source.write_text('"""First version."""\ndef second():\n    """Two."""\n', encoding="utf-8")
+        stat = source.stat()
+        os.utime(source, (stat.st_atime, stat.st_mtime + 10))
+        body = get(f"{url}/served_mod.html")[2]
+        assert b"second" in body and b"first" not in body
+    finally:
+        sys.modules.pop("served_other", None)
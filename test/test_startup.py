@@ -0,0 +1,33 @@
+import subprocess
+import sys
+
+STARTUP_BUDGET_SECONDS = 1.0
+"""Generous, slow CI runners import the CLI in a fraction of this"""
+
+
+def _import_times() -> dict[str, int]:
+    """Cumulative import time in microseconds for each module the CLI imports."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import pydoc_fork.__main__"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            times[parts[2].strip()] = int(parts[1])
+    return times
+
+
+def test_markup_engines_are_not_imported_at_startup():
+    times = _import_times()
+    assert "pydoc_fork.__main__" in times
+    heavy = [name for name in times if name.split(".")[0] in ("docutils", "markdown")]
+    assert heavy == []
+
+
+def test_startup_fits_the_budget():
+    times = _import_times()
+    assert times["pydoc_fork.__main__"] / 1_000_000 < STARTUP_BUDGET_SECONDS
@@ -0,0 +1,86 @@
+import sys
+
+import pytest
+
+from pydoc_fork import process_path_or_dot_name, settings
+from pydoc_fork.inspector import static_module
+
+
+@pytest.fixture
+def unimportable_package(tmp_path):
+    """A package that can't be imported: a missing dependency and a raise at import time."""
+    base = tmp_path / "src"
+    pkg = base / "static_pkg"
+    pkg.mkdir(parents=True)
+    (pkg / "__init__.py").write_text(
+        '"""Static package."""\nimport not_installed_anywhere\nraise RuntimeError("do not import me")\n',
+        encoding="utf-8",
+    )
+    (pkg / "engine.py").write_text(
+        '''"""Engines."""
+from not_installed_anywhere import Widget
+
+LIMIT: int = 10
+
+
+class Engine(Widget):
+    """An engine."""
+
+    def __init__(self, power: int = 5, *, name: str = "x") -> None:
+        """Set up."""
+
+    @property
+    def fuel(self) -> float:
+        """Fuel left."""
+
+    @staticmethod
+    def build():
+        """Build one."""
+
+    async def start(self):
+        """Start it."""
+
+
+def make(kind: str = "basic") -> Engine:
+    """Make an engine."""
+''',
+        encoding="utf-8",
+    )
+    return base
+
+
+def test_static_documents_without_importing(unimportable_package, tmp_path, monkeypatch):
+    output = tmp_path / "output"
+    monkeypatch.setattr(settings, "STATIC", True)
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.setattr(static_module, "STATIC_MODULES", {})
+    monkeypatch.chdir(unimportable_package)
+    sys.path.insert(0, str(unimportable_package))
+    try:
+        process_path_or_dot_name(["static_pkg"], output_folder=str(output))
+    finally:
+        sys.path.remove(str(unimportable_package))
+
+    assert "static_pkg" not in sys.modules
+    assert "static_pkg.engine" not in sys.modules
+    package_page = (output / "static_pkg.html").read_text(encoding="utf-8")
+    assert "Static package." in package_page.replace("&nbsp;", " ")
+    assert "engine" in package_page
+
+    page = (output / "static_pkg.engine.html").read_text(encoding="utf-8").replace("&nbsp;", " ")
+    assert "class <strong>Engine</strong>" in page
+    assert "not_installed_anywhere.Widget" in page
+    assert '(power: int = 5, *, name: str = "x") -&gt; None' in page
+    assert "async <a" in page
+    assert "Fuel left." in page
+    assert "Static methods defined here" in page
+    assert '(kind: str = "basic") -&gt; Engine' in page
+    assert "LIMIT" in page
+
+
+def test_walk_packages_statically_does_not_import(unimportable_package):
+    found = list(static_module.walk_packages_statically([str(unimportable_package)]))
+
+    assert ("static_pkg", True) in found
+    assert ("static_pkg.engine", False) in found
+    assert "static_pkg" not in sys.modules
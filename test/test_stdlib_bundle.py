@@ -0,0 +1,70 @@
+import os
+import sys
+
+import pytest
+
+from pydoc_fork import commands, settings, stdlib_bundle
+from pydoc_fork.commands import process_path_or_dot_name
+
+
+@pytest.fixture
+def configured(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 0)
+    monkeypatch.setattr(settings, "GENERATE_INDEX", False)
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    return tmp_path
+
+
+def _generate(output, project, monkeypatch, bundle=True):
+    monkeypatch.setattr(settings, "PROJECT_NAME", project)
+    monkeypatch.setattr(settings, "STDLIB_BUNDLE", bundle)
+    process_path_or_dot_name(["csv", "json"], output_folder=str(output))
+    return {name: (output / name).read_text(encoding="utf-8") for name in ("csv.html", "json.html")}
+
+
+def test_bundled_pages_are_the_same_as_rendered_ones(configured, monkeypatch):
+    rendered = _generate(configured / "plain" / "project" / "docs", "Second", monkeypatch, bundle=False)
+    _generate(configured / "first", "First", monkeypatch)
+
+    def no_inspecting(*args, **kwargs):
+        raise AssertionError("should have come from the bundle")
+
+    monkeypatch.setattr(commands, "inspect_one", no_inspecting)
+    bundled = _generate(configured / "other" / "project" / "docs", "Second", monkeypatch)
+
+    assert bundled == rendered
+    assert "Second" in bundled["csv.html"]
+    assert 'href="file:../../../' in bundled["csv.html"]
+
+
+def test_what_is_bundled():
+    assert stdlib_bundle.covers("csv")
+    assert stdlib_bundle.covers("json.decoder")
+    # no source, the page shows sys.argv
+    assert not stdlib_bundle.covers("sys")
+    # source, but the pages show os.environ and the venv's paths
+    assert not stdlib_bundle.covers("os")
+    assert not stdlib_bundle.covers("site")
+    assert not stdlib_bundle.covers("sysconfig")
+    assert not stdlib_bundle.covers("pydoc_fork.settings")
+    assert not stdlib_bundle.covers("test.pydoc_mod")
+    assert not stdlib_bundle.covers("no_such_module")
+
+
+def test_off_for_custom_templates_and_without_a_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path))
+    assert stdlib_bundle.start() is not None
+    monkeypatch.setattr(settings, "CUSTOM_TEMPLATES", str(tmp_path))
+    assert stdlib_bundle.start() is None
+    monkeypatch.setattr(settings, "CUSTOM_TEMPLATES", None)
+    monkeypatch.setattr(settings, "CACHE", False)
+    assert stdlib_bundle.start() is None
+    stdlib_bundle.finish()
+
+
+def test_keyed_by_python_version_and_settings(tmp_path, monkeypatch):
+    folder = stdlib_bundle.StdlibBundle(str(tmp_path)).folder
+    assert os.path.basename(os.path.dirname(folder)) == "{}.{}".format(*sys.version_info[:2])
+    monkeypatch.setattr(settings, "DOCUMENT_INTERNALS", not settings.DOCUMENT_INTERNALS)
+    assert stdlib_bundle.StdlibBundle(str(tmp_path)).folder != folder
@@ -0,0 +1,33 @@
+import types
+
+from pydoc_fork import settings
+from pydoc_fork.inspector.builder import build_module
+from pydoc_fork.reporter.format_page import render, stream_render
+
+
+def _big_module():
+    """A generated module with lots of classes, like protobuf output."""
+    module = types.ModuleType("stream_generated", "Lots of messages.")
+    for index in range(300):
+        cls = type(f"Message{index}", (), {"__doc__": f"Message number {index}.", "__module__": module.__name__})
+        setattr(module, cls.__name__, cls)
+    return module
+
+
+def test_stream_is_the_page_in_small_pieces():
+    doc = build_module(_big_module())
+    pieces = list(stream_render("module stream_generated", doc, "stream_generated"))
+    page = "".join(pieces)
+
+    assert page == render("module stream_generated", doc, "stream_generated")
+    assert "Message299" in page
+    # one class at a time, never the whole page
+    assert max(len(piece) for piece in pieces) < len(page) / 50
+
+
+def test_custom_templates_get_whole_strings(monkeypatch, tmp_path):
+    doc = build_module(_big_module())
+    expected = render("module stream_generated", doc, "stream_generated")
+
+    monkeypatch.setattr(settings, "CUSTOM_TEMPLATES", str(tmp_path))
+    assert "".join(stream_render("module stream_generated", doc, "stream_generated")) == expected
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+from jinja2 import ChoiceLoader, ModuleLoader
+
+from pydoc_fork import settings
+from pydoc_fork.reporter import jinja_code
+from pydoc_fork.reporter.formatter_html import heading
+
+
+@pytest.fixture
+def templates(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "CACHE", True)
+    monkeypatch.setattr(settings, "CACHE_DIR", str(tmp_path / "cache"))
+    # a wheel ships precompiled templates, which would take the cache's place
+    monkeypatch.setattr(jinja_code, "COMPILED_TEMPLATES", str(tmp_path / "not_compiled"))
+    yield tmp_path
+    monkeypatch.undo()
+    jinja_code.refresh_loader()
+
+
+def test_templates_are_looked_up_once(templates):
+    jinja_code.refresh_loader()
+    assert jinja_code.get_template("heading.jinja2") is jinja_code.get_template("heading.jinja2")
+
+
+def test_compiled_templates_are_kept_between_runs(templates):
+    jinja_code.refresh_loader()
+    heading("Title", "")
+    assert os.listdir(templates / "cache" / "templates")
+
+
+def test_custom_templates_replace_looked_up_ones(templates, monkeypatch):
+    jinja_code.refresh_loader()
+    original = heading("Title", "")
+    custom = templates / "custom"
+    custom.mkdir()
+    (custom / "heading.jinja2").write_text("custom {{ title }}", encoding="utf-8")
+
+    monkeypatch.setattr(settings, "CUSTOM_TEMPLATES", str(custom))
+    jinja_code.refresh_loader()
+    assert heading("Title", "") == "custom Title"
+
+    monkeypatch.setattr(settings, "CUSTOM_TEMPLATES", None)
+    jinja_code.refresh_loader()
+    assert heading("Title", "") == original
+
+
+def test_precompiled_templates_are_used_until_stale(templates, monkeypatch):
+    jinja_code.refresh_loader()
+    expected = heading("Title", "")
+    compiled = templates / "compiled"
+    jinja_code.compile_templates(str(compiled))
+    monkeypatch.setattr(jinja_code, "COMPILED_TEMPLATES", str(compiled))
+
+    jinja_code.refresh_loader()
+    loader = jinja_code.JINJA_ENV.loader
+    assert isinstance(loader, ChoiceLoader) and isinstance(loader.loaders[0], ModuleLoader)
+    assert heading("Title", "") == expected
+
+    (compiled / "checksums.json").write_text('{"heading.jinja2": "old"}', encoding="utf-8")
+    jinja_code.refresh_loader()
+    assert not isinstance(jinja_code.JINJA_ENV.loader, ChoiceLoader)
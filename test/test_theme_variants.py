@@ -0,0 +1,96 @@
+import sys
+import zipfile
+
+import pytest
+
+from pydoc_fork import assets, commands, output_files, process_path_or_dot_name, settings
+
+THEMES = ["classic", "light", "dark"]
+
+
+@pytest.fixture
+def sample_module(tmp_path, monkeypatch):
+    base = tmp_path / "src"
+    base.mkdir()
+    (base / "themed_mod.py").write_text('"""Themed."""\ndef f():\n    """F."""\n', encoding="utf-8")
+    (base / "themed_other.py").write_text('"""Other."""\n', encoding="utf-8")
+    monkeypatch.setattr(settings, "MENTIONED_MODULES", set())
+    monkeypatch.setattr(settings, "CACHE", False)
+    monkeypatch.setattr(settings, "CRAWL_MAX_MODULES", 0)
+    monkeypatch.setattr(settings, "THEME", "classic")
+    monkeypatch.setattr(settings, "THEMES", THEMES)
+    monkeypatch.chdir(base)
+    monkeypatch.syspath_prepend(str(base))
+    yield base
+    sys.modules.pop("themed_mod", None)
+    sys.modules.pop("themed_other", None)
+
+
+def _files(folder):
+    return {str(path.relative_to(folder)): path.read_bytes() for path in folder.rglob("*") if path.is_file()}
+
+
+def test_each_theme_gets_a_folder(sample_module, tmp_path, monkeypatch):
+    inspected = []
+    inspect_one = commands.inspect_one
+
+    def counting(name, *args, **kwargs):
+        inspected.append(name)
+        return inspect_one(name, *args, **kwargs)
+
+    monkeypatch.setattr(commands, "inspect_one", counting)
+    monkeypatch.setattr(settings, "THEMES", ["classic"])
+    process_path_or_dot_name(["themed_mod"], output_folder=str(tmp_path / "one"), overwrite_existing=True)
+    one_theme, inspected[:] = list(inspected), []
+    monkeypatch.setattr(settings, "THEMES", THEMES)
+    output = tmp_path / "out"
+    written = process_path_or_dot_name(["themed_mod"], output_folder=str(output), overwrite_existing=True)
+    # no more imports and inspections than for one theme
+    assert inspected == one_theme
+    assert str(output / "classic" / "themed_mod.html") in written
+    assert sorted(path.name for path in output.iterdir()) == sorted(THEMES)
+    classic = _files(output / "classic")
+    for theme in THEMES:
+        folder = output / theme
+        style = assets.url("style.css", theme)
+        assert (folder / style).read_text(encoding="utf-8") == assets.themed_style(theme)
+        for page in ("themed_mod.html", "index.html"):
+            html = (folder / page).read_text(encoding="utf-8")
+            assert f'href="{style}"' in html
+            assert html.replace(style, assets.url("style.css", "classic")).encode() == classic[page]
+        assert (folder / "objects.inv").read_bytes() == classic["objects.inv"]
+        assert (folder / "search" / "index.json").exists()
+    assert not (output / "themed_mod.html").exists()
+
+    process_path_or_dot_name(["themed_mod"], output_folder=str(output), overwrite_existing=True)
+    assert not output_files.LAST.written
+
+
+def test_workers_write_every_theme(sample_module, tmp_path, monkeypatch):
+    serial = tmp_path / "serial"
+    process_path_or_dot_name(["themed_mod", "themed_other"], output_folder=str(serial), overwrite_existing=True)
+    monkeypatch.setattr(settings, "JOBS", 2)
+    parallel = tmp_path / "parallel"
+    process_path_or_dot_name(["themed_mod", "themed_other"], output_folder=str(parallel), overwrite_existing=True)
+    assert _files(serial) == _files(parallel)
+    assert "dark/themed_other.html" in _files(parallel)
+
+
+def test_themes_in_an_archive(sample_module, tmp_path, monkeypatch):
+    archive = tmp_path / "docs.zip"
+    monkeypatch.setattr(settings, "OUTPUT_ARCHIVE", str(archive))
+    process_path_or_dot_name(["themed_mod"], output_folder=str(tmp_path / "out"), overwrite_existing=True)
+    with zipfile.ZipFile(archive) as opened:
+        names = set(opened.namelist())
+        for theme in THEMES:
+            assert {f"{theme}/themed_mod.html", f"{theme}/{assets.url('style.css', theme)}"} <= names
+        assert assets.url("style.css", "dark").encode() in opened.read("dark/themed_mod.html")
+
+
+def test_one_theme_keeps_the_output_folder(sample_module, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "THEMES", ["dark", "dark"])
+    monkeypatch.setattr(settings, "THEME", "dark")
+    output = tmp_path / "out"
+    process_path_or_dot_name(["themed_mod"], output_folder=str(output), overwrite_existing=True)
+    assert f'href="{assets.url("style.css", "dark")}"' in (output / "themed_mod.html").read_text(encoding="utf-8")
+    assert not output_files.MIRRORS